@@ -0,0 +1,46 @@
+"""Indexes for hot query predicates and unique likes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+- playlists.owner_id — every playlist listing filters on it
+- playlist_tracks(playlist_id, position) — playlist detail orders by position
+- liked_tracks(user_id, track_id) — unique, so a track can only be liked once
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_playlists_owner_id", "playlists", ["owner_id"])
+    op.create_index(
+        "ix_playlist_tracks_playlist_id_position",
+        "playlist_tracks",
+        ["playlist_id", "position"],
+    )
+    # Drop duplicate likes before enforcing uniqueness, keeping one per pair
+    op.execute(
+        "DELETE FROM liked_tracks WHERE id NOT IN "
+        "(SELECT MIN(id) FROM liked_tracks GROUP BY user_id, track_id)"
+    )
+    op.create_index(
+        "uq_liked_tracks_user_id_track_id",
+        "liked_tracks",
+        ["user_id", "track_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_liked_tracks_user_id_track_id", table_name="liked_tracks")
+    op.drop_index("ix_playlist_tracks_playlist_id_position", table_name="playlist_tracks")
+    op.drop_index("ix_playlists_owner_id", table_name="playlists")
@@ -0,0 +1,30 @@
+"""Index for keyset pagination of a user's liked tracks
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+GET /likes pages through (liked_at DESC, id DESC) for one user.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_liked_tracks_user_id_liked_at_id",
+        "liked_tracks",
+        ["user_id", "liked_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_liked_tracks_user_id_liked_at_id", table_name="liked_tracks")
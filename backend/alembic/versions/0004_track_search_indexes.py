@@ -0,0 +1,44 @@
+"""Full-text and trigram indexes for library search
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+GET /library/search matches title and artist by word prefix (tsvector,
+``simple`` config) and by similarity for typos (pg_trgm). PostgreSQL only;
+other databases search an in-memory index instead.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match Track's search expression in app/models/user.py
+_SEARCH_TEXT = "coalesce(title, '') || ' ' || coalesce(artist, '')"
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        f"CREATE INDEX ix_tracks_search_tsv ON tracks "
+        f"USING gin (to_tsvector('simple', {_SEARCH_TEXT}))"
+    )
+    op.execute(
+        f"CREATE INDEX ix_tracks_search_trgm ON tracks "
+        f"USING gin (({_SEARCH_TEXT}) gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != "postgresql":
+        return
+    op.execute("DROP INDEX ix_tracks_search_trgm")
+    op.execute("DROP INDEX ix_tracks_search_tsv")
@@ -0,0 +1,42 @@
+"""Listening events (play history)
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+Plays, skips and completions, bulk-inserted by the listening event buffer.
+GET /history reads a user's newest events by (user_id, occurred_at).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "listening_events",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("track_id", sa.String(), nullable=False),
+        sa.Column("event", sa.String(), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=True),
+        sa.Column("occurred_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_listening_events_user_id_occurred_at",
+        "listening_events",
+        ["user_id", "occurred_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_listening_events_user_id_occurred_at", table_name="listening_events")
+    op.drop_table("listening_events")
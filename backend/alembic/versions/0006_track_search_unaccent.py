@@ -0,0 +1,58 @@
+"""Fold accents in the library search indexes
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+
+Rebuilds both search indexes over ``immutable_unaccent(...)`` so "beyonce"
+matches "Beyoncé", as the in-memory index used on other databases does.
+``unaccent()`` itself is only STABLE (its dictionary can change), so it
+can't appear in an index; the wrapper pins the dictionary. PostgreSQL only.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match Track's search expression in app/models/user.py
+_SEARCH_TEXT = "coalesce(title, '') || ' ' || coalesce(artist, '')"
+_FOLDED_TEXT = f"immutable_unaccent({_SEARCH_TEXT})"
+# Must match IMMUTABLE_UNACCENT in app/models/user.py
+_CREATE_FUNCTION = (
+    "CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text "
+    "LANGUAGE sql IMMUTABLE PARALLEL SAFE "
+    "AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$"
+)
+
+
+def _create_indexes(text: str) -> None:
+    op.execute(f"CREATE INDEX ix_tracks_search_tsv ON tracks USING gin (to_tsvector('simple', {text}))")
+    op.execute(f"CREATE INDEX ix_tracks_search_trgm ON tracks USING gin (({text}) gin_trgm_ops)")
+
+
+def _drop_indexes() -> None:
+    op.execute("DROP INDEX ix_tracks_search_trgm")
+    op.execute("DROP INDEX ix_tracks_search_tsv")
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute(_CREATE_FUNCTION)
+    _drop_indexes()
+    _create_indexes(_FOLDED_TEXT)
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != "postgresql":
+        return
+    _drop_indexes()
+    _create_indexes(_SEARCH_TEXT)
+    op.execute("DROP FUNCTION immutable_unaccent(text)")
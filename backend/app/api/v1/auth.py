@@ -5,17 +5,18 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse, Token, TokenRefresh
 from app.core.security import (
-    get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    verify_password_async,
     create_access_token,
     create_refresh_token,
     decode_token,
     get_current_user_id,
 )
+from app.services.home_feed import get_home_feed
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 logger = logging.getLogger(__name__)
@@ -45,13 +46,15 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
         user = User(
             email=user_data.email,
             username=user_data.username,
-            hashed_password=get_password_hash(user_data.password),
+            hashed_password=await get_password_hash_async(user_data.password),
         )
         db.add(user)
         await db.commit()
         await db.refresh(user)
 
         return user
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Registration error: {e}", exc_info=True)
         raise HTTPException(
@@ -69,12 +72,14 @@ async def login(
     result = await db.execute(select(User).where(User.email == form_data.username))
     user = result.scalar_one_or_none()
 
-    # Always run password verification to prevent timing-based user enumeration
+    # Always run password verification to prevent timing-based user enumeration.
+    # Both branches go through the same bounded hashing pool, so queueing (and
+    # rejection under overload) affects them equally.
     if user:
-        password_valid = verify_password(form_data.password, user.hashed_password)
+        password_valid = await verify_password_async(form_data.password, user.hashed_password)
     else:
         # Hash a dummy password to keep response time constant
-        get_password_hash(form_data.password)
+        await get_password_hash_async(form_data.password)
         password_valid = False
 
     if not user or not password_valid:
@@ -90,6 +95,9 @@ async def login(
             detail="User account is disabled"
         )
 
+    # Start building their home feed while the client is still logging in
+    await get_home_feed().mark_active(user.id)
+
     return Token(
         access_token=create_access_token(data={"sub": user.id}),
         refresh_token=create_refresh_token(data={"sub": user.id}),
@@ -126,7 +134,7 @@ async def refresh_token(token_data: TokenRefresh, db: AsyncSession = Depends(get
 @router.get("/me", response_model=UserResponse)
 async def get_current_user(
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get current authenticated user."""
     result = await db.execute(select(User).where(User.id == user_id))
@@ -0,0 +1,110 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import get_current_user_id
+from app.db.database import get_read_db
+from app.models.user import Playlist, playlist_tracks
+from app.schemas.user import DownloadJobCreate, DownloadJobResponse
+from app.services.downloads import (
+    DownloadJob,
+    DownloadManager,
+    TooManyDownloadJobs,
+    get_download_manager,
+)
+
+router = APIRouter(prefix="/downloads", tags=["Downloads"])
+
+
+def _get_job(downloads: DownloadManager, user_id: str, job_id: str) -> DownloadJob:
+    job = downloads.get(user_id, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Download job not found"
+        )
+    return job
+
+
+@router.post(
+    "/playlists/{playlist_id}",
+    response_model=DownloadJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def download_playlist(
+    playlist_id: str,
+    job_data: DownloadJobCreate = DownloadJobCreate(),
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db),
+    downloads: DownloadManager = Depends(get_download_manager),
+):
+    """Queue a server-side pre-download of every track in a playlist.
+
+    Stored tracks are then streamed from local disk. Repeating the request
+    while the job is unfinished returns the same job.
+    """
+    result = await db.execute(
+        select(Playlist).where(Playlist.id == playlist_id)
+    )
+    playlist = result.scalar_one_or_none()
+
+    if not playlist:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Playlist not found"
+        )
+
+    if playlist.owner_id != user_id and not playlist.is_public:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this playlist"
+        )
+
+    result = await db.execute(
+        select(playlist_tracks.c.track_id)
+        .where(playlist_tracks.c.playlist_id == playlist_id)
+        .order_by(playlist_tracks.c.position)
+    )
+    video_ids = list(result.scalars())
+
+    try:
+        job = downloads.submit(user_id, playlist_id, job_data.quality, video_ids)
+    except TooManyDownloadJobs:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many unfinished download jobs",
+        )
+    return job.as_dict()
+
+
+@router.get("", response_model=List[DownloadJobResponse])
+async def list_downloads(
+    user_id: str = Depends(get_current_user_id),
+    downloads: DownloadManager = Depends(get_download_manager),
+):
+    """List the current user's download jobs, newest first."""
+    return [job.as_dict() for job in downloads.jobs_for(user_id)]
+
+
+@router.get("/{job_id}", response_model=DownloadJobResponse)
+async def get_download(
+    job_id: str,
+    user_id: str = Depends(get_current_user_id),
+    downloads: DownloadManager = Depends(get_download_manager),
+):
+    """Get a download job's status and per-track progress."""
+    return _get_job(downloads, user_id, job_id).as_dict()
+
+
+@router.delete("/{job_id}", response_model=DownloadJobResponse)
+async def cancel_download(
+    job_id: str,
+    user_id: str = Depends(get_current_user_id),
+    downloads: DownloadManager = Depends(get_download_manager),
+):
+    """Cancel a download job. Tracks already downloading finish; the rest are skipped."""
+    job = _get_job(downloads, user_id, job_id)
+    downloads.cancel(job)
+    return job.as_dict()
@@ -0,0 +1,87 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import get_current_user_id, validate_video_id
+from app.db.database import get_read_db
+from app.models.user import ListeningEvent, Track
+from app.schemas.user import ListeningEventCreate, ListeningEventResponse, TrackResponse
+from app.services.listening import ListeningEventBuffer, get_listening_events
+
+router = APIRouter(prefix="/history", tags=["History"])
+
+
+@router.post("/events", status_code=status.HTTP_202_ACCEPTED)
+async def record_listening_event(
+    event_data: ListeningEventCreate,
+    user_id: str = Depends(get_current_user_id),
+    events: ListeningEventBuffer = Depends(get_listening_events),
+):
+    """Record a play, skip or completion. Written to history asynchronously."""
+    validate_video_id(event_data.track_id)
+    if not events.record(user_id, event_data.track_id, event_data.event, event_data.position):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="History is busy — please retry",
+            headers={"Retry-After": "5"},
+        )
+    return {"message": "Event recorded"}
+
+
+@router.get("", response_model=List[ListeningEventResponse])
+async def get_history(
+    limit: int = Query(default=50, ge=1, le=200),
+    before: Optional[datetime] = Query(default=None, description="Only events before this time (for paging)"),
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db),
+    events: ListeningEventBuffer = Depends(get_listening_events),
+):
+    """Get the current user's listening history, newest first.
+
+    Includes events still waiting in the write buffer.
+    """
+    if before is not None and before.tzinfo is None:
+        before = before.replace(tzinfo=timezone.utc)
+    pending = [
+        row for row in events.pending_for(user_id)
+        if before is None or row["occurred_at"] < before
+    ][:limit]
+
+    written = []
+    if len(pending) < limit:
+        query = select(ListeningEvent).where(ListeningEvent.user_id == user_id)
+        if before is not None:
+            query = query.where(ListeningEvent.occurred_at < before)
+        result = await db.execute(
+            query.order_by(ListeningEvent.occurred_at.desc()).limit(limit - len(pending))
+        )
+        written = [
+            {
+                "track_id": e.track_id,
+                "event": e.event,
+                "position": e.position,
+                "occurred_at": e.occurred_at,
+            }
+            for e in result.scalars()
+        ]
+    page = pending + written
+
+    track_ids = {row["track_id"] for row in page}
+    tracks = {}
+    if track_ids:
+        result = await db.execute(select(Track).where(Track.id.in_(track_ids)))
+        tracks = {t.id: TrackResponse.model_validate(t) for t in result.scalars()}
+
+    return [
+        ListeningEventResponse(
+            track_id=row["track_id"],
+            event=row["event"],
+            position=row["position"],
+            occurred_at=row["occurred_at"],
+            track=tracks.get(row["track_id"]),
+        )
+        for row in page
+    ]
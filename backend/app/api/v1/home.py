@@ -0,0 +1,30 @@
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, Request
+
+from app.core.responses import fast_response
+from app.core.security import get_current_user_id
+from app.schemas.user import HomeFeedResponse
+from app.services.home_feed import HomeFeedService, get_home_feed
+
+router = APIRouter(prefix="/home", tags=["Home"])
+
+
+@router.get("", response_model=HomeFeedResponse)
+async def get_home(
+    request: Request,
+    user_id: str = Depends(get_current_user_id),
+    home: HomeFeedService = Depends(get_home_feed),
+):
+    """Get the home screen: recently played, mixes from your playlists, and trending.
+
+    Precomputed in the background, so this never waits on YouTube. ``stale``
+    means a newer feed is being built — fetch again shortly for it.
+    """
+    feed = await home.get_feed(user_id)
+    built_at = feed["built_at"]
+    return fast_response(request, {
+        "sections": feed["sections"],
+        "built_at": datetime.fromtimestamp(built_at, timezone.utc) if built_at is not None else None,
+        "stale": feed["stale"],
+    })
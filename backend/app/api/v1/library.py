@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.responses import fast_response
+from app.core.security import get_current_user_id
+from app.db.database import get_read_db
+from app.schemas.user import LibrarySearchResponse
+from app.services.library_search import LibrarySearch, get_library_search
+
+router = APIRouter(prefix="/library", tags=["Library"])
+
+
+@router.get("/search", response_model=LibrarySearchResponse)
+async def search_library(
+    request: Request,
+    query: str = Query(..., min_length=1, max_length=200, description="Search query"),
+    limit: int = Query(default=20, ge=1, le=50, description="Number of results"),
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db),
+    library: LibrarySearch = Depends(get_library_search),
+):
+    """Search the tracks in the current user's playlists and likes.
+
+    Matches word prefixes of the title and artist as you type, and tolerates
+    typos. Served from the local database — no YouTube requests.
+    """
+    results = await library.search(db, user_id, query, limit)
+    return fast_response(request, {
+        "query": query,
+        "results": results,
+        "total": len(results),
+    })
@@ -0,0 +1,210 @@
+import asyncio
+import base64
+import logging
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.rate_limit import rate_limit
+from app.core.security import get_current_user_id, validate_video_id
+from app.db.database import get_db, insert_new
+from app.models.user import LikedTrack, Track
+from app.schemas.user import (
+    LikeTrack,
+    LikedStatusRequest,
+    LikedStatusResponse,
+    LikedTrackResponse,
+    LikedTracksPage,
+    TrackResponse,
+)
+from app.services.library_search import get_library_search
+from app.services.likes import get_liked_ids, mark_liked
+from app.api.v1.playback import extraction_error
+from app.services.youtube import ExtractionFailed, get_youtube_service, YouTubeService
+
+router = APIRouter(prefix="/likes", tags=["Likes"])
+logger = logging.getLogger(__name__)
+
+
+def _encode_cursor(liked_at: datetime, like_id: str) -> str:
+    raw = f"{liked_at.isoformat()}|{like_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        liked_at, like_id = raw.split("|", 1)
+        return datetime.fromisoformat(liked_at), like_id
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+async def _get_or_create_track(db: AsyncSession, youtube: YouTubeService, data: LikeTrack) -> Track:
+    """Return the Track row for ``data.track_id``, storing it if it's new.
+
+    The row is shared by every user, so it's filled from YouTube's (cached)
+    video info, never from client-supplied metadata. Another user liking the
+    same new track at once may store it first; that row is used instead.
+    """
+    track_result = await db.execute(select(Track).where(Track.id == data.track_id))
+    track = track_result.scalar_one_or_none()
+    if track:
+        return track
+
+    try:
+        info = await youtube.get_video_info(data.track_id)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="YouTube extraction timed out — please try again",
+        )
+    except ExtractionFailed as e:
+        raise extraction_error(e)
+    except Exception as e:
+        logger.warning(f"Track info failed for {data.track_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Could not get track info",
+        )
+    await db.execute(
+        insert_new(Track)
+        .values(
+            id=info['id'],
+            title=info['title'],
+            artist=info.get('artist'),
+            duration=info.get('duration'),
+            thumbnail=info.get('thumbnail'),
+        )
+        .on_conflict_do_nothing(index_elements=["id"])
+    )
+    track_result = await db.execute(select(Track).where(Track.id == info['id']))
+    return track_result.scalar_one()
+
+
+@router.get("", response_model=LikedTracksPage)
+async def get_liked_tracks(
+    limit: int = Query(default=50, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None, max_length=200),
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """List the current user's liked tracks, most recent first (keyset paginated)."""
+    query = (
+        select(LikedTrack.id, LikedTrack.liked_at, Track)
+        .join(Track, Track.id == LikedTrack.track_id)
+        .where(LikedTrack.user_id == user_id)
+        .order_by(LikedTrack.liked_at.desc(), LikedTrack.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        liked_at, like_id = _decode_cursor(cursor)
+        # Compare against the stored value of the anchor row, so the cursor is
+        # exact whatever precision the database keeps timestamps at; fall back
+        # to the cursor's copy if that like has since been removed.
+        anchor = func.coalesce(
+            select(LikedTrack.liked_at).where(LikedTrack.id == like_id).scalar_subquery(),
+            liked_at,
+        )
+        query = query.where(
+            or_(
+                LikedTrack.liked_at < anchor,
+                and_(LikedTrack.liked_at == anchor, LikedTrack.id < like_id),
+            )
+        )
+
+    rows = (await db.execute(query)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].liked_at, rows[-1].id)
+
+    return LikedTracksPage(
+        items=[
+            LikedTrackResponse(track=TrackResponse.model_validate(row.Track), liked_at=row.liked_at)
+            for row in rows
+        ],
+        next_cursor=next_cursor,
+    )
+
+
+@router.post(
+    "",
+    response_model=LikedTrackResponse,
+    status_code=status.HTTP_201_CREATED,
+    # A new track is looked up on YouTube, like /playback/info
+    dependencies=[Depends(rate_limit("info"))],
+)
+async def like_track(
+    like_data: LikeTrack,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+    youtube: YouTubeService = Depends(get_youtube_service),
+):
+    """Like a track (idempotent)."""
+    validate_video_id(like_data.track_id)
+
+    existing = await db.execute(
+        select(LikedTrack, Track)
+        .join(Track, Track.id == LikedTrack.track_id)
+        .where(LikedTrack.user_id == user_id, LikedTrack.track_id == like_data.track_id)
+    )
+    row = existing.first()
+    if row:
+        return LikedTrackResponse(track=TrackResponse.model_validate(row.Track), liked_at=row.LikedTrack.liked_at)
+
+    try:
+        track = await _get_or_create_track(db, youtube, like_data)
+        like = LikedTrack(user_id=user_id, track_id=track.id)
+        db.add(like)
+        await db.commit()
+        await db.refresh(like)
+    except IntegrityError:
+        # Concurrent like of the same track by this user — the other request won
+        await db.rollback()
+        result = await db.execute(
+            select(LikedTrack, Track)
+            .join(Track, Track.id == LikedTrack.track_id)
+            .where(LikedTrack.user_id == user_id, LikedTrack.track_id == like_data.track_id)
+        )
+        row = result.first()
+        if row is None:
+            raise
+        track, like = row.Track, row.LikedTrack
+
+    mark_liked(user_id, track.id, True)
+    get_library_search().invalidate(user_id)
+    return LikedTrackResponse(track=TrackResponse.model_validate(track), liked_at=like.liked_at)
+
+
+@router.delete("/{track_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def unlike_track(
+    track_id: str,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """Remove a track from the current user's likes (idempotent)."""
+    await db.execute(
+        delete(LikedTrack).where(LikedTrack.user_id == user_id, LikedTrack.track_id == track_id)
+    )
+    await db.commit()
+    mark_liked(user_id, track_id, False)
+    get_library_search().invalidate(user_id)
+
+
+@router.post("/status", response_model=LikedStatusResponse)
+async def get_liked_status(
+    request_data: LikedStatusRequest,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """Return liked flags for a page of track IDs (e.g. search results) in one call."""
+    liked = await get_liked_ids(db, user_id)
+    return LikedStatusResponse(liked={track_id: track_id in liked for track_id in request_data.track_ids})
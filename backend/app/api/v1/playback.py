@@ -1,17 +1,40 @@
 import asyncio
 import logging
+import math
+import re
+import time
+from typing import List
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from fastapi.responses import StreamingResponse
-
-from app.services.youtube import get_youtube_service, YouTubeService
-from app.schemas.user import StreamInfo
+from pydantic import TypeAdapter
+from starlette.background import BackgroundTask
+
+from app.services.audio_store import StoredAudio, get_audio_store
+from app.services.youtube import ExtractionFailed, get_youtube_service, YouTubeService, resolve_audio_quality
+from app.services.listening import get_listening_events
+from app.services.hls import get_hls_proxy, HLSProxy, UpstreamError, verify_upstream_token
+from app.services.stream_mux import get_stream_mux
+from app.services.stream_limits import get_stream_governor, StreamLease, TooManyStreams
+from app.schemas.user import StreamInfo, TrackSearchResult
 from app.core.security import get_current_user_id, validate_video_id
+from app.core.http_cache import conditional
+from app.core.metrics import PROXY_ACTIVE_STREAMS, PROXY_BYTES, PROXY_TTFB_SECONDS
+from app.core.rate_limit import rate_limit
+from app.core.timing import phase
+from app.core.responses import fast_response
 
 router = APIRouter(prefix="/playback", tags=["Playback"])
 logger = logging.getLogger(__name__)
 
+# Dumps a whole result list in one pass, not one model_dump per item
+_track_results = TypeAdapter(List[TrackSearchResult])
+
+# Proxied bytes are added to the counter in batches, keeping metric updates
+# out of the per-chunk path
+_BYTES_METRIC_BATCH = 1024 * 1024
+
 # Shared httpx client for proxying streams
 _http_client: httpx.AsyncClient | None = None
 
@@ -27,21 +50,117 @@ def _get_http_client() -> httpx.AsyncClient:
     return _http_client
 
 
+# Only open-ended ranges ("bytes=N-") produce identical bodies for everyone
+# and can be shared between listeners; bounded ranges always go upstream alone.
+_OPEN_RANGE_RE = re.compile(r"^bytes=(\d+)-$")
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Read size when streaming pre-downloaded audio from the local store
+_LOCAL_CHUNK = 64 * 1024
+
+
+def _audio_quality(request: Request, quality: str, bandwidth: float | None) -> str:
+    """Resolve the requested audio tier, using the client's bandwidth hint for "auto".
+
+    The hint comes from the ``bandwidth`` query param (kbps) or, failing that,
+    the ``Downlink`` client hint header (Mbps).
+    """
+    if quality == "auto" and bandwidth is None:
+        downlink = request.headers.get("downlink")
+        if downlink:
+            try:
+                bandwidth = float(downlink) * 1000
+            except ValueError:
+                bandwidth = None
+    return resolve_audio_quality(quality, bandwidth)
+
+
+# Classified extraction failures → client-facing status and message
+_EXTRACTION_FAILURES = {
+    "unavailable": (status.HTTP_404_NOT_FOUND, "Video unavailable"),
+    "upcoming": (status.HTTP_404_NOT_FOUND, "Video is not available yet"),
+    "private": (status.HTTP_403_FORBIDDEN, "Video is private"),
+    "age_restricted": (status.HTTP_403_FORBIDDEN, "Video is age-restricted"),
+    "members_only": (status.HTTP_403_FORBIDDEN, "Video is for channel members only"),
+    "geo_blocked": (status.HTTP_451_UNAVAILABLE_FOR_LEGAL_REASONS, "Video is not available in this region"),
+    "blocked": (status.HTTP_503_SERVICE_UNAVAILABLE, "YouTube is temporarily refusing requests — please try again later"),
+    "timeout": (status.HTTP_504_GATEWAY_TIMEOUT, "YouTube extraction timed out — please try again"),
+}
+
+
+def extraction_error(e: ExtractionFailed) -> HTTPException:
+    """HTTP error for a (possibly negatively cached) extraction failure."""
+    status_code, detail = _EXTRACTION_FAILURES.get(
+        e.kind, (status.HTTP_502_BAD_GATEWAY, "Could not extract video")
+    )
+    headers = None
+    if not e.permanent and e.retry_after:
+        headers = {"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+    return HTTPException(status_code=status_code, detail=detail, headers=headers)
+
+
 async def _proxy_stream(
     video_id: str,
     youtube: YouTubeService,
     stream_getter,
     request: Request,
+    stream_key: str,
+    user_id: str,
 ):
     """Proxy a YouTube stream through the backend so clients don't need
-    direct access to the IP-locked YouTube URL."""
+    direct access to the IP-locked YouTube URL.
+
+    Overlapping requests for the same ``stream_key``, video and range start
+    share one upstream connection through the stream multiplexer. Each stream
+    holds one of the user's concurrency slots, is charged to their byte
+    counters and fair share of egress, and gives up its upstream connection
+    while the client stalls.
+    """
+    try:
+        lease = _acquire_stream(user_id)
+    except HTTPException:
+        stream_getter.close()
+        raise
+    try:
+        return await _open_proxied_stream(video_id, stream_getter, request, stream_key, lease)
+    except BaseException:
+        lease.release()
+        raise
+
+
+def _acquire_stream(user_id: str) -> StreamLease:
+    """Take one of the user's stream slots, or raise 429."""
+    governor = get_stream_governor()
+    try:
+        return governor.acquire(user_id)
+    except TooManyStreams:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many concurrent streams",
+            headers={"Retry-After": str(int(governor.idle_timeout) or 1)},
+        )
+
+
+async def _open_proxied_stream(
+    video_id: str,
+    stream_getter,
+    request: Request,
+    stream_key: str,
+    lease: StreamLease,
+):
+    """Resolve the stream and open (or join) its upstream under ``lease``."""
+    started = time.perf_counter()
     try:
         stream_info = await stream_getter
+    except HTTPException:
+        raise
     except asyncio.TimeoutError:
         raise HTTPException(
             status_code=status.HTTP_504_GATEWAY_TIMEOUT,
             detail="YouTube extraction timed out — please try again",
         )
+    except ExtractionFailed as e:
+        raise extraction_error(e)
     except Exception as e:
         logger.warning(f"Stream extraction failed for {video_id}: {e}")
         raise HTTPException(
@@ -58,18 +177,30 @@ async def _proxy_stream(
     # Build headers for the upstream YouTube request
     upstream_headers = dict(stream_info.headers) if stream_info.headers else {}
 
-    # Support range requests from client (seeking)
-    range_header = request.headers.get("range")
-    if range_header:
-        upstream_headers["Range"] = range_header
-
     client = _get_http_client()
 
-    try:
-        upstream_resp = await client.send(
-            client.build_request("GET", stream_info.url, headers=upstream_headers),
+    def open_upstream(range_value: str | None):
+        headers = dict(upstream_headers)
+        if range_value:
+            headers["Range"] = range_value
+        return client.send(
+            client.build_request("GET", stream_info.url, headers=headers),
             stream=True,
         )
+
+    # Support range requests from client (seeking)
+    range_header = request.headers.get("range")
+    if range_header is None:
+        mux_key, start = f"{stream_key}:{video_id}:full", 0
+    elif match := _OPEN_RANGE_RE.match(range_header):
+        start = int(match.group(1))
+        mux_key = f"{stream_key}:{video_id}:{start}"
+    else:
+        mux_key, start = None, 0
+
+    try:
+        with phase("upstream"):
+            upstream = await get_stream_mux().subscribe(mux_key, start, range_header, open_upstream)
     except httpx.RequestError as e:
         logger.warning(f"Proxy request failed for {video_id}: {e}")
         raise HTTPException(
@@ -80,58 +211,218 @@ async def _proxy_stream(
     # Forward relevant response headers
     response_headers = {}
     for key in ("content-type", "content-length", "accept-ranges", "content-range"):
-        val = upstream_resp.headers.get(key)
+        val = upstream.headers.get(key)
         if val:
             response_headers[key] = val
 
     # Allow clients to seek
     response_headers["Accept-Ranges"] = "bytes"
 
-    status_code = upstream_resp.status_code  # 200 or 206 for range
+    status_code = upstream.status_code  # 200 or 206 for range
+
+    lease.on_idle = upstream.release_upstream
+
+    async def finish():
+        lease.release()
+        await upstream.close()
+
+    kind = stream_key.split(":", 1)[0]
 
     async def stream_generator():
+        active = PROXY_ACTIVE_STREAMS.labels(kind)
+        bytes_out = PROXY_BYTES.labels(kind)
+        unreported = 0
+        first_chunk = True
+        active.inc()
         try:
-            async for chunk in upstream_resp.aiter_bytes(chunk_size=64 * 1024):
+            async for chunk in upstream:
+                if first_chunk:
+                    PROXY_TTFB_SECONDS.labels(kind).observe(time.perf_counter() - started)
+                    first_chunk = False
+                lease.record(len(chunk))
+                if lease.governor.egress_limited:
+                    await lease.throttle(len(chunk))
+                unreported += len(chunk)
+                if unreported >= _BYTES_METRIC_BATCH:
+                    bytes_out.inc(unreported)
+                    unreported = 0
+                lease.sending()
                 yield chunk
+                lease.sent()
         finally:
-            await upstream_resp.aclose()
+            bytes_out.inc(unreported)
+            active.dec()
+            await finish()
 
     return StreamingResponse(
         stream_generator(),
         status_code=status_code,
         headers=response_headers,
+        # Runs even if the client disconnects before the body starts
+        background=BackgroundTask(finish),
+    )
+
+
+def _byte_range(range_header: str | None, size: int) -> tuple[int, int] | None:
+    """Inclusive (start, end) of a single-range request, or None to send the
+    whole file. Multi-range and malformed headers are ignored, as RFC 9110
+    allows; unsatisfiable ranges raise 416."""
+    if not range_header:
+        return None
+    match = _RANGE_RE.match(range_header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+    else:  # suffix range: the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+        if int(last) == 0:
+            start = size
+    if start >= size:
+        raise HTTPException(
+            status_code=416,  # the constant's name differs across Starlette versions
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+async def _serve_stored(
+    video_id: str,
+    stored: StoredAudio,
+    request: Request,
+    user_id: str,
+) -> StreamingResponse | None:
+    """Stream pre-downloaded audio from the local store, with Range support
+    and without touching YouTube. Returns None if the file has gone missing.
+
+    Holds a stream slot and is charged to the user's byte counters and
+    egress share like a proxied stream.
+    """
+    try:
+        f = await asyncio.to_thread(open, stored.path, "rb")
+    except FileNotFoundError:
+        return None
+    try:
+        byte_range = _byte_range(request.headers.get("range"), stored.size)
+        lease = _acquire_stream(user_id)
+    except BaseException:
+        await asyncio.to_thread(f.close)
+        raise
+
+    start, end = byte_range or (0, stored.size - 1)
+    response_headers = {
+        "Content-Type": stored.content_type,
+        "Content-Length": str(end - start + 1),
+        "Accept-Ranges": "bytes",
+    }
+    if byte_range:
+        response_headers["Content-Range"] = f"bytes {start}-{end}/{stored.size}"
+
+    async def finish():
+        lease.release()
+        await asyncio.to_thread(f.close)
+
+    async def file_generator():
+        active = PROXY_ACTIVE_STREAMS.labels("stored")
+        bytes_out = PROXY_BYTES.labels("stored")
+        remaining = end - start + 1
+        unreported = 0
+        active.inc()
+        try:
+            await asyncio.to_thread(f.seek, start)
+            while remaining > 0:
+                chunk = await asyncio.to_thread(f.read, min(_LOCAL_CHUNK, remaining))
+                if not chunk:
+                    logger.warning(f"Stored audio for {video_id} is shorter than its index entry")
+                    break
+                remaining -= len(chunk)
+                lease.record(len(chunk))
+                if lease.governor.egress_limited:
+                    await lease.throttle(len(chunk))
+                unreported += len(chunk)
+                if unreported >= _BYTES_METRIC_BATCH:
+                    bytes_out.inc(unreported)
+                    unreported = 0
+                lease.sending()
+                yield chunk
+                lease.sent()
+        finally:
+            bytes_out.inc(unreported)
+            active.dec()
+            await finish()
+
+    return StreamingResponse(
+        file_generator(),
+        status_code=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+        headers=response_headers,
+        background=BackgroundTask(finish),
     )
 
 
+def _record_play(request: Request, user_id: str, video_id: str) -> None:
+    """Add a play to the user's history when a stream starts.
+
+    Players re-request with Range as they seek and buffer, so only requests
+    from byte 0 count (not Safari's "bytes=0-1" probe). Buffered in memory,
+    so this adds no database round trip to the stream.
+    """
+    range_header = request.headers.get("range")
+    if range_header:
+        match = _RANGE_RE.match(range_header.strip())
+        if not match or match.group(1) != "0" or match.group(2) == "1":
+            return
+    get_listening_events().record(user_id, video_id, "play", 0)
+
+
 # ─── Proxy streaming endpoints ───────────────────────────────────────────────
 # These pipe the actual audio/video bytes through the backend so the client
 # doesn't need to hit YouTube's IP-locked URLs directly.
 
 
-@router.get("/stream/audio/{video_id}")
+@router.get("/stream/audio/{video_id}", dependencies=[Depends(rate_limit("stream"))])
 async def stream_audio(
     video_id: str,
     request: Request,
+    quality: str = Query(default="high", pattern="^(low|medium|high|auto)$"),
+    bandwidth: float | None = Query(default=None, gt=0, description="Client bandwidth hint in kbps (for quality=auto)"),
     youtube: YouTubeService = Depends(get_youtube_service),
-    _user_id: str = Depends(get_current_user_id),
+    user_id: str = Depends(get_current_user_id),
 ):
-    """Proxy audio stream through backend."""
+    """Proxy audio stream through backend (or serve it from the pre-download store)."""
     validate_video_id(video_id)
-    return await _proxy_stream(
+    tier = _audio_quality(request, quality, bandwidth)
+    store = get_audio_store()
+    stored = store.lookup(video_id, tier)
+    if stored is not None:
+        response = await _serve_stored(video_id, stored, request, user_id)
+        if response is not None:
+            _record_play(request, user_id, video_id)
+            return response
+        store.forget(video_id, tier)
+    response = await _proxy_stream(
         video_id,
         youtube,
-        youtube.get_audio_stream_url(video_id),
+        youtube.get_audio_stream_url(video_id, tier),
         request,
+        f"audio:{tier}",
+        user_id,
     )
+    _record_play(request, user_id, video_id)
+    return response
 
 
-@router.get("/stream/video/{video_id}")
+@router.get("/stream/video/{video_id}", dependencies=[Depends(rate_limit("stream"))])
 async def stream_video(
     video_id: str,
     request: Request,
     quality: str = Query(default="best", pattern="^(best|1080|720|480|360)$"),
     youtube: YouTubeService = Depends(get_youtube_service),
-    _user_id: str = Depends(get_current_user_id),
+    user_id: str = Depends(get_current_user_id),
 ):
     """Proxy video stream through backend."""
     validate_video_id(video_id)
@@ -140,27 +431,153 @@ async def stream_video(
         youtube,
         youtube.get_video_stream_url(video_id, quality),
         request,
+        f"video:{quality}",
+        user_id,
+    )
+
+
+@router.get("/usage")
+async def get_stream_usage(user_id: str = Depends(get_current_user_id)):
+    """Get the current user's proxy stream and byte counters."""
+    return get_stream_governor().usage(user_id)
+
+
+# ─── HLS endpoints ───────────────────────────────────────────────────────────
+# Adaptive video: the master playlist is fetched and rewritten so every nested
+# playlist and segment URI points back at these endpoints via a signed token.
+# Segments go through a shared LRU, so concurrent viewers share upstream fetches.
+
+_HLS_MEDIA_TYPE = "application/vnd.apple.mpegurl"
+
+
+def _hls_upstream_url(video_id: str, token: str) -> str:
+    url = verify_upstream_token(video_id, token)
+    if url is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid or expired HLS token",
+        )
+    return url
+
+
+def _hls_upstream_failed(video_id: str, e: Exception) -> HTTPException:
+    logger.warning(f"HLS upstream fetch failed for {video_id}: {e}")
+    return HTTPException(
+        status_code=status.HTTP_502_BAD_GATEWAY,
+        detail="Could not fetch HLS resource",
+    )
+
+
+@router.get("/hls/{video_id}/master.m3u8", dependencies=[Depends(rate_limit("stream"))])
+async def hls_master_playlist(
+    video_id: str,
+    quality: str = Query(default="best", pattern="^(best|1080|720|480|360)$"),
+    youtube: YouTubeService = Depends(get_youtube_service),
+    hls: HLSProxy = Depends(get_hls_proxy),
+    _user_id: str = Depends(get_current_user_id),
+):
+    """Serve the (rewritten) HLS playlist for a video."""
+    validate_video_id(video_id)
+    try:
+        stream_info = await youtube.get_video_hls_url(video_id, quality)
+    except HTTPException:
+        raise
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="YouTube extraction timed out — please try again",
+        )
+    except ExtractionFailed as e:
+        raise extraction_error(e)
+    except Exception as e:
+        logger.warning(f"HLS extraction failed for {video_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Could not get HLS stream",
+        )
+
+    if not stream_info.url:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="No HLS stream available",
+        )
+
+    try:
+        playlist = await hls.get_playlist(
+            _get_http_client(), video_id, stream_info.url, stream_info.headers
+        )
+    except (httpx.RequestError, UpstreamError) as e:
+        raise _hls_upstream_failed(video_id, e)
+    return Response(playlist, media_type=_HLS_MEDIA_TYPE)
+
+
+@router.get("/hls/{video_id}/playlist.m3u8")
+async def hls_media_playlist(
+    video_id: str,
+    t: str = Query(..., max_length=4096),
+    hls: HLSProxy = Depends(get_hls_proxy),
+):
+    """Serve a rewritten variant/media playlist (authorised by signed token)."""
+    validate_video_id(video_id)
+    url = _hls_upstream_url(video_id, t)
+    try:
+        playlist = await hls.get_playlist(_get_http_client(), video_id, url)
+    except (httpx.RequestError, UpstreamError) as e:
+        raise _hls_upstream_failed(video_id, e)
+    return Response(playlist, media_type=_HLS_MEDIA_TYPE)
+
+
+@router.get("/hls/{video_id}/segment")
+async def hls_segment(
+    video_id: str,
+    t: str = Query(..., max_length=4096),
+    hls: HLSProxy = Depends(get_hls_proxy),
+):
+    """Serve a media segment from the shared segment cache (authorised by signed token)."""
+    validate_video_id(video_id)
+    url = _hls_upstream_url(video_id, t)
+    try:
+        content_type, body = await hls.get_segment(_get_http_client(), video_id, url)
+    except (httpx.RequestError, UpstreamError) as e:
+        raise _hls_upstream_failed(video_id, e)
+    PROXY_BYTES.labels("hls").inc(len(body))
+    # Segment URLs are immutable for the token lifetime
+    return Response(
+        body,
+        media_type=content_type,
+        headers={"Cache-Control": "private, max-age=3600"},
     )
 
 
 # ─── Metadata endpoints (kept as-is) ─────────────────────────────────────────
 
 
-@router.get("/audio/{video_id}", response_model=StreamInfo)
+@router.get(
+    "/audio/{video_id}",
+    response_model=StreamInfo,
+    dependencies=[Depends(rate_limit("stream"))],
+)
 async def get_audio_stream(
     video_id: str,
+    request: Request,
+    quality: str = Query(default="high", pattern="^(low|medium|high|auto)$"),
+    bandwidth: float | None = Query(default=None, gt=0, description="Client bandwidth hint in kbps (for quality=auto)"),
     youtube: YouTubeService = Depends(get_youtube_service),
     _user_id: str = Depends(get_current_user_id),
 ):
     """Get audio stream URL for a video (direct YouTube URL — may not work cross-IP)."""
     validate_video_id(video_id)
     try:
-        return await youtube.get_audio_stream_url(video_id)
+        return await youtube.get_audio_stream_url(video_id, _audio_quality(request, quality, bandwidth))
+    except HTTPException:
+        raise
     except asyncio.TimeoutError:
         raise HTTPException(
             status_code=status.HTTP_504_GATEWAY_TIMEOUT,
             detail="YouTube extraction timed out — please try again",
         )
+    except ExtractionFailed as e:
+        raise extraction_error(e)
     except Exception as e:
         logger.warning(f"Audio stream failed for {video_id}: {e}")
         raise HTTPException(
@@ -169,7 +586,11 @@ async def get_audio_stream(
         )
 
 
-@router.get("/video/{video_id}", response_model=StreamInfo)
+@router.get(
+    "/video/{video_id}",
+    response_model=StreamInfo,
+    dependencies=[Depends(rate_limit("stream"))],
+)
 async def get_video_stream(
     video_id: str,
     quality: str = Query(default="best", pattern="^(best|1080|720|480|360)$"),
@@ -180,11 +601,15 @@ async def get_video_stream(
     validate_video_id(video_id)
     try:
         return await youtube.get_video_stream_url(video_id, quality)
+    except HTTPException:
+        raise
     except asyncio.TimeoutError:
         raise HTTPException(
             status_code=status.HTTP_504_GATEWAY_TIMEOUT,
             detail="YouTube extraction timed out — please try again",
         )
+    except ExtractionFailed as e:
+        raise extraction_error(e)
     except Exception as e:
         logger.warning(f"Video stream failed for {video_id}: {e}")
         raise HTTPException(
@@ -193,21 +618,29 @@ async def get_video_stream(
         )
 
 
-@router.get("/info/{video_id}")
+@router.get("/info/{video_id}", dependencies=[Depends(rate_limit("info"))])
 async def get_track_info(
     video_id: str,
+    request: Request,
     youtube: YouTubeService = Depends(get_youtube_service),
     _user_id: str = Depends(get_current_user_id),
 ):
     """Get detailed track/video information."""
     validate_video_id(video_id)
     try:
-        return await youtube.get_video_info(video_id)
+        info = await youtube.get_video_info(video_id)
+        # Track metadata barely changes; let clients keep it for an hour and
+        # revalidate by body hash after that
+        return conditional(request, fast_response(request, info), "private, max-age=3600")
+    except HTTPException:
+        raise
     except asyncio.TimeoutError:
         raise HTTPException(
             status_code=status.HTTP_504_GATEWAY_TIMEOUT,
             detail="YouTube extraction timed out — please try again",
         )
+    except ExtractionFailed as e:
+        raise extraction_error(e)
     except Exception as e:
         logger.warning(f"Track info failed for {video_id}: {e}")
         raise HTTPException(
@@ -216,9 +649,10 @@ async def get_track_info(
         )
 
 
-@router.get("/related/{video_id}")
+@router.get("/related/{video_id}", dependencies=[Depends(rate_limit("related"))])
 async def get_related_tracks(
     video_id: str,
+    request: Request,
     limit: int = Query(default=20, ge=1, le=50),
     youtube: YouTubeService = Depends(get_youtube_service),
     _user_id: str = Depends(get_current_user_id),
@@ -227,12 +661,16 @@ async def get_related_tracks(
     validate_video_id(video_id)
     try:
         related = await youtube.get_related_videos(video_id, limit)
-        return {"results": [track.model_dump() for track in related]}
+        return fast_response(request, {"results": _track_results.dump_python(related)})
+    except HTTPException:
+        raise
     except asyncio.TimeoutError:
         raise HTTPException(
             status_code=status.HTTP_504_GATEWAY_TIMEOUT,
             detail="Related videos lookup timed out — please try again",
         )
+    except ExtractionFailed as e:
+        raise extraction_error(e)
     except Exception as e:
         logger.warning(f"Related tracks failed for {video_id}: {e}")
         raise HTTPException(
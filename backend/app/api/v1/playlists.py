@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from typing import List
 
 import logging
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.models.user import Playlist, Track, playlist_tracks
 from app.schemas.user import (
     PlaylistCreate,
@@ -12,20 +12,47 @@ from app.schemas.user import (
     PlaylistResponse,
     PlaylistDetailResponse,
     AddTrackToPlaylist,
-    TrackResponse,
 )
 from app.core.security import get_current_user_id
-from app.services.youtube import get_youtube_service, YouTubeService
+from app.core.http_cache import etag_matches, make_etag, not_modified
+from app.core.responses import fast_response, wants_msgpack
+from app.api.v1.playback import extraction_error
+from app.services.library_search import get_library_search
+from app.services.youtube import ExtractionFailed, get_youtube_service, YouTubeService
 
 router = APIRouter(prefix="/playlists", tags=["Playlists"])
 
+# Clients may reuse a stored copy but must revalidate it (cheap via ETag)
+_PLAYLIST_CACHE_CONTROL = "private, no-cache"
+
 
 @router.get("", response_model=List[PlaylistResponse])
 async def get_user_playlists(
+    request: Request,
+    response: Response,
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get all playlists for the current user."""
+    # Validator from one aggregate query: any playlist created, edited or
+    # deleted, or any track added/removed, changes at least one of these.
+    version = (await db.execute(
+        select(
+            func.count(func.distinct(Playlist.id)),
+            func.max(func.coalesce(Playlist.updated_at, Playlist.created_at)),
+            func.count(playlist_tracks.c.track_id),
+            func.max(playlist_tracks.c.added_at),
+        )
+        .select_from(Playlist)
+        .outerjoin(playlist_tracks, playlist_tracks.c.playlist_id == Playlist.id)
+        .where(Playlist.owner_id == user_id)
+    )).one()
+    etag = make_etag("playlists", user_id, *version)
+    if etag_matches(request, etag):
+        return not_modified(etag, _PLAYLIST_CACHE_CONTROL)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = _PLAYLIST_CACHE_CONTROL
+
     result = await db.execute(
         select(Playlist).where(Playlist.owner_id == user_id)
     )
@@ -87,8 +114,9 @@ async def create_playlist(
 @router.get("/{playlist_id}", response_model=PlaylistDetailResponse)
 async def get_playlist(
     playlist_id: str,
+    request: Request,
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a playlist with its tracks."""
     result = await db.execute(
@@ -107,27 +135,48 @@ async def get_playlist(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view this playlist"
         )
-    
-    # Get tracks in playlist
+
+    # Answer revalidations from the playlist row plus an aggregate over its
+    # tracks, before loading them
+    track_count, last_added, position_sum = (await db.execute(
+        select(
+            func.count(),
+            func.max(playlist_tracks.c.added_at),
+            func.coalesce(func.sum(playlist_tracks.c.position), 0),
+        ).where(playlist_tracks.c.playlist_id == playlist_id)
+    )).one()
+    etag = make_etag(
+        playlist.id,
+        playlist.updated_at or playlist.created_at,
+        track_count,
+        last_added,
+        position_sum,
+        wants_msgpack(request),
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag, _PLAYLIST_CACHE_CONTROL)
+
+    # Get tracks in playlist — plain column rows, serialized directly (no ORM
+    # objects or per-row validation; large playlists dominate this endpoint)
     tracks_result = await db.execute(
-        select(Track)
+        select(Track.id, Track.title, Track.artist, Track.duration, Track.thumbnail)
         .join(playlist_tracks)
         .where(playlist_tracks.c.playlist_id == playlist_id)
         .order_by(playlist_tracks.c.position)
     )
-    tracks = tracks_result.scalars().all()
+    tracks = [row._asdict() for row in tracks_result]
     
-    return PlaylistDetailResponse(
-        id=playlist.id,
-        name=playlist.name,
-        description=playlist.description,
-        cover_image=playlist.cover_image,
-        is_public=playlist.is_public,
-        owner_id=playlist.owner_id,
-        created_at=playlist.created_at,
-        track_count=len(tracks),
-        tracks=[TrackResponse.model_validate(t) for t in tracks],
-    )
+    return fast_response(request, {
+        "id": playlist.id,
+        "name": playlist.name,
+        "description": playlist.description,
+        "cover_image": playlist.cover_image,
+        "is_public": playlist.is_public,
+        "owner_id": playlist.owner_id,
+        "created_at": playlist.created_at,
+        "track_count": len(tracks),
+        "tracks": tracks,
+    }, headers={"ETag": etag, "Cache-Control": _PLAYLIST_CACHE_CONTROL})
 
 
 @router.put("/{playlist_id}", response_model=PlaylistResponse)
@@ -182,6 +231,7 @@ async def delete_playlist(
     
     await db.delete(playlist)
     await db.commit()
+    get_library_search().invalidate(user_id)
 
 
 @router.post("/{playlist_id}/tracks", status_code=status.HTTP_201_CREATED)
@@ -250,11 +300,14 @@ async def add_track_to_playlist(
             )
         )
         await db.commit()
+        get_library_search().invalidate(user_id)
         
         return {"message": "Track added to playlist"}
 
     except HTTPException:
         raise
+    except ExtractionFailed as e:
+        raise extraction_error(e)
     except Exception as e:
         logging.getLogger(__name__).error(f"Error adding track: {e}", exc_info=True)
         raise HTTPException(
@@ -290,3 +343,4 @@ async def remove_track_from_playlist(
         )
     )
     await db.commit()
+    get_library_search().invalidate(user_id)
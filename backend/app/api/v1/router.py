@@ -4,6 +4,12 @@ from app.api.v1.auth import router as auth_router
 from app.api.v1.search import router as search_router
 from app.api.v1.playback import router as playback_router
 from app.api.v1.playlists import router as playlists_router
+from app.api.v1.likes import router as likes_router
+from app.api.v1.library import router as library_router
+from app.api.v1.history import router as history_router
+from app.api.v1.home import router as home_router
+from app.api.v1.thumbnails import router as thumbnails_router
+from app.api.v1.downloads import router as downloads_router
 
 api_router = APIRouter()
 
@@ -11,3 +17,9 @@ api_router.include_router(auth_router)
 api_router.include_router(search_router)
 api_router.include_router(playback_router)
 api_router.include_router(playlists_router)
+api_router.include_router(likes_router)
+api_router.include_router(library_router)
+api_router.include_router(history_router)
+api_router.include_router(home_router)
+api_router.include_router(thumbnails_router)
+api_router.include_router(downloads_router)
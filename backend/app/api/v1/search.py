@@ -1,10 +1,13 @@
 import re
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 
 from app.services.youtube import get_youtube_service, YouTubeService
 from app.schemas.user import SearchResponse, TrackSearchResult, PlaylistSearchResponse, PlaylistTracksResponse
 from app.core.security import get_current_user_id
+from app.core.http_cache import conditional
+from app.core.rate_limit import rate_limit
+from app.core.responses import fast_response
 
 router = APIRouter(prefix="/search", tags=["Search"])
 
@@ -12,8 +15,9 @@ router = APIRouter(prefix="/search", tags=["Search"])
 _PLAYLIST_ID_RE = re.compile(r"^[A-Za-z0-9_-]{2,64}$")
 
 
-@router.get("", response_model=SearchResponse)
+@router.get("", response_model=SearchResponse, dependencies=[Depends(rate_limit("search"))])
 async def search_tracks(
+    request: Request,
     query: str = Query(..., min_length=1, max_length=200, description="Search query"),
     limit: int = Query(default=20, ge=1, le=50, description="Number of results"),
     youtube: YouTubeService = Depends(get_youtube_service),
@@ -22,14 +26,19 @@ async def search_tracks(
     """Search for tracks on YouTube."""
     results = await youtube.search(query, limit)
 
-    return SearchResponse(
-        query=query,
-        results=results,
-        total=len(results),
-    )
+    response = fast_response(request, {
+        "query": query,
+        "results": results,
+        "total": len(results),
+    })
+    return conditional(request, response, "private, max-age=300")
 
 
-@router.get("/playlists", response_model=PlaylistSearchResponse)
+@router.get(
+    "/playlists",
+    response_model=PlaylistSearchResponse,
+    dependencies=[Depends(rate_limit("search"))],
+)
 async def search_playlists(
     query: str = Query(..., min_length=1, max_length=200, description="Search query"),
     limit: int = Query(default=20, ge=1, le=50, description="Number of results"),
@@ -46,9 +55,14 @@ async def search_playlists(
     )
 
 
-@router.get("/playlists/{playlist_id}", response_model=PlaylistTracksResponse)
+@router.get(
+    "/playlists/{playlist_id}",
+    response_model=PlaylistTracksResponse,
+    dependencies=[Depends(rate_limit("search"))],
+)
 async def get_playlist_tracks(
     playlist_id: str,
+    request: Request,
     youtube: YouTubeService = Depends(get_youtube_service),
     _user_id: str = Depends(get_current_user_id),
 ):
@@ -60,10 +74,10 @@ async def get_playlist_tracks(
         )
     data = await youtube.get_playlist_tracks(playlist_id)
 
-    return PlaylistTracksResponse(**data)
+    return conditional(request, fast_response(request, data), "private, max-age=600")
 
 
-@router.get("/suggestions")
+@router.get("/suggestions", dependencies=[Depends(rate_limit("search"))])
 async def get_search_suggestions(
     query: str = Query(..., min_length=1, max_length=100),
     youtube: YouTubeService = Depends(get_youtube_service),
@@ -0,0 +1,43 @@
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+
+from app.core.http_cache import conditional
+from app.core.rate_limit import client_rate_limit
+from app.core.security import validate_video_id
+from app.services.thumbnails import (
+    THUMBNAIL_MAX_AGE,
+    ThumbnailNotFound,
+    ThumbnailService,
+    ThumbnailUpstreamError,
+    get_thumbnail_service,
+    pick_size,
+)
+
+router = APIRouter(prefix="/thumbnails", tags=["Thumbnails"])
+logger = logging.getLogger(__name__)
+
+# No auth: image loaders rarely attach bearer tokens, and these are public
+# YouTube thumbnails — which also lets shared caches and CDNs keep them.
+# Fetches from YouTube are rate limited per client address instead.
+_CACHE_CONTROL = f"public, max-age={THUMBNAIL_MAX_AGE}"
+
+
+@router.get("/{video_id}", dependencies=[Depends(client_rate_limit("thumbnails"))])
+async def get_thumbnail(
+    video_id: str,
+    request: Request,
+    size: int = Query(default=128, ge=1, le=1280, description="Display width in pixels"),
+    thumbnails: ThumbnailService = Depends(get_thumbnail_service),
+):
+    """Get a video thumbnail as WebP, resized to the nearest variant at least ``size`` wide."""
+    validate_video_id(video_id)
+    try:
+        body = await thumbnails.get(video_id, pick_size(size))
+    except ThumbnailNotFound:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Thumbnail not found")
+    except ThumbnailUpstreamError as e:
+        logger.warning(f"Thumbnail for {video_id} failed: {e}")
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Failed to fetch thumbnail")
+
+    return conditional(request, Response(body, media_type="image/webp"), _CACHE_CONTROL)
@@ -0,0 +1,48 @@
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag from cheap version tokens (timestamps, counts, ids).
+
+    Lets an endpoint answer ``If-None-Match`` before loading its body.
+    """
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def body_etag(body: bytes) -> str:
+    """Strong ETag from the exact response bytes."""
+    return f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's ``If-None-Match`` matches ``etag`` (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """Empty 304 carrying the validators a cache needs to refresh its entry."""
+    return Response(
+        status_code=304,
+        headers={"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept"},
+    )
+
+
+def conditional(request: Request, response: Response, cache_control: str, etag: str = None) -> Response:
+    """Tag ``response`` with an ETag (from its body unless given) and
+    Cache-Control, or turn it into a 304 if the client's copy is current."""
+    etag = etag or body_etag(response.body)
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return response
@@ -0,0 +1,158 @@
+from typing import Dict, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# Prometheus metrics, exposed at /metrics. Metric objects live here so any
+# module can import them without cycles; gauges mirroring state owned
+# elsewhere (DB pools) are refreshed at scrape time by render_metrics().
+
+# ─── yt-dlp extraction ───────────────────────────────────────────────────────
+
+EXTRACTION_SECONDS = Histogram(
+    "ytdlp_extraction_seconds",
+    "Wall time of yt-dlp extractions, including executor queueing",
+    ["operation"],
+    buckets=(0.25, 0.5, 1, 2, 3, 5, 8, 12, 20, 30),
+)
+EXTRACTION_TIMEOUTS = Counter(
+    "ytdlp_extraction_timeouts_total", "Extractions that hit their timeout", ["operation"]
+)
+EXTRACTION_ERRORS = Counter(
+    "ytdlp_extraction_errors_total", "Extractions that raised", ["operation"]
+)
+EXTRACTION_FAILURES = Counter(
+    "ytdlp_extraction_failures_total", "Video extractions that failed, by classified reason", ["kind"]
+)
+NEGATIVE_CACHE_HITS = Counter(
+    "ytdlp_negative_cache_hits_total", "Requests failed fast from the negative cache", ["kind"]
+)
+EXECUTOR_QUEUED = Gauge("ytdlp_executor_queued", "Extractions waiting for a worker thread")
+EXECUTOR_ACTIVE = Gauge("ytdlp_executor_active", "Worker threads currently running an extraction")
+EXTRACTIONS_ABANDONED = Counter(
+    "ytdlp_extractions_abandoned_total",
+    "Running extractions whose caller gave up (timeout or disconnect) and were told to abort",
+    ["operation"],
+)
+EXTRACTIONS_ABORTED = Counter(
+    "ytdlp_extractions_aborted_total", "Abandoned extractions that stopped at the abort hook"
+)
+EXECUTOR_ABANDONED = Gauge(
+    "ytdlp_executor_abandoned", "Worker threads still held by an abandoned extraction"
+)
+
+# ─── Search ──────────────────────────────────────────────────────────────────
+
+SEARCH_REQUESTS = Counter(
+    "search_requests_total",
+    "Searches by backend that served them; fallback_* are native searches retried on yt-dlp",
+    ["outcome"],
+)
+
+# ─── Thumbnails ──────────────────────────────────────────────────────────────
+
+THUMBNAIL_REQUESTS = Counter(
+    "thumbnail_requests_total",
+    "Thumbnail requests by where they were served from (memory, disk, coalesced, upstream, not_found)",
+    ["source"],
+)
+
+# ─── Listening history ───────────────────────────────────────────────────────
+
+LISTENING_EVENTS = Counter(
+    "listening_events_total",
+    "Listening events by outcome: buffered, written, failed (write retried) or dropped",
+    ["outcome"],
+)
+LISTENING_EVENTS_PENDING = Gauge(
+    "listening_events_pending", "Listening events buffered but not yet written"
+)
+
+# ─── Home feed ───────────────────────────────────────────────────────────────
+
+HOME_FEED_REQUESTS = Counter(
+    "home_feed_requests_total", "GET /home by cache state: fresh, stale or miss", ["state"]
+)
+HOME_FEED_BUILDS = Counter("home_feed_builds_total", "Background home feed builds", ["outcome"])
+
+# ─── Stream URL cache ────────────────────────────────────────────────────────
+
+STREAM_CACHE_HITS = Counter("stream_cache_hits_total", "Stream URL cache hits", ["kind"])
+STREAM_CACHE_MISSES = Counter("stream_cache_misses_total", "Stream URL cache misses", ["kind"])
+STREAM_CACHE_EVICTIONS = Counter("stream_cache_evictions_total", "Expired stream URL entries removed")
+STREAM_CACHE_REFRESHES = Counter(
+    "stream_cache_refreshes_total", "Hot entries re-resolved ahead of expiry", ["outcome"]
+)
+STREAM_CACHE_MISSES_AVOIDED = Counter(
+    "stream_cache_misses_avoided_total", "Hits that would have been cold misses without refresh-ahead"
+)
+
+# ─── Proxy ───────────────────────────────────────────────────────────────────
+
+PROXY_BYTES = Counter("proxy_bytes_out_total", "Bytes streamed to clients by the proxy", ["kind"])
+PROXY_TTFB_SECONDS = Histogram(
+    "proxy_time_to_first_byte_seconds",
+    "Time from request to the first proxied body chunk",
+    ["kind"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15),
+)
+PROXY_ACTIVE_STREAMS = Gauge("proxy_active_streams", "Proxied streams currently open", ["kind"])
+STREAM_MUX_UPSTREAMS = Counter(
+    "stream_mux_upstreams_opened_total",
+    "Upstream connections opened by the stream multiplexer (new, or resume after detaching)",
+    ["reason"],
+)
+STREAM_MUX_JOINS = Counter(
+    "stream_mux_shared_joins_total", "Requests served from an already open shared upstream"
+)
+STREAM_MUX_DETACHES = Counter(
+    "stream_mux_detaches_total", "Subscribers that fell behind the shared buffer and detached"
+)
+STREAM_MUX_SHARED = Gauge("stream_mux_shared_streams", "Shared upstream streams currently open")
+
+# ─── Rate limiting ───────────────────────────────────────────────────────────
+
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections_total", "Requests refused with 429 by admission control", ["endpoint"]
+)
+
+# ─── Password hashing ────────────────────────────────────────────────────────
+
+PASSWORD_HASH_QUEUED = Gauge("password_hash_queued", "Password hashes waiting for a worker thread")
+PASSWORD_HASH_ACTIVE = Gauge("password_hash_active", "Worker threads currently hashing a password")
+PASSWORD_HASH_WAIT_SECONDS = Histogram(
+    "password_hash_wait_seconds",
+    "Time password hashes wait for a worker thread",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total", "Password hashes refused with 503 because the pool was full"
+)
+
+# ─── Database ────────────────────────────────────────────────────────────────
+
+DB_SESSION_SECONDS = Histogram(
+    "db_session_seconds",
+    "Lifetime of request-scoped database sessions",
+    ["role"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+DB_CONNECTION_HOLD_SECONDS = Histogram(
+    "db_connection_hold_seconds",
+    "Time pooled connections stay checked out",
+    ["role"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+DB_POOL = Gauge("db_pool_connections", "Connection pool state", ["role", "state"])
+
+
+def _refresh_pool_gauges(pool_stats: Dict[str, Dict[str, float]]) -> None:
+    for role, stats in pool_stats.items():
+        for state in ("size", "checkedin", "checkedout", "overflow"):
+            if state in stats:
+                DB_POOL.labels(role, state).set(stats[state])
+
+
+def render_metrics(pool_stats: Dict[str, Dict[str, float]]) -> Tuple[bytes, str]:
+    """Return the exposition body and its content type."""
+    _refresh_pool_gauges(pool_stats)
+    return generate_latest(), CONTENT_TYPE_LATEST
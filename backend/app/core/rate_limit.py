@@ -0,0 +1,207 @@
+import logging
+import math
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+
+from app.config import get_settings
+from app.core.metrics import RATE_LIMIT_REJECTIONS
+from app.core.security import get_current_user_id
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(HTTPException):
+    """429 with a Retry-After telling the client when a token is available."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests — please slow down",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+class MemoryBuckets:
+    """Token buckets in process memory (single worker)."""
+
+    MAX_KEYS = 10000
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # key -> (tokens, updated_at)
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """Take one token; return 0 if admitted, else seconds until one is available."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            wait = 0.0
+        else:
+            self._buckets[key] = (tokens, now)
+            wait = (1 - tokens) / rate
+        if len(self._buckets) > self.MAX_KEYS:
+            self._prune(now, rate, burst)
+        return wait
+
+    def _prune(self, now: float, rate: float, burst: int) -> None:
+        # Buckets that have refilled completely carry no state worth keeping
+        full = [k for k, (t, u) in self._buckets.items() if t + (now - u) * rate >= burst]
+        for k in full:
+            del self._buckets[k]
+
+
+# Refill and take atomically on the Redis server, using its clock so every
+# worker agrees on elapsed time. Returns the wait as a string (Lua numbers
+# are truncated to integers in replies).
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RedisBuckets:
+    """Token buckets shared by all workers through Redis.
+
+    Fails open: if Redis is unreachable the request is admitted, so an outage
+    of the limiter never takes playback down with it.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self._script = None
+
+    def _get_script(self):
+        if self._script is None:
+            import redis.asyncio as redis
+
+            client = redis.from_url(self.url, socket_timeout=0.5, socket_connect_timeout=0.5)
+            self._script = client.register_script(_TAKE_SCRIPT)
+        return self._script
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        try:
+            wait = await self._get_script()(keys=[f"ratelimit:{key}"], args=[rate, burst])
+            return float(wait)
+        except Exception as e:
+            logger.warning(f"Rate limiter Redis call failed, admitting request: {e}")
+            return 0.0
+
+
+class RateLimiter:
+    """Per-user, per-endpoint token-bucket admission.
+
+    Each endpoint group has a sustained rate (requests per minute) and a
+    burst size; ``RATE_LIMIT_OVERRIDES`` adjusts individual groups.
+    """
+
+    def __init__(self, backend, per_minute: int, burst: int, overrides: Dict[str, Tuple[int, int]]):
+        self.backend = backend
+        self.default = (per_minute, burst)
+        self.overrides = overrides
+        self.rejected = 0
+
+    def limits(self, endpoint: str) -> Tuple[int, int]:
+        return self.overrides.get(endpoint, self.default)
+
+    async def check(self, user_id: str, endpoint: str) -> None:
+        """Charge one token to ``user_id`` for ``endpoint`` or raise :class:`RateLimitExceeded`."""
+        per_minute, burst = self.limits(endpoint)
+        if per_minute <= 0:
+            return
+        wait = await self.backend.take(f"{endpoint}:{user_id}", per_minute / 60.0, max(burst, 1))
+        if wait > 0:
+            self.rejected += 1
+            RATE_LIMIT_REJECTIONS.labels(endpoint).inc()
+            raise RateLimitExceeded(wait)
+
+
+def _parse_overrides(value: str) -> Dict[str, Tuple[int, int]]:
+    """Parse ``"related=12/4,search=30/10"`` into ``{endpoint: (per_minute, burst)}``."""
+    overrides = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        endpoint, _, limits = item.partition("=")
+        per_minute, _, burst = limits.partition("/")
+        overrides[endpoint.strip()] = (int(per_minute), int(burst or per_minute))
+    return overrides
+
+
+class _Admission:
+    __slots__ = ("user_id", "endpoint", "charged")
+
+    def __init__(self, user_id: str, endpoint: str):
+        self.user_id = user_id
+        self.endpoint = endpoint
+        self.charged = False
+
+
+# Set per request by the ``rate_limit`` dependency; consulted by the
+# extraction layer so only cache misses spend tokens.
+_admission: ContextVar[Optional[_Admission]] = ContextVar("rate_limit_admission", default=None)
+
+
+# Singleton instance
+rate_limiter = RateLimiter(
+    backend=RedisBuckets(settings.REDIS_URL) if settings.RATE_LIMIT_BACKEND == "redis" else MemoryBuckets(),
+    per_minute=settings.RATE_LIMIT_PER_MINUTE,
+    burst=settings.RATE_LIMIT_BURST,
+    overrides=_parse_overrides(settings.RATE_LIMIT_OVERRIDES),
+)
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the rate limiter instance."""
+    return rate_limiter
+
+
+def rate_limit(endpoint: str):
+    """Dependency factory marking a route as extraction-backed under ``endpoint``.
+
+    Nothing is charged here — the token is taken by :func:`admit_extraction`
+    when the request actually misses the caches and goes to YouTube.
+    """
+    async def dependency(user_id: str = Depends(get_current_user_id)) -> None:
+        if settings.RATE_LIMIT_ENABLED:
+            _admission.set(_Admission(user_id, endpoint))
+
+    return dependency
+
+
+def client_rate_limit(endpoint: str):
+    """:func:`rate_limit` for unauthenticated routes: buckets are per client address."""
+    async def dependency(request: Request) -> None:
+        if settings.RATE_LIMIT_ENABLED:
+            host = request.client.host if request.client else "unknown"
+            _admission.set(_Admission(f"ip:{host}", endpoint))
+
+    return dependency
+
+
+async def admit_extraction() -> None:
+    """Charge the current request's bucket, at most once per request."""
+    admission = _admission.get()
+    if admission is None or admission.charged:
+        return
+    admission.charged = True
+    await rate_limiter.check(admission.user_id, admission.endpoint)
@@ -0,0 +1,59 @@
+from datetime import date, datetime
+from typing import Any, Optional
+
+import orjson
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from app.core.timing import phase
+
+try:
+    import msgpack
+except ImportError:  # MessagePack is optional — JSON is always available
+    msgpack = None
+
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+
+
+def _orjson_default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _msgpack_default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Type is not MessagePack serializable: {type(obj).__name__}")
+
+
+def wants_msgpack(request: Request) -> bool:
+    """True if the client asked for MessagePack and it's available."""
+    return msgpack is not None and MSGPACK_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def fast_response(
+    request: Request,
+    content: Any,
+    status_code: int = 200,
+    headers: Optional[dict] = None,
+) -> Response:
+    """Serialize plain dicts/lists (or models) straight to bytes.
+
+    Returning a ``Response`` skips FastAPI's ``response_model`` validation and
+    stdlib JSON encoding, so large payloads built from ORM rows or search
+    dicts are encoded exactly once. Clients that send
+    ``Accept: application/x-msgpack`` get MessagePack instead of JSON.
+    """
+    with phase("serialize"):
+        if wants_msgpack(request):
+            body = msgpack.packb(content, default=_msgpack_default)
+            media_type = MSGPACK_MEDIA_TYPE
+        else:
+            body = orjson.dumps(content, default=_orjson_default, option=orjson.OPT_UTC_Z)
+            media_type = "application/json"
+    response = Response(body, status_code=status_code, media_type=media_type, headers=headers)
+    response.headers["Vary"] = "Accept"
+    return response
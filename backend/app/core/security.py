@@ -1,19 +1,35 @@
+import asyncio
 import hashlib
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
 from app.config import get_settings
+from app.core.metrics import (
+    PASSWORD_HASH_ACTIVE,
+    PASSWORD_HASH_QUEUED,
+    PASSWORD_HASH_REJECTED,
+    PASSWORD_HASH_WAIT_SECONDS,
+)
+from app.core.timing import phase
 
 settings = get_settings()
 
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/login")
 
+# Verified-token cache: { sha256(token): (payload, exp) }. Media players send
+# dozens of Range requests per track with the same token, so a hit skips the
+# HMAC check and claims parsing. Only the digest is kept, never the token.
+_token_cache: Dict[bytes, Tuple[dict, float]] = {}
+
 # YouTube video IDs are exactly 11 chars: alphanumeric, dash, underscore
 VIDEO_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{11}$")
 
@@ -41,6 +57,102 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(pre_hashed)
 
 
+class PasswordHashPool:
+    """Bounded worker pool for password hashing.
+
+    pbkdf2 takes tens of milliseconds per call; running it on the event loop
+    stalls every concurrent request (including proxied audio streams) during
+    a login storm. hashlib releases the GIL while hashing, so a small thread
+    pool gives real parallelism. Work beyond ``max_pending`` is rejected with
+    503 instead of queueing without bound. Queue depth, wait time and
+    rejections are exported as ``password_hash_*`` metrics.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwhash")
+        self._lock = threading.Lock()  # guards counters touched from worker threads
+        self.pending = 0  # queued + running
+        self.active = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0  # seconds spent queued, summed
+
+    async def run(self, fn, *args):
+        with self._lock:
+            full = self.pending >= self.max_pending
+            if full:
+                self.rejected += 1
+            else:
+                self.pending += 1
+        if full:
+            PASSWORD_HASH_REJECTED.inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy — please try again",
+                headers={"Retry-After": "1"},
+            )
+        PASSWORD_HASH_QUEUED.inc()
+        submitted = time.perf_counter()
+
+        def job():
+            wait = time.perf_counter() - submitted
+            PASSWORD_HASH_QUEUED.dec()
+            PASSWORD_HASH_ACTIVE.inc()
+            PASSWORD_HASH_WAIT_SECONDS.observe(wait)
+            with self._lock:
+                self.total_wait += wait
+                self.active += 1
+            try:
+                return fn(*args)
+            finally:
+                PASSWORD_HASH_ACTIVE.dec()
+                with self._lock:
+                    self.active -= 1
+
+        def done(future):
+            # When the hash is really over: a request that gives up (client
+            # disconnect) cancels only a job that hasn't started yet
+            if future.cancelled():
+                PASSWORD_HASH_QUEUED.dec()
+            with self._lock:
+                self.pending -= 1
+                if not future.cancelled():
+                    self.completed += 1
+
+        future = self._executor.submit(job)
+        future.add_done_callback(done)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "queued": max(self.pending - self.active, 0),
+            "active": self.active,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait / self.completed * 1000, 3) if self.completed else 0.0,
+        }
+
+
+password_hash_pool = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash in the password hashing pool."""
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the password hashing pool."""
+    return await password_hash_pool.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -60,10 +172,16 @@ def create_refresh_token(data: dict) -> str:
 
 
 def decode_token(token: str) -> dict:
-    """Decode and validate a JWT token."""
+    """Decode and validate a JWT token (cached until the token's ``exp``)."""
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    entry = _token_cache.get(key)
+    if entry is not None:
+        if time.time() < entry[1]:
+            return entry[0]
+        _token_cache.pop(key, None)
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -71,10 +189,19 @@ def decode_token(token: str) -> dict:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    exp = payload.get("exp")
+    if settings.TOKEN_CACHE_SIZE > 0 and isinstance(exp, (int, float)):
+        if len(_token_cache) >= settings.TOKEN_CACHE_SIZE:
+            # Evict the oldest entry (dicts keep insertion order)
+            _token_cache.pop(next(iter(_token_cache)), None)
+        _token_cache[key] = (payload, exp)
+    return payload
+
 
 async def get_current_user_id(token: str = Depends(oauth2_scheme)) -> str:
     """Dependency to get current user ID from token."""
-    payload = decode_token(token)
+    with phase("auth"):
+        payload = decode_token(token)
     user_id: str = payload.get("sub")
     if user_id is None:
         raise HTTPException(
@@ -0,0 +1,57 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfile:
+    """Wall-clock breakdown of a cold start, from the first app import to ready.
+
+    ``import`` covers loading the application modules, up to the lifespan
+    starting; later phases are recorded as they run.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.listening_at: Optional[float] = None
+        self.ready_at: Optional[float] = None
+
+    def mark(self, name: str, seconds: float) -> None:
+        self.phases[name] = seconds
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark(name, time.perf_counter() - started)
+
+    def mark_imported(self) -> None:
+        self.mark("import", time.perf_counter() - self.started)
+
+    def mark_listening(self) -> None:
+        self.listening_at = time.perf_counter()
+
+    def mark_ready(self) -> None:
+        self.ready_at = time.perf_counter()
+        logger.info(f"Startup profile: {self.as_dict()}")
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_at is not None
+
+    def as_dict(self) -> dict:
+        report = {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()}
+        if self.listening_at is not None:
+            report["listening_after"] = round((self.listening_at - self.started) * 1000, 1)
+        if self.ready_at is not None:
+            report["ready_after"] = round((self.ready_at - self.started) * 1000, 1)
+        return {"phases_ms": report}
+
+
+# Created on first import — app.main imports this module before anything else
+startup_profile = StartupProfile()
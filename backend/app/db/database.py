@@ -1,14 +1,102 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import time
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from app.config import get_settings
+from app.core.metrics import DB_CONNECTION_HOLD_SECONDS, DB_SESSION_SECONDS
+from app.core.timing import record as record_timing
 
 settings = get_settings()
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=False,  # Never log SQL in production; set DEBUG_SQL=1 env var if needed locally
-    future=True,
-)
+
+def _create_engine(url: str) -> AsyncEngine:
+    """Create an async engine with pool and statement-cache settings applied."""
+    db_url = make_url(url)
+    options = {
+        "echo": False,  # Never log SQL in production; set DEBUG_SQL=1 env var if needed locally
+        "future": True,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    # SQLite uses its own pool classes, which don't take sizing options
+    if db_url.get_backend_name() != "sqlite":
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    if db_url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+        db_url = db_url.update_query_dict(
+            {"prepared_statement_cache_size": str(settings.DB_PREPARED_STATEMENT_CACHE_SIZE)}
+        )
+    return create_async_engine(db_url, **options)
+
+
+class PoolUsage:
+    """Checkout counters and connection hold times for one engine's pool."""
+
+    def __init__(self, engine: AsyncEngine, role: str):
+        self.engine = engine
+        self._hold_seconds = DB_CONNECTION_HOLD_SECONDS.labels(role)
+        self.checkouts = 0
+        self.connects = 0
+        self.total_hold = 0.0  # seconds connections spent checked out, summed
+        pool = engine.sync_engine.pool
+        event.listen(pool, "connect", self._on_connect)
+        event.listen(pool, "checkout", self._on_checkout)
+        event.listen(pool, "checkin", self._on_checkin)
+
+    def _on_connect(self, dbapi_conn, record):
+        self.connects += 1
+
+    def _on_checkout(self, dbapi_conn, record, proxy):
+        self.checkouts += 1
+        record.info["checked_out_at"] = time.perf_counter()
+
+    def _on_checkin(self, dbapi_conn, record):
+        started = record.info.pop("checked_out_at", None)
+        if started is not None:
+            held = time.perf_counter() - started
+            self.total_hold += held
+            self._hold_seconds.observe(held)
+
+    def stats(self) -> Dict[str, float]:
+        pool = self.engine.pool
+        stats = {
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "avg_hold_ms": round(self.total_hold / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+        }
+        # QueuePool exposes live sizing; SQLite's StaticPool doesn't
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            fn = getattr(pool, name, None)
+            if callable(fn):
+                stats[name] = fn()
+        return stats
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started_at"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("query_started_at", None)
+    if started is not None:
+        record_timing("db", time.perf_counter() - started)
+
+
+def _time_queries(engine: AsyncEngine) -> None:
+    """Charge statement execution time to the current request's ``db`` phase."""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+engine = _create_engine(settings.DATABASE_URL)
 
 async_session = async_sessionmaker(
     engine,
@@ -16,6 +104,27 @@ async_session = async_sessionmaker(
     expire_on_commit=False,
 )
 
+# Read replica — used by read-only endpoints via get_read_db. Without a
+# replica URL it is simply the primary.
+replica_engine = _create_engine(settings.DATABASE_REPLICA_URL) if settings.DATABASE_REPLICA_URL else engine
+
+async_replica_session = async_sessionmaker(
+    replica_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+# INSERT ... ON CONFLICT DO NOTHING for the configured database
+insert_new = postgresql.insert if engine.dialect.name == "postgresql" else sqlite.insert
+
+_time_queries(engine)
+if replica_engine is not engine:
+    _time_queries(replica_engine)
+
+_pool_usage = {"primary": PoolUsage(engine, "primary")}
+if replica_engine is not engine:
+    _pool_usage["replica"] = PoolUsage(replica_engine, "replica")
+
 
 class Base(DeclarativeBase):
     """Base class for all database models."""
@@ -24,14 +133,38 @@ class Base(DeclarativeBase):
 
 async def get_db():
     """Dependency to get database session."""
+    started = time.perf_counter()
     async with async_session() as session:
         try:
             yield session
         finally:
             await session.close()
+            DB_SESSION_SECONDS.labels("primary").observe(time.perf_counter() - started)
+
+
+async def get_read_db():
+    """Dependency to get a read-only database session (replica if configured).
+
+    Replicas can lag the primary slightly, so only use this where reading a
+    just-written row isn't required.
+    """
+    started = time.perf_counter()
+    async with async_replica_session() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+            DB_SESSION_SECONDS.labels("replica").observe(time.perf_counter() - started)
+
+
+def get_pool_stats() -> Dict[str, Dict[str, float]]:
+    """Pool usage for the primary (and replica, if configured) engine."""
+    return {name: usage.stats() for name, usage in _pool_usage.items()}
 
 
 async def init_db():
-    """Initialize database tables."""
+    """Initialize database tables (development only — production uses Alembic)."""
+    if not (settings.DEBUG or settings.DB_AUTO_CREATE):
+        return
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
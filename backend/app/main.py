@@ -1,3 +1,10 @@
+# Imported first so the startup profile's clock covers loading everything else
+from app.core.startup import startup_profile
+
+import asyncio
+import json
+import logging
+
 from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
@@ -5,17 +12,57 @@ from contextlib import asynccontextmanager
 
 from app.config import get_settings
 from app.api.v1.router import api_router
-from app.db.database import init_db
+from app.core.metrics import render_metrics
+from app.core.timing import start_request
+from app.db.database import init_db, get_pool_stats
+from app.services.audio_store import get_audio_store
+from app.services.downloads import get_download_manager
+from app.services.home_feed import get_home_feed
+from app.services.innertube import get_innertube_search
+from app.services.listening import get_listening_events
+from app.services.thumbnails import get_thumbnail_service
+from app.services.youtube import get_stream_refresher, get_youtube_service, is_extraction_warm
 
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+async def _warm_up_extraction():
+    """Load yt-dlp after the server is listening; /ready flips when done."""
+    try:
+        await get_youtube_service().warm_up()
+    except Exception as e:
+        # Requests still load yt-dlp on demand, but stay unready so the
+        # orchestrator doesn't route traffic to a broken extractor
+        logger.error(f"yt-dlp warm-up failed: {e}", exc_info=True)
+        return
+    startup_profile.mark_ready()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events."""
-    await init_db()
+    startup_profile.mark_imported()
+    with startup_profile.phase("init_db"):
+        await init_db()
+    warm_up = asyncio.create_task(_warm_up_extraction())
+    get_stream_refresher().start()
+    with startup_profile.phase("audio_store"):
+        await get_audio_store().load()
+    get_download_manager().start()
+    get_listening_events().start()
+    get_home_feed().start()
+    startup_profile.mark_listening()
     yield
+    get_stream_refresher().stop()
+    await get_download_manager().stop()
+    await get_home_feed().stop()
+    # Write out buffered history before the process (and DB pool) goes away
+    await get_listening_events().stop()
+    warm_up.cancel()
+    await get_innertube_search().close()
+    await get_thumbnail_service().close()
 
 
 app = FastAPI(
@@ -33,8 +80,8 @@ app.add_middleware(
     allow_origins=settings.cors_origins_list,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["Authorization", "Content-Type", "Range"],
-    expose_headers=["Content-Range", "Accept-Ranges", "Content-Length"],
+    allow_headers=["Authorization", "Content-Type", "Range", "Downlink", "If-None-Match"],
+    expose_headers=["Content-Range", "Accept-Ranges", "Content-Length", "ETag", "Server-Timing"],
 )
 
 
@@ -53,6 +100,31 @@ async def add_security_headers(request: Request, call_next):
     return response
 
 
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    """Attach per-phase timings (auth, db, queue, ytdlp, cache, serialize,
+    upstream) as a Server-Timing header and log slow requests.
+
+    For streamed responses this covers the time to the response headers,
+    not the body.
+    """
+    if not settings.SERVER_TIMING_ENABLED:
+        return await call_next(request)
+    timings = start_request()
+    response: Response = await call_next(request)
+    response.headers["Server-Timing"] = timings.header()
+    elapsed_ms = timings.elapsed() * 1000
+    if settings.SLOW_REQUEST_LOG_MS and elapsed_ms >= settings.SLOW_REQUEST_LOG_MS:
+        logger.warning("Slow request " + json.dumps({
+            "method": request.method,
+            "path": request.url.path,
+            "status": response.status_code,
+            "total_ms": round(elapsed_ms, 1),
+            "phases_ms": timings.as_dict(),
+        }))
+    return response
+
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
@@ -61,3 +133,25 @@ app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy", "version": settings.APP_VERSION}
+
+
+@app.get("/ready")
+async def readiness_check(response: Response):
+    """Readiness probe — 503 until yt-dlp is loaded and warm (``/health`` is liveness)."""
+    ready = is_extraction_warm()
+    if not ready:
+        response.status_code = 503
+    return {"status": "ready" if ready else "warming", "startup": startup_profile.as_dict()}
+
+
+@app.get("/health/db")
+async def db_health_check():
+    """Database connection pool usage."""
+    return {"pools": get_pool_stats()}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics."""
+    body, content_type = render_metrics(get_pool_stats())
+    return Response(body, media_type=content_type)
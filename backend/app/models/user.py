@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Table, Integer
+from sqlalchemy import Column, DDL, String, DateTime, Boolean, ForeignKey, Table, Integer, Index, event, literal_column
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from datetime import datetime, timezone
 import uuid
 
 from app.db.database import Base
@@ -14,6 +15,7 @@ playlist_tracks = Table(
     Column("track_id", String, ForeignKey("tracks.id"), primary_key=True),
     Column("position", Integer, nullable=False, default=0),
     Column("added_at", DateTime(timezone=True), server_default=func.now()),
+    Index("ix_playlist_tracks_playlist_id_position", "playlist_id", "position"),
 )
 
 
@@ -43,15 +45,39 @@ class Playlist(Base):
     description = Column(String, nullable=True)
     cover_image = Column(String, nullable=True)
     is_public = Column(Boolean, default=False)
-    owner_id = Column(String, ForeignKey("users.id"), nullable=False)
+    owner_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Stamped in Python for sub-second precision on every backend — it feeds
+    # the playlist ETags, which must change on each edit
+    updated_at = Column(DateTime(timezone=True), onupdate=lambda: datetime.now(timezone.utc))
 
     # Relationships
     owner = relationship("User", back_populates="playlists")
     tracks = relationship("Track", secondary=playlist_tracks, back_populates="playlists")
 
 
+# unaccent() is only STABLE, so it can't be indexed directly; this wrapper
+# pins the dictionary (see migration 0006)
+IMMUTABLE_UNACCENT = (
+    "CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text "
+    "LANGUAGE sql IMMUTABLE PARALLEL SAFE "
+    "AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$"
+)
+
+
+def _search_text(title, artist):
+    # Literals rather than bind parameters, so library search queries repeat
+    # the indexed expression exactly and the planner can match it. Accents
+    # are folded like the in-memory index does ("beyonce" finds "Beyoncé").
+    empty = literal_column("''", String)
+    text = func.coalesce(title, empty) + literal_column("' '", String) + func.coalesce(artist, empty)
+    return func.immutable_unaccent(text, type_=String)
+
+
+def _search_vector(title, artist):
+    return func.to_tsvector(literal_column("'simple'"), _search_text(title, artist))
+
+
 class Track(Base):
     """Cached track metadata from YouTube."""
     __tablename__ = "tracks"
@@ -63,13 +89,49 @@ class Track(Base):
     thumbnail = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Library search (PostgreSQL only): full-text prefix matching and pg_trgm
+    # similarity for typos over title and artist
+    __table_args__ = (
+        Index(
+            "ix_tracks_search_tsv",
+            _search_vector(title, artist),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_tracks_search_trgm",
+            _search_text(title, artist).label("search_text"),
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
     # Relationships
     playlists = relationship("Playlist", secondary=playlist_tracks, back_populates="tracks")
 
 
+# The search indexes need the extensions and the unaccent wrapper
+event.listen(
+    Track.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+event.listen(
+    Track.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS unaccent").execute_if(dialect="postgresql"),
+)
+event.listen(Track.__table__, "before_create", DDL(IMMUTABLE_UNACCENT).execute_if(dialect="postgresql"))
+TRACK_SEARCH_TEXT = _search_text(Track.__table__.c.title, Track.__table__.c.artist)
+TRACK_SEARCH_VECTOR = _search_vector(Track.__table__.c.title, Track.__table__.c.artist)
+
+
 class LikedTrack(Base):
     """User's liked tracks."""
     __tablename__ = "liked_tracks"
+    __table_args__ = (
+        Index("uq_liked_tracks_user_id_track_id", "user_id", "track_id", unique=True),
+        Index("ix_liked_tracks_user_id_liked_at_id", "user_id", "liked_at", "id"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -78,3 +140,23 @@ class LikedTrack(Base):
 
     # Relationships
     user = relationship("User", back_populates="liked_tracks")
+
+
+class ListeningEvent(Base):
+    """One play, skip or completion of a track by a user.
+
+    Written in batches by the listening event buffer, so ``occurred_at`` is
+    set by the app when the event happens, not at insert time.
+    """
+    __tablename__ = "listening_events"
+    __table_args__ = (
+        Index("ix_listening_events_user_id_occurred_at", "user_id", "occurred_at"),
+    )
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    # Not a foreign key: tracks played from search results have no Track row
+    track_id = Column(String, nullable=False)
+    event = Column(String, nullable=False)  # play, skip, complete
+    position = Column(Integer, nullable=True)  # Seconds into the track
+    occurred_at = Column(DateTime(timezone=True), nullable=False)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 
 
@@ -96,6 +96,29 @@ class AddTrackToPlaylist(BaseModel):
     position: Optional[int] = None
 
 
+# Like Schemas
+class LikeTrack(BaseModel):
+    track_id: str
+
+
+class LikedTrackResponse(BaseModel):
+    track: TrackResponse
+    liked_at: datetime
+
+
+class LikedTracksPage(BaseModel):
+    items: List[LikedTrackResponse]
+    next_cursor: Optional[str] = None
+
+
+class LikedStatusRequest(BaseModel):
+    track_ids: List[str] = Field(..., min_length=1, max_length=100)
+
+
+class LikedStatusResponse(BaseModel):
+    liked: Dict[str, bool]
+
+
 # Search Schemas
 class SearchQuery(BaseModel):
     query: str = Field(..., min_length=1, max_length=200)
@@ -108,6 +131,12 @@ class SearchResponse(BaseModel):
     total: int
 
 
+class LibrarySearchResponse(BaseModel):
+    query: str
+    results: List[TrackResponse]
+    total: int
+
+
 # YouTube Playlist Search Schemas
 class YouTubePlaylistResult(BaseModel):
     id: str
@@ -141,3 +170,60 @@ class StreamInfo(BaseModel):
     thumbnail: Optional[str] = None
     expires_at: Optional[datetime] = None
     headers: Optional[dict] = None
+    quality: Optional[str] = None  # Audio tier the URL was resolved for
+    bitrate: Optional[float] = None  # Average bitrate in kbps, when known
+
+
+# Download Schemas
+class DownloadJobCreate(BaseModel):
+    quality: str = Field(default="high", pattern="^(low|medium|high)$")
+
+
+class DownloadTrackStatus(BaseModel):
+    video_id: str
+    state: str  # pending, downloading, done, failed, skipped
+    bytes_done: int
+    bytes_total: Optional[int] = None
+    error: Optional[str] = None
+
+
+class DownloadJobResponse(BaseModel):
+    id: str
+    playlist_id: str
+    quality: str
+    status: str  # queued, running, completed, failed, cancelled
+    total_tracks: int
+    completed_tracks: int
+    failed_tracks: int
+    bytes_done: int
+    tracks: List[DownloadTrackStatus]
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+# Listening History Schemas
+class ListeningEventCreate(BaseModel):
+    track_id: str
+    event: str = Field(..., pattern="^(play|skip|complete)$")
+    position: Optional[int] = Field(default=None, ge=0, description="Seconds into the track")
+
+
+class ListeningEventResponse(BaseModel):
+    track_id: str
+    event: str
+    position: Optional[int] = None
+    occurred_at: datetime
+    track: Optional[TrackResponse] = None
+
+
+# Home Feed Schemas
+class HomeSection(BaseModel):
+    id: str
+    title: str
+    tracks: List[TrackSearchResult]
+
+
+class HomeFeedResponse(BaseModel):
+    sections: List[HomeSection]
+    built_at: Optional[datetime] = None
+    stale: bool = False
@@ -0,0 +1,288 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from app.config import get_settings
+from app.schemas.user import StreamInfo
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Buffered before each write so the event loop hands the disk big blocks
+_WRITE_BATCH = 1024 * 1024
+_CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+|\*)$")
+
+
+class AudioDownloadError(Exception):
+    """Downloading a track's audio into the store failed."""
+
+
+class StoredAudio:
+    """A complete audio file in the store."""
+
+    __slots__ = ("path", "size", "content_type")
+
+    def __init__(self, path: str, size: int, content_type: str):
+        self.path = path
+        self.size = size
+        self.content_type = content_type
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+def _claim(shared: str, private: str) -> None:
+    """Move the resumable ``.part`` file to this download's own name, if there is one."""
+    try:
+        os.replace(shared, private)
+    except FileNotFoundError:
+        pass
+
+
+def _unlink(*paths: str) -> None:
+    for path in paths:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+class _InFlight:
+    """One running download and the callers waiting on it."""
+
+    __slots__ = ("task", "listeners", "waiters")
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.listeners: List[Callable[[int, Optional[int]], None]] = []
+        self.waiters = 0
+
+    def report(self, done: int, total: Optional[int]) -> None:
+        for listener in list(self.listeners):
+            listener(done, total)
+
+
+class AudioStore:
+    """Downloaded track audio on local disk, one file per video and audio tier.
+
+    Concurrent downloads of the same video and tier share one transfer.
+    Each transfer writes to a file of its own, ``<id>.<tier>.<token>.part``,
+    claimed by renaming ``<id>.<tier>.part`` if one was left behind, and
+    resumes from its length with a Range request. An interrupted download
+    (cancelled job, failed track, shutdown) is renamed back to
+    ``<id>.<tier>.part`` for the next attempt. Complete files are renamed to
+    ``<id>.<tier>.audio`` next to a small JSON sidecar, and the store is
+    trimmed least-recently-served first past ``max_bytes``.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._index: "OrderedDict[str, StoredAudio]" = OrderedDict()
+        self._size = 0
+        self._downloads: Dict[str, _InFlight] = {}
+
+    def _base(self, video_id: str, tier: str) -> str:
+        return os.path.join(self.directory, f"{video_id}.{tier}")
+
+    def _scan(self) -> "OrderedDict[str, StoredAudio]":
+        os.makedirs(self.directory, exist_ok=True)
+        found = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                key = entry.name[: -len(".json")]
+                audio = os.path.join(self.directory, f"{key}.audio")
+                try:
+                    with open(entry.path) as f:
+                        meta = json.load(f)
+                    size = os.path.getsize(audio)
+                except (OSError, ValueError):
+                    continue
+                if size != meta.get("size"):
+                    continue
+                found.append((entry.stat().st_mtime, key, StoredAudio(audio, size, meta["content_type"])))
+        found.sort(key=lambda item: item[0])
+        return OrderedDict((key, stored) for _, key, stored in found)
+
+    async def load(self) -> None:
+        """Index the complete files already on disk (call once at startup)."""
+        self._index = await asyncio.to_thread(self._scan)
+        self._size = sum(stored.size for stored in self._index.values())
+        logger.info(f"Audio store: {len(self._index)} tracks, {self._size / 1e6:.0f} MB")
+
+    def lookup(self, video_id: str, tier: str) -> Optional[StoredAudio]:
+        key = f"{video_id}.{tier}"
+        stored = self._index.get(key)
+        if stored is not None:
+            self._index.move_to_end(key)
+        return stored
+
+    def forget(self, video_id: str, tier: str) -> None:
+        """Drop an entry whose file went missing underneath the index."""
+        stored = self._index.pop(f"{video_id}.{tier}", None)
+        if stored is not None:
+            self._size -= stored.size
+
+    async def partial_bytes(self, video_id: str, tier: str) -> int:
+        return await asyncio.to_thread(_file_size, self._base(video_id, tier) + ".part")
+
+    async def download(
+        self,
+        client: httpx.AsyncClient,
+        video_id: str,
+        tier: str,
+        stream_info: StreamInfo,
+        progress: Optional[Callable[[int, Optional[int]], None]] = None,
+    ) -> StoredAudio:
+        """Download (or resume) a track's audio into the store.
+
+        Joins the download already running for the same video and tier, if
+        any. ``progress(done, total)`` is called as bytes are written;
+        ``total`` is None if upstream didn't say. The transfer is cancelled
+        only once every caller waiting on it has been.
+        """
+        key = f"{video_id}.{tier}"
+        flight = self._downloads.get(key)
+        if flight is None:
+            flight = _InFlight()
+            flight.task = asyncio.create_task(
+                self._download(client, video_id, tier, stream_info, flight.report)
+            )
+            self._downloads[key] = flight
+            flight.task.add_done_callback(lambda _: self._downloads.pop(key, None))
+        if progress:
+            flight.listeners.append(progress)
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+                # Let the transfer put its .part file back before we go
+                await asyncio.wait([flight.task])
+            raise
+        finally:
+            flight.waiters -= 1
+            if progress:
+                flight.listeners.remove(progress)
+
+    async def _download(
+        self,
+        client: httpx.AsyncClient,
+        video_id: str,
+        tier: str,
+        stream_info: StreamInfo,
+        progress: Callable[[int, Optional[int]], None],
+    ) -> StoredAudio:
+        base = self._base(video_id, tier)
+        part = f"{base}.{uuid.uuid4().hex}.part"
+        await asyncio.to_thread(os.makedirs, self.directory, exist_ok=True)
+        await asyncio.to_thread(_claim, base + ".part", part)
+        try:
+            stored = await self._transfer(client, video_id, base, part, stream_info, progress)
+        except BaseException:
+            # Keep what we have for a resume, unless it was discarded
+            await asyncio.to_thread(_claim, part, base + ".part")
+            raise
+        self._add(f"{video_id}.{tier}", stored)
+        await self._trim()
+        return stored
+
+    async def _transfer(
+        self,
+        client: httpx.AsyncClient,
+        video_id: str,
+        base: str,
+        part: str,
+        stream_info: StreamInfo,
+        progress: Callable[[int, Optional[int]], None],
+    ) -> StoredAudio:
+        offset = await asyncio.to_thread(_file_size, part)
+        headers = dict(stream_info.headers) if stream_info.headers else {}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+
+        async with client.stream("GET", stream_info.url, headers=headers) as resp:
+            if resp.status_code == 416 and offset:
+                # Stale or overlong partial file — start over next attempt
+                await asyncio.to_thread(_unlink, part)
+                raise AudioDownloadError(f"Partial download of {video_id} no longer matches upstream")
+            if resp.status_code == 200:
+                offset = 0  # Range ignored; rewrite from the start
+                length = resp.headers.get("content-length")
+                total = int(length) if length else None
+            elif resp.status_code == 206:
+                match = _CONTENT_RANGE_RE.match(resp.headers.get("content-range", ""))
+                if not match or int(match.group(1)) != offset:
+                    raise AudioDownloadError(f"Unexpected Content-Range for {video_id}")
+                total = None if match.group(3) == "*" else int(match.group(3))
+            else:
+                raise AudioDownloadError(f"Upstream returned {resp.status_code} for {video_id}")
+            content_type = resp.headers.get("content-type", "application/octet-stream")
+
+            f = await asyncio.to_thread(open, part, "ab" if offset else "wb")
+            done = offset
+            try:
+                buffer = bytearray()
+                async for chunk in resp.aiter_bytes():
+                    buffer += chunk
+                    if len(buffer) >= _WRITE_BATCH:
+                        await asyncio.to_thread(f.write, bytes(buffer))
+                        done += len(buffer)
+                        buffer.clear()
+                        progress(done, total)
+                if buffer:
+                    await asyncio.to_thread(f.write, bytes(buffer))
+                    done += len(buffer)
+            finally:
+                await asyncio.to_thread(f.close)
+
+        if total is not None and done != total:
+            raise AudioDownloadError(f"Download of {video_id} ended at {done} of {total} bytes")
+        progress(done, done)
+        return await asyncio.to_thread(self._commit, base, part, done, content_type)
+
+    def _commit(self, base: str, part: str, size: int, content_type: str) -> StoredAudio:
+        os.replace(part, base + ".audio")
+        tmp = part[: -len(".part")] + ".json.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"size": size, "content_type": content_type}, f)
+        os.replace(tmp, base + ".json")
+        return StoredAudio(base + ".audio", size, content_type)
+
+    def _add(self, key: str, stored: StoredAudio) -> None:
+        old = self._index.pop(key, None)
+        if old is not None:
+            self._size -= old.size
+        self._index[key] = stored
+        self._size += stored.size
+
+    async def _trim(self) -> None:
+        # Never evict the entry just added, even if it alone exceeds the cap
+        while self._size > self.max_bytes and len(self._index) > 1:
+            key, stored = self._index.popitem(last=False)
+            self._size -= stored.size
+            base = stored.path[: -len(".audio")]
+            await asyncio.to_thread(_unlink, base + ".json", stored.path)
+
+
+# Singleton instance
+audio_store = AudioStore(settings.AUDIO_STORE_DIR, settings.AUDIO_STORE_MAX_MB * 1024 * 1024)
+
+
+def get_audio_store() -> AudioStore:
+    """Get the audio store instance."""
+    return audio_store
@@ -0,0 +1,278 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional
+
+import httpx
+
+from app.config import get_settings
+from app.services.audio_store import AudioDownloadError, AudioStore, get_audio_store
+from app.services.youtube import ExtractionFailed, get_youtube_service
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept per user for the status endpoint
+_FINISHED_JOBS_KEPT = 20
+
+
+class TooManyDownloadJobs(Exception):
+    """Raised when a user already has the maximum number of unfinished jobs."""
+
+
+class TrackDownload:
+    """Progress of one track within a job."""
+
+    __slots__ = ("video_id", "state", "bytes_done", "bytes_total", "error")
+
+    def __init__(self, video_id: str):
+        self.video_id = video_id
+        self.state = "pending"  # pending, downloading, done, failed, skipped
+        self.bytes_done = 0
+        self.bytes_total: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        return {
+            "video_id": self.video_id,
+            "state": self.state,
+            "bytes_done": self.bytes_done,
+            "bytes_total": self.bytes_total,
+            "error": self.error,
+        }
+
+
+class DownloadJob:
+    """Pre-download of every track of one playlist for one user."""
+
+    def __init__(self, user_id: str, playlist_id: str, quality: str, video_ids: List[str]):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.playlist_id = playlist_id
+        self.quality = quality
+        self.tracks = [TrackDownload(video_id) for video_id in video_ids]
+        self.cancelled = False
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def status(self) -> str:
+        if self.cancelled:
+            return "cancelled"
+        if self.finished:
+            return "failed" if any(t.state == "failed" for t in self.tracks) else "completed"
+        if any(t.state != "pending" for t in self.tracks):
+            return "running"
+        return "queued"
+
+    def _check_finished(self) -> None:
+        if not self.finished and all(t.state not in ("pending", "downloading") for t in self.tracks):
+            self.finished_at = datetime.now(timezone.utc)
+
+    def as_dict(self) -> dict:
+        counts: Dict[str, int] = {}
+        for track in self.tracks:
+            counts[track.state] = counts.get(track.state, 0) + 1
+        return {
+            "id": self.id,
+            "playlist_id": self.playlist_id,
+            "quality": self.quality,
+            "status": self.status,
+            "total_tracks": len(self.tracks),
+            "completed_tracks": counts.get("done", 0),
+            "failed_tracks": counts.get("failed", 0),
+            "bytes_done": sum(t.bytes_done for t in self.tracks),
+            "tracks": [t.as_dict() for t in self.tracks],
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class DownloadManager:
+    """Queue of playlist pre-download jobs, worked by a fixed pool of tasks.
+
+    ``max_concurrent`` workers bound downloads globally; tracks are handed
+    out round-robin between users, skipping users already at
+    ``max_per_user`` running downloads, so one long playlist can't hold
+    every worker. Tracks already in the store are skipped, a track another
+    job is already downloading is joined rather than fetched twice, and
+    partial downloads resume (see :class:`AudioStore`).
+    """
+
+    def __init__(self, store: AudioStore, max_concurrent: int, max_per_user: int, max_jobs_per_user: int):
+        self.store = store
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.max_jobs_per_user = max_jobs_per_user
+        self._jobs: Dict[str, DownloadJob] = {}
+        self._user_jobs: Dict[str, Deque[str]] = {}
+        # user -> queued (job, track) pairs; order is the round-robin order
+        self._pending: "OrderedDict[str, Deque[tuple]]" = OrderedDict()
+        self._running: Dict[str, int] = {}
+        self._changed: Optional[asyncio.Event] = None  # created on the serving loop by start()
+        self._workers: List[asyncio.Task] = []
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(connect=10, read=30, write=10, pool=10),
+                follow_redirects=True,
+            )
+        return self._client
+
+    def start(self) -> None:
+        if not self._workers:
+            self._changed = asyncio.Event()
+            self._workers = [asyncio.create_task(self._work()) for _ in range(self.max_concurrent)]
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        # Let cancelled downloads close their .part files before shutdown
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def submit(self, user_id: str, playlist_id: str, quality: str, video_ids: List[str]) -> DownloadJob:
+        """Queue a job, or return the user's unfinished job for the same playlist and tier."""
+        user_jobs = self._user_jobs.setdefault(user_id, deque())
+        unfinished = [self._jobs[job_id] for job_id in user_jobs if not self._jobs[job_id].finished]
+        for job in unfinished:
+            if job.playlist_id == playlist_id and job.quality == quality:
+                return job
+        if self.max_jobs_per_user and len(unfinished) >= self.max_jobs_per_user:
+            raise TooManyDownloadJobs(user_id)
+
+        job = DownloadJob(user_id, playlist_id, quality, video_ids)
+        self._jobs[job.id] = job
+        user_jobs.append(job.id)
+        self._forget_old_jobs(user_jobs)
+        queue = self._pending.setdefault(user_id, deque())
+        queue.extend((job, track) for track in job.tracks)
+        job._check_finished()  # an empty playlist is done at once
+        self._notify()
+        return job
+
+    def _notify(self) -> None:
+        if self._changed is not None:
+            self._changed.set()
+
+    def _forget_old_jobs(self, user_jobs: Deque[str]) -> None:
+        finished = [job_id for job_id in user_jobs if self._jobs[job_id].finished]
+        for job_id in finished[: max(len(finished) - _FINISHED_JOBS_KEPT, 0)]:
+            user_jobs.remove(job_id)
+            del self._jobs[job_id]
+
+    def get(self, user_id: str, job_id: str) -> Optional[DownloadJob]:
+        job = self._jobs.get(job_id)
+        return job if job is not None and job.user_id == user_id else None
+
+    def jobs_for(self, user_id: str) -> List[DownloadJob]:
+        return [self._jobs[job_id] for job_id in reversed(self._user_jobs.get(user_id, ()))]
+
+    def cancel(self, job: DownloadJob) -> None:
+        """Stop queuing the job's tracks; running ones finish (or resume later)."""
+        if job.finished:
+            return
+        job.cancelled = True
+        for track in job.tracks:
+            if track.state == "pending":
+                track.state = "skipped"
+        job._check_finished()
+
+    def _take(self) -> Optional[tuple]:
+        """Next (job, track) in round-robin order from a user with a free slot."""
+        for user_id in list(self._pending):
+            if self._running.get(user_id, 0) >= self.max_per_user:
+                continue
+            queue = self._pending[user_id]
+            while queue:
+                job, track = queue.popleft()
+                if track.state == "pending":
+                    break
+            else:
+                del self._pending[user_id]
+                continue
+            # Rotate this user to the back
+            if queue:
+                self._pending.move_to_end(user_id)
+            else:
+                del self._pending[user_id]
+            return job, track
+        return None
+
+    async def _work(self) -> None:
+        while True:
+            item = self._take()
+            if item is None:
+                # No await since _take(), so nothing can have been queued in between
+                self._changed.clear()
+                await self._changed.wait()
+                continue
+            job, track = item
+            self._running[job.user_id] = self._running.get(job.user_id, 0) + 1
+            try:
+                await self._download(job, track)
+            finally:
+                self._running[job.user_id] -= 1
+                if not self._running[job.user_id]:
+                    del self._running[job.user_id]
+                job._check_finished()
+                self._notify()
+
+    async def _download(self, job: DownloadJob, track: TrackDownload) -> None:
+        stored = self.store.lookup(track.video_id, job.quality)
+        if stored is not None:
+            track.state = "done"
+            track.bytes_done = track.bytes_total = stored.size
+            return
+
+        track.state = "downloading"
+        track.bytes_done = await self.store.partial_bytes(track.video_id, job.quality)
+
+        def progress(done: int, total: Optional[int]) -> None:
+            track.bytes_done, track.bytes_total = done, total
+
+        try:
+            stream_info = await get_youtube_service().get_audio_stream_url(track.video_id, job.quality)
+            await self.store.download(
+                self._get_client(), track.video_id, job.quality, stream_info, progress
+            )
+        except asyncio.CancelledError:
+            track.state = "pending"  # shutting down; the .part file stays for a resume
+            raise
+        except asyncio.TimeoutError:
+            track.state, track.error = "failed", "extraction timed out"
+        except ExtractionFailed as e:
+            track.state, track.error = "failed", e.kind
+        except (AudioDownloadError, httpx.HTTPError, OSError) as e:
+            logger.warning(f"Pre-download of {track.video_id} failed: {e!r}")
+            track.state, track.error = "failed", "download failed"
+        except Exception as e:
+            logger.error(f"Pre-download of {track.video_id} failed: {e!r}", exc_info=True)
+            track.state, track.error = "failed", "download failed"
+        else:
+            track.state = "done"
+
+
+# Singleton instance
+download_manager = DownloadManager(
+    get_audio_store(),
+    max_concurrent=settings.DOWNLOAD_MAX_CONCURRENT,
+    max_per_user=settings.DOWNLOAD_MAX_PER_USER,
+    max_jobs_per_user=settings.DOWNLOAD_MAX_JOBS_PER_USER,
+)
+
+
+def get_download_manager() -> DownloadManager:
+    """Get the download manager instance."""
+    return download_manager
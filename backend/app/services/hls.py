@@ -0,0 +1,235 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urljoin
+
+import httpx
+
+from app.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Attribute-style URIs inside tags, e.g. #EXT-X-MEDIA:...,URI="..."
+_URI_ATTR_RE = re.compile(r'URI="([^"]+)"')
+
+# Tags whose URI points at another playlist rather than at media data
+_PLAYLIST_URI_TAGS = ("#EXT-X-MEDIA", "#EXT-X-I-FRAME-STREAM-INF")
+
+
+class UpstreamError(Exception):
+    """Raised when googlevideo returns a non-success status for a playlist or segment."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"Upstream returned {status_code}")
+        self.status_code = status_code
+
+
+def _signature(video_id: str, url: str, expires: int) -> str:
+    msg = f"{video_id}|{expires}|{url}".encode("utf-8")
+    return hmac.new(settings.SECRET_KEY.encode("utf-8"), msg, hashlib.sha256).hexdigest()[:32]
+
+
+def sign_upstream_url(video_id: str, url: str, expires: int) -> str:
+    """Encode an upstream URL into an opaque, signed token.
+
+    Nested playlist and segment requests are made by the media player, which
+    usually cannot attach our bearer token — the signature is what stops the
+    endpoints from being used as an open proxy.
+    """
+    encoded = base64.urlsafe_b64encode(url.encode("utf-8")).decode("ascii").rstrip("=")
+    return f"{encoded}.{expires}.{_signature(video_id, url, expires)}"
+
+
+def verify_upstream_token(video_id: str, token: str) -> Optional[str]:
+    """Return the upstream URL for a valid, unexpired token, else None."""
+    try:
+        encoded, expires_str, sig = token.split(".")
+        expires = int(expires_str)
+        url = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)).decode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if expires < time.time():
+        return None
+    if not hmac.compare_digest(sig, _signature(video_id, url, expires)):
+        return None
+    return url
+
+
+def rewrite_playlist(text: str, base_url: str, video_id: str) -> str:
+    """Rewrite every URI in an HLS playlist to point back at this backend.
+
+    URIs are emitted relative to the playlist endpoint, so a master playlist
+    served from ``.../hls/{id}/master.m3u8`` resolves its variants to
+    ``.../hls/{id}/playlist.m3u8`` and media playlists resolve their segments
+    to ``.../hls/{id}/segment``.
+    """
+    is_master = "#EXT-X-STREAM-INF" in text
+    expires = int(time.time()) + settings.HLS_TOKEN_TTL_SECONDS
+
+    def proxied(uri: str, target: str) -> str:
+        token = sign_upstream_url(video_id, urljoin(base_url, uri), expires)
+        return f"{target}?t={token}"
+
+    out = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            out.append(line)
+        elif not stripped.startswith("#"):
+            out.append(proxied(stripped, "playlist.m3u8" if is_master else "segment"))
+        elif 'URI="' in stripped:
+            target = "playlist.m3u8" if stripped.startswith(_PLAYLIST_URI_TAGS) else "segment"
+            out.append(_URI_ATTR_RE.sub(lambda m: f'URI="{proxied(m.group(1), target)}"', stripped))
+        else:
+            out.append(line)
+    return "\n".join(out) + "\n"
+
+
+def _is_static_playlist(body: bytes) -> bool:
+    """Master playlists and ended (VOD) media playlists never change.
+
+    Live and event media playlists grow as segments are added, so a cached
+    copy would serve a frozen stream.
+    """
+    return b"#EXT-X-STREAM-INF" in body or b"#EXT-X-ENDLIST" in body
+
+
+class SegmentCache:
+    """Byte-bounded LRU of upstream HLS objects (segments and static playlists).
+
+    Concurrent requests for the same URL are coalesced onto one upstream fetch,
+    so viewers of the same video share both the cache and in-flight downloads.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._size = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, content_type: str, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old[1])
+        self._entries[key] = (content_type, body)
+        self._size += len(body)
+        while self._size > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    async def fetch(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        headers: Optional[dict] = None,
+        keep: Optional[Callable[[bytes], bool]] = None,
+    ) -> Tuple[str, bytes]:
+        """Return (content_type, body) for ``url``, from cache or upstream.
+
+        With ``keep``, a fetched body is only cached if ``keep(body)`` is true;
+        the fetch is coalesced either way.
+        """
+        cached = self.get(url)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        task = self._inflight.get(url)
+        if task is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            # Its own task, so cancelling whichever request started it
+            # doesn't cancel the fetch for everyone else waiting on it
+            task = asyncio.create_task(self._fetch(client, url, headers, keep))
+            self._inflight[url] = task
+            task.add_done_callback(lambda t: self._fetched(url, t))
+        return await asyncio.shield(task)
+
+    async def _fetch(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        headers: Optional[dict],
+        keep: Optional[Callable[[bytes], bool]],
+    ) -> Tuple[str, bytes]:
+        resp = await client.get(url, headers=headers or {})
+        if resp.status_code != 200:
+            raise UpstreamError(resp.status_code)
+        result = (resp.headers.get("content-type", "application/octet-stream"), resp.content)
+        if keep is None or keep(resp.content):
+            self.put(url, *result)
+        return result
+
+    def _fetched(self, url: str, task: asyncio.Task) -> None:
+        del self._inflight[url]
+        if not task.cancelled():
+            # Mark retrieved so a fetch nobody awaited any more doesn't log a warning
+            task.exception()
+
+
+class HLSProxy:
+    """Fetches, rewrites and caches HLS playlists and segments for proxying."""
+
+    def __init__(self):
+        self.cache = SegmentCache(settings.HLS_SEGMENT_CACHE_MB * 1024 * 1024)
+        # Upstream request headers (User-Agent etc.) from the last extraction
+        # per video, reused for nested playlist and segment fetches
+        self._headers: "OrderedDict[str, dict]" = OrderedDict()
+
+    def _remember_headers(self, video_id: str, headers: Optional[dict]) -> None:
+        if not headers:
+            return
+        self._headers[video_id] = headers
+        self._headers.move_to_end(video_id)
+        if len(self._headers) > 1000:
+            self._headers.popitem(last=False)
+
+    async def get_playlist(
+        self,
+        client: httpx.AsyncClient,
+        video_id: str,
+        url: str,
+        headers: Optional[dict] = None,
+    ) -> str:
+        """Fetch an upstream playlist and return it rewritten for this backend."""
+        self._remember_headers(video_id, headers)
+        _, body = await self.cache.fetch(
+            client, url, headers or self._headers.get(video_id), keep=_is_static_playlist
+        )
+        return rewrite_playlist(body.decode("utf-8"), url, video_id)
+
+    async def get_segment(
+        self,
+        client: httpx.AsyncClient,
+        video_id: str,
+        url: str,
+    ) -> Tuple[str, bytes]:
+        """Fetch a media segment (or init/key object) through the shared cache."""
+        return await self.cache.fetch(client, url, self._headers.get(video_id))
+
+
+# Singleton instance
+hls_proxy = HLSProxy()
+
+
+def get_hls_proxy() -> HLSProxy:
+    """Get the HLS proxy instance."""
+    return hls_proxy
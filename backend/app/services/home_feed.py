@@ -0,0 +1,439 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from app.config import get_settings
+from app.core.metrics import HOME_FEED_BUILDS, HOME_FEED_REQUESTS
+from app.db.database import async_session, insert_new
+from app.models.user import ListeningEvent, Playlist, Track, playlist_tracks
+from app.schemas.user import TrackSearchResult
+from app.services.listening import get_listening_events
+from app.services.youtube import get_youtube_service
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_SECTION_SIZE = 20
+_MIX_PLAYLISTS = 3
+# Recently played tracks without a Track row are looked up (and stored) at
+# most this many per build, bounding the extractions one feed can cost
+_METADATA_LOOKUPS = 5
+# How often the scheduler looks for active users whose feed is due
+_TICK_SECONDS = 60.0
+# Longer than any build should take; with Redis, other workers skip the user meanwhile
+_BUILD_LOCK_SECONDS = 120
+# /home marks its caller active at most this often (a store write with Redis)
+_MARK_ACTIVE_EVERY = 300.0
+
+# (section id, section) — the section is None if it failed to build
+_Built = Tuple[str, Optional[dict]]
+
+
+class MemoryFeedStore:
+    """Feeds and the active-user set in process memory (single worker)."""
+
+    def __init__(self, active_seconds: float):
+        self.active_seconds = active_seconds
+        self._feeds: Dict[str, dict] = {}
+        self._active: "OrderedDict[str, float]" = OrderedDict()  # user -> last seen (wall clock)
+
+    async def get(self, user_id: str) -> Optional[dict]:
+        return self._feeds.get(user_id)
+
+    async def put(self, user_id: str, feed: dict) -> None:
+        self._feeds[user_id] = feed
+
+    async def claim(self, user_id: str, seconds: float) -> bool:
+        return True  # one worker: the scheduler's own de-duplication is enough
+
+    async def mark_active(self, user_id: str) -> None:
+        self._active[user_id] = time.time()
+        self._active.move_to_end(user_id)
+
+    async def active_users(self) -> List[str]:
+        cutoff = time.time() - self.active_seconds
+        while self._active:
+            user_id, seen = next(iter(self._active.items()))
+            if seen >= cutoff:
+                break
+            del self._active[user_id]
+            self._feeds.pop(user_id, None)
+        return list(self._active)
+
+
+class RedisFeedStore:
+    """Feeds and the active-user set shared by all workers through Redis.
+
+    Fails open like the Redis rate limiter: a read error is a cache miss and
+    a write error is logged, so a Redis outage degrades /home to building
+    feeds on demand rather than failing it.
+    """
+
+    def __init__(self, url: str, active_seconds: float):
+        self.url = url
+        self.active_seconds = active_seconds
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            import redis.asyncio as redis
+
+            self._client = redis.from_url(self.url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        return self._client
+
+    async def get(self, user_id: str) -> Optional[dict]:
+        try:
+            raw = await self._get_client().get(f"home:feed:{user_id}")
+        except Exception as e:
+            logger.warning(f"Home feed Redis read failed: {e}")
+            return None
+        return json.loads(raw) if raw else None
+
+    async def put(self, user_id: str, feed: dict) -> None:
+        try:
+            # Kept as long as the user counts as active, so they always get
+            # something instantly, however stale
+            await self._get_client().set(
+                f"home:feed:{user_id}", json.dumps(feed), ex=int(self.active_seconds)
+            )
+        except Exception as e:
+            logger.warning(f"Home feed Redis write failed: {e}")
+
+    async def claim(self, user_id: str, seconds: float) -> bool:
+        """Take the right to build this user's feed, so workers don't all build it."""
+        try:
+            return bool(await self._get_client().set(
+                f"home:lock:{user_id}", "1", nx=True, ex=max(1, int(seconds))
+            ))
+        except Exception as e:
+            logger.warning(f"Home feed Redis lock failed, building anyway: {e}")
+            return True
+
+    async def mark_active(self, user_id: str) -> None:
+        try:
+            await self._get_client().zadd("home:active", {user_id: time.time()})
+        except Exception as e:
+            logger.warning(f"Home feed Redis write failed: {e}")
+
+    async def active_users(self) -> List[str]:
+        cutoff = time.time() - self.active_seconds
+        try:
+            client = self._get_client()
+            await client.zremrangebyscore("home:active", "-inf", cutoff)
+            members = await client.zrange("home:active", 0, -1)
+        except Exception as e:
+            logger.warning(f"Home feed Redis read failed: {e}")
+            return []
+        return [m.decode() if isinstance(m, bytes) else m for m in members]
+
+
+def _track_result(track: Track) -> dict:
+    return TrackSearchResult(
+        id=track.id,
+        title=track.title,
+        artist=track.artist,
+        duration=track.duration,
+        thumbnail=track.thumbnail,
+    ).model_dump()
+
+
+class HomeFeedService:
+    """Per-user home feeds, precomputed in the background and served from a store.
+
+    A feed has three kinds of section: recently played (from listening
+    history), a mix of related tracks for each of the user's most recently
+    extended playlists, and trending (one search shared by everyone). All of
+    them cost yt-dlp calls, so they're built ahead of time: every minute the
+    scheduler queues users active within ``active_seconds`` whose feed is
+    older than ``ttl``, and ``concurrency`` workers build them.
+
+    GET /home is a single store read. A stale feed is served as-is while a
+    rebuild is queued; only a user with no feed at all waits, briefly, for
+    their first build. A section that fails to build keeps its previous
+    contents.
+    """
+
+    def __init__(self, store, ttl: float, concurrency: int, cold_wait: float, trending_query: str):
+        self.store = store
+        self.ttl = ttl
+        self.concurrency = concurrency
+        self.cold_wait = cold_wait
+        self.trending_query = trending_query
+        # Users waiting for a build; request-triggered ones go to the front
+        self._queue: "OrderedDict[str, None]" = OrderedDict()
+        self._builds: Dict[str, asyncio.Future] = {}
+        self._marked: Dict[str, float] = {}
+        self._trending: Optional[tuple] = None  # (built_at, tracks)
+        self._changed: Optional[asyncio.Event] = None  # created on the serving loop by start()
+        self._tasks: List[asyncio.Task] = []
+
+    async def mark_active(self, user_id: str) -> None:
+        """Count the user as active (e.g. at login) and queue a build for them."""
+        self._marked[user_id] = time.monotonic()
+        await self.store.mark_active(user_id)
+        self._enqueue(user_id, urgent=True)
+
+    async def get_feed(self, user_id: str) -> dict:
+        """The user's feed, with ``stale`` set if a newer one is being built."""
+        now = time.monotonic()
+        if now - self._marked.get(user_id, float("-inf")) > _MARK_ACTIVE_EVERY:
+            self._marked[user_id] = now
+            await self.store.mark_active(user_id)
+
+        feed = await self.store.get(user_id)
+        if feed is not None:
+            stale = time.time() - feed["built_at"] > self.ttl
+            if stale:
+                self._enqueue(user_id, urgent=True)
+            HOME_FEED_REQUESTS.labels("stale" if stale else "fresh").inc()
+            return {**feed, "stale": stale}
+
+        HOME_FEED_REQUESTS.labels("miss").inc()
+        build = self._enqueue(user_id, urgent=True)
+        if build is not None:
+            try:
+                feed = await asyncio.wait_for(asyncio.shield(build), self.cold_wait)
+                if feed is not None:
+                    return {**feed, "stale": False}
+            except asyncio.TimeoutError:
+                pass
+        # Still building; the client shows an empty home and retries
+        return {"sections": [], "built_at": None, "stale": True}
+
+    def _enqueue(self, user_id: str, urgent: bool = False) -> Optional[asyncio.Future]:
+        """Queue a build for ``user_id``; returns a future for its result."""
+        if self._changed is None:
+            return None  # not started (no lifespan)
+        build = self._builds.get(user_id)
+        if build is None:
+            build = self._builds[user_id] = asyncio.get_running_loop().create_future()
+            self._queue[user_id] = None
+        if urgent and user_id in self._queue:
+            self._queue.move_to_end(user_id, last=False)
+        self._changed.set()
+        return build
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._changed = asyncio.Event()
+            self._tasks = [asyncio.create_task(self._tick())]
+            self._tasks += [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for build in self._builds.values():
+            build.cancel()
+        self._builds.clear()
+        self._queue.clear()
+
+    async def _tick(self) -> None:
+        while True:
+            cutoff = time.monotonic() - _MARK_ACTIVE_EVERY
+            self._marked = {u: t for u, t in self._marked.items() if t > cutoff}
+            try:
+                for user_id in await self.store.active_users():
+                    feed = await self.store.get(user_id)
+                    if feed is None or time.time() - feed["built_at"] > self.ttl:
+                        self._enqueue(user_id)
+            except Exception as e:
+                logger.error(f"Home feed scheduling failed: {e!r}", exc_info=True)
+            await asyncio.sleep(_TICK_SECONDS)
+
+    async def _work(self) -> None:
+        while True:
+            if not self._queue:
+                self._changed.clear()
+                await self._changed.wait()
+                continue
+            user_id, _ = self._queue.popitem(last=False)
+            build = self._builds[user_id]
+            feed = None
+            try:
+                feed = await self._refresh(user_id)
+            except Exception as e:
+                HOME_FEED_BUILDS.labels("failed").inc()
+                logger.error(f"Home feed build for {user_id} failed: {e!r}", exc_info=True)
+            finally:
+                del self._builds[user_id]
+                if not build.done():
+                    build.set_result(feed)
+
+    async def _refresh(self, user_id: str) -> Optional[dict]:
+        previous = await self.store.get(user_id)
+        # Another request or worker (or, with Redis, another process) may
+        # have rebuilt it since this user was queued
+        if previous is not None and time.time() - previous["built_at"] <= self.ttl:
+            return previous
+        if not await self.store.claim(user_id, _BUILD_LOCK_SECONDS):
+            return previous
+        started = time.monotonic()
+        feed = await self.build(user_id, previous)
+        await self.store.put(user_id, feed)
+        HOME_FEED_BUILDS.labels("built").inc()
+        logger.debug(f"Built home feed for {user_id} in {time.monotonic() - started:.1f}s")
+        return feed
+
+    async def build(self, user_id: str, previous: Optional[dict] = None) -> dict:
+        """Build a feed from scratch. Sections that fail keep ``previous``'s contents."""
+        kept = {s["id"]: s for s in previous["sections"]} if previous else {}
+        built = [
+            await self._recently_played(user_id),
+            *await self._mixes(user_id),
+            await self._trending_section(),
+        ]
+        sections = []
+        for section_id, section in built:
+            if section is None:  # failed to build
+                section = kept.get(section_id)
+            if section and section["tracks"]:
+                sections.append(section)
+        return {"sections": sections, "built_at": time.time()}
+
+    async def _recently_played(self, user_id: str) -> _Built:
+        try:
+            played = [
+                row["track_id"] for row in get_listening_events().pending_for(user_id)
+                if row["event"] != "skip"
+            ]
+            async with async_session() as db:
+                result = await db.execute(
+                    select(ListeningEvent.track_id, func.max(ListeningEvent.occurred_at).label("last"))
+                    .where(ListeningEvent.user_id == user_id, ListeningEvent.event != "skip")
+                    .group_by(ListeningEvent.track_id)
+                    .order_by(func.max(ListeningEvent.occurred_at).desc())
+                    .limit(_SECTION_SIZE)
+                )
+                played += [row.track_id for row in result]
+                track_ids = list(dict.fromkeys(played))[:_SECTION_SIZE]
+
+                result = await db.execute(select(Track).where(Track.id.in_(track_ids)))
+                tracks = {track.id: track for track in result.scalars()}
+            # Extractions take seconds; don't hold a pooled connection through them
+            missing = [track_id for track_id in track_ids if track_id not in tracks]
+            for track in await self._store_metadata(missing[:_METADATA_LOOKUPS]):
+                tracks[track.id] = track
+        except Exception as e:
+            logger.warning(f"Recently played for {user_id} failed: {e!r}")
+            return "recently_played", None
+        return "recently_played", {
+            "id": "recently_played",
+            "title": "Recently played",
+            "tracks": [_track_result(tracks[t]) for t in track_ids if t in tracks],
+        }
+
+    async def _store_metadata(self, video_ids: List[str]) -> List[Track]:
+        """Look up tracks played straight from search and cache them as Track rows."""
+        youtube = get_youtube_service()
+        rows = []
+        for video_id in video_ids:
+            try:
+                info = await youtube.get_video_info(video_id)
+            except Exception as e:
+                logger.debug(f"No metadata for recently played {video_id}: {e!r}")
+                continue
+            rows.append({
+                "id": video_id,
+                "title": info["title"] or video_id,
+                "artist": info.get("artist"),
+                "duration": info.get("duration"),
+                "thumbnail": info.get("thumbnail"),
+            })
+        if rows:
+            async with async_session() as db:
+                # Rows stored meanwhile (a like or playlist add) are kept as they are
+                await db.execute(insert_new(Track).values(rows).on_conflict_do_nothing(index_elements=["id"]))
+                await db.commit()
+        return [Track(**row) for row in rows]
+
+    async def _mixes(self, user_id: str) -> List[_Built]:
+        """A related-tracks mix seeded by the newest track of each recently extended playlist."""
+        try:
+            async with async_session() as db:
+                latest = (
+                    select(
+                        playlist_tracks.c.playlist_id,
+                        func.max(playlist_tracks.c.added_at).label("added_at"),
+                    )
+                    .group_by(playlist_tracks.c.playlist_id)
+                    .subquery()
+                )
+                result = await db.execute(
+                    select(Playlist.id, Playlist.name)
+                    .join(latest, latest.c.playlist_id == Playlist.id)
+                    .where(Playlist.owner_id == user_id)
+                    .order_by(latest.c.added_at.desc())
+                    .limit(_MIX_PLAYLISTS)
+                )
+                playlists = result.all()
+                members = {}
+                for playlist in playlists:
+                    result = await db.execute(
+                        select(playlist_tracks.c.track_id)
+                        .where(playlist_tracks.c.playlist_id == playlist.id)
+                        .order_by(playlist_tracks.c.added_at.desc(), playlist_tracks.c.position.desc())
+                    )
+                    members[playlist.id] = list(result.scalars())
+        except Exception as e:
+            logger.warning(f"Playlist mixes for {user_id} failed: {e!r}")
+            return []
+
+        youtube = get_youtube_service()
+        sections = []
+        for playlist in playlists:
+            section_id = f"mix:{playlist.id}"
+            track_ids = members[playlist.id]
+            if not track_ids:
+                continue
+            try:
+                related = await youtube.get_related_videos(track_ids[0], _SECTION_SIZE + len(track_ids))
+            except Exception as e:
+                logger.warning(f"Mix for playlist {playlist.id} failed: {e!r}")
+                sections.append((section_id, None))
+                continue
+            in_playlist = set(track_ids)
+            sections.append((section_id, {
+                "id": section_id,
+                "title": f"{playlist.name} mix",
+                "tracks": [t.model_dump() for t in related if t.id not in in_playlist][:_SECTION_SIZE],
+            }))
+        return sections
+
+    async def _trending_section(self) -> _Built:
+        # One search per TTL for everyone, not one per user
+        if self._trending is None or time.monotonic() - self._trending[0] > self.ttl:
+            try:
+                results = await get_youtube_service().search(self.trending_query, _SECTION_SIZE)
+            except Exception as e:
+                logger.warning(f"Trending search failed: {e!r}")
+                return "trending", None
+            self._trending = (time.monotonic(), [t.model_dump() for t in results])
+        return "trending", {"id": "trending", "title": "Trending", "tracks": self._trending[1]}
+
+
+def _create_store():
+    if settings.HOME_FEED_BACKEND == "redis":
+        return RedisFeedStore(settings.REDIS_URL, settings.HOME_FEED_ACTIVE_SECONDS)
+    return MemoryFeedStore(settings.HOME_FEED_ACTIVE_SECONDS)
+
+
+# Singleton instance
+home_feed = HomeFeedService(
+    _create_store(),
+    ttl=settings.HOME_FEED_TTL,
+    concurrency=settings.HOME_FEED_CONCURRENCY,
+    cold_wait=settings.HOME_FEED_COLD_WAIT,
+    trending_query=settings.HOME_TRENDING_QUERY,
+)
+
+
+def get_home_feed() -> HomeFeedService:
+    """Get the home feed service instance."""
+    return home_feed
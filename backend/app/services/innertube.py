@@ -0,0 +1,193 @@
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.config import get_settings
+from app.schemas.user import TrackSearchResult
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_SEARCH_PATH = "/youtubei/v1/search"
+# Search filter "Type: Video" — what ytsearchN: asks for too
+_VIDEOS_ONLY = "EgIQAQ=="
+# Stop following continuations if pages stop yielding videos
+_MAX_PAGES = 5
+
+_DIGITS_RE = re.compile(r"\d")
+
+
+class SearchParseError(Exception):
+    """The search response didn't have the shape the parser expects."""
+
+
+def _text(node: Optional[dict]) -> Optional[str]:
+    """Plain text of a ``{"simpleText": ...}`` or ``{"runs": [...]}`` node."""
+    if not node:
+        return None
+    if "simpleText" in node:
+        return node["simpleText"]
+    runs = node.get("runs")
+    if runs:
+        return "".join(run.get("text", "") for run in runs)
+    return None
+
+
+def _parse_duration(text: Optional[str]) -> Optional[int]:
+    """``"1:02:03"`` -> 3723. None for live streams and unparsable text."""
+    if not text:
+        return None
+    seconds = 0
+    for part in text.split(":"):
+        if not part.isdigit():
+            return None
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+def _parse_view_count(text: Optional[str]) -> Optional[int]:
+    """``"1,234,567 views"`` -> 1234567. "No views" is 0."""
+    if not text:
+        return None
+    if text.lower().startswith("no views"):
+        return 0
+    digits = "".join(_DIGITS_RE.findall(text))
+    return int(digits) if digits else None
+
+
+def _video_result(renderer: Dict[str, Any]) -> TrackSearchResult:
+    video_id = renderer["videoId"]
+    return TrackSearchResult(
+        id=video_id,
+        title=_text(renderer.get("title")) or "Unknown",
+        artist=_text(renderer.get("ownerText")) or _text(renderer.get("longBylineText")),
+        duration=_parse_duration(_text(renderer.get("lengthText"))),
+        # The renderer's thumbnails are signed, size-specific URLs; use the
+        # same canonical one the yt-dlp path returns
+        thumbnail=f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg",
+        view_count=_parse_view_count(_text(renderer.get("viewCountText"))),
+    )
+
+
+def _page_items(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Top-level items of a first page or of a continuation page."""
+    try:
+        if "contents" in data:
+            primary = data["contents"]["twoColumnSearchResultsRenderer"]["primaryContents"]
+            return primary["sectionListRenderer"]["contents"]
+        for command in data["onResponseReceivedCommands"]:
+            action = command.get("appendContinuationItemsAction")
+            if action is not None:
+                return action.get("continuationItems", [])
+    except (KeyError, TypeError) as e:
+        raise SearchParseError(f"Unexpected search response layout: missing {e}") from e
+    raise SearchParseError("Search continuation had no items")
+
+
+def parse_search_page(data: Dict[str, Any]) -> Tuple[List[TrackSearchResult], Optional[str]]:
+    """Return the videos on one page of results and the next continuation token.
+
+    Only ``videoRenderer`` items are kept (shelves, ads, channels and
+    playlists are skipped), and only the fields ``TrackSearchResult`` needs
+    are read.
+    """
+    results: List[TrackSearchResult] = []
+    continuation = None
+    try:
+        for item in _page_items(data):
+            if "itemSectionRenderer" in item:
+                for content in item["itemSectionRenderer"].get("contents", []):
+                    if "videoRenderer" in content:
+                        results.append(_video_result(content["videoRenderer"]))
+            elif "continuationItemRenderer" in item:
+                endpoint = item["continuationItemRenderer"]["continuationEndpoint"]
+                continuation = endpoint["continuationCommand"]["token"]
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        raise SearchParseError(f"Unparsable search result: {e!r}") from e
+    return results, continuation
+
+
+class InnertubeSearchClient:
+    """Video search straight against YouTube's web JSON API, on the event loop.
+
+    One POST per page of ~20 results, following continuation tokens until
+    ``limit`` videos are collected — no yt-dlp and no executor hop.
+    """
+
+    def __init__(self, base_url: str, client_version: str):
+        self.base_url = base_url.rstrip("/")
+        self.client_version = client_version
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(10.0, connect=5.0),
+                headers={
+                    "Content-Type": "application/json",
+                    "Origin": "https://www.youtube.com",
+                    "X-YouTube-Client-Name": "1",
+                    "X-YouTube-Client-Version": self.client_version,
+                },
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+        return self._client
+
+    def _payload(self, **fields) -> dict:
+        return {
+            "context": {
+                "client": {
+                    "clientName": "WEB",
+                    "clientVersion": self.client_version,
+                    "hl": "en",
+                    "gl": "US",
+                }
+            },
+            **fields,
+        }
+
+    async def _post(self, payload: dict) -> Dict[str, Any]:
+        response = await self._get_client().post(
+            _SEARCH_PATH, params={"prettyPrint": "false"}, json=payload
+        )
+        response.raise_for_status()
+        try:
+            return response.json()
+        except ValueError as e:
+            raise SearchParseError("Search response was not JSON") from e
+
+    async def search(self, query: str, limit: int = 20) -> List[TrackSearchResult]:
+        """Search for videos. Raises :class:`SearchParseError` or ``httpx.HTTPError``."""
+        data = await self._post(self._payload(query=query, params=_VIDEOS_ONLY))
+        results: List[TrackSearchResult] = []
+        seen = set()
+        for _ in range(_MAX_PAGES):
+            page, continuation = parse_search_page(data)
+            for track in page:
+                if track.id not in seen:
+                    seen.add(track.id)
+                    results.append(track)
+            if len(results) >= limit or not continuation:
+                break
+            data = await self._post(self._payload(continuation=continuation))
+        if not results:
+            # Genuinely empty searches are rare; a renamed renderer is not
+            raise SearchParseError("No videos found in search response")
+        return results[:limit]
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Singleton instance
+innertube_search = InnertubeSearchClient(settings.INNERTUBE_BASE_URL, settings.INNERTUBE_CLIENT_VERSION)
+
+
+def get_innertube_search() -> InnertubeSearchClient:
+    """Get the native search client instance."""
+    return innertube_search
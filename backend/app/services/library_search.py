@@ -0,0 +1,213 @@
+import asyncio
+import bisect
+import heapq
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from sqlalchemy import String, func, literal, literal_column, or_, select, union
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.user import (
+    TRACK_SEARCH_TEXT,
+    TRACK_SEARCH_VECTOR,
+    LikedTrack,
+    Playlist,
+    Track,
+    playlist_tracks,
+)
+from app.schemas.user import TrackResponse
+
+settings = get_settings()
+
+_WORD_RE = re.compile(r"\w+")
+
+# In-memory fallback: indexes are rebuilt after this long even without an
+# invalidation, bounding staleness from writes handled by other workers
+_INDEX_TTL = 300.0
+# Query words share at least this fraction of their trigrams with a fuzzy match
+_FUZZY_MIN_OVERLAP = 0.5
+_FUZZY_WEIGHT = 0.8
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lower-cased, accent-folded words."""
+    if not text:
+        return []
+    folded = text.lower()
+    if not folded.isascii():
+        folded = unicodedata.normalize("NFKD", folded)
+        folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    return _WORD_RE.findall(folded)
+
+
+def _trigrams(word: str, pad_end: bool = True) -> Set[str]:
+    # Query words are left unpadded at the end: the user may still be typing
+    padded = f"  {word} " if pad_end else f"  {word}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _Entry(NamedTuple):
+    track: TrackResponse
+    title_key: str
+
+
+class LibraryIndex:
+    """Inverted index over one user's library for prefix and typo-tolerant search.
+
+    Every query word must match some word of the title or artist, either as
+    a prefix or, for words of three letters or more, fuzzily by trigram
+    overlap (so "beatels" still finds "Beatles"). Exact and prefix matches
+    rank above fuzzy ones.
+    """
+
+    def __init__(self, tracks: List[TrackResponse]):
+        self.entries = [_Entry(track, track.title.lower()) for track in tracks]
+        postings: Dict[str, List[int]] = {}
+        for i, track in enumerate(tracks):
+            for token in tokenize(f"{track.title} {track.artist or ''}"):
+                ids = postings.get(token)
+                if ids is None:
+                    postings[token] = [i]
+                elif ids[-1] != i:
+                    ids.append(i)
+        self.postings = postings
+        self.tokens = sorted(postings)
+        trigram_tokens: Dict[str, List[str]] = {}
+        for token in self.tokens:
+            for gram in _trigrams(token):
+                trigram_tokens.setdefault(gram, []).append(token)
+        self.trigram_tokens = trigram_tokens
+        self.built_at = time.monotonic()
+
+    def _expand(self, word: str) -> Dict[str, float]:
+        """Library tokens matching ``word``, with a match score."""
+        matches: Dict[str, float] = {}
+        i = bisect.bisect_left(self.tokens, word)
+        while i < len(self.tokens) and self.tokens[i].startswith(word):
+            token = self.tokens[i]
+            matches[token] = 1.0 if token == word else 0.9
+            i += 1
+        if len(word) >= 3:
+            grams = _trigrams(word, pad_end=False)
+            shared: Dict[str, int] = {}
+            for gram in grams:
+                for token in self.trigram_tokens.get(gram, ()):
+                    shared[token] = shared.get(token, 0) + 1
+            for token, count in shared.items():
+                overlap = count / len(grams)
+                if overlap >= _FUZZY_MIN_OVERLAP and token not in matches:
+                    matches[token] = _FUZZY_WEIGHT * overlap
+        return matches
+
+    def search(self, query: str, limit: int) -> List[TrackResponse]:
+        words = tokenize(query)
+        if not words:
+            return []
+        scores: Optional[Dict[int, float]] = None
+        for word in words:
+            best: Dict[int, float] = {}
+            for token, score in self._expand(word).items():
+                for i in self.postings[token]:
+                    if score > best.get(i, 0.0):
+                        best[i] = score
+            if scores is None:
+                scores = best
+            else:
+                scores = {i: scores[i] + score for i, score in best.items() if i in scores}
+            if not scores:
+                return []
+        top = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], self.entries[item[0]].title_key))
+        return [self.entries[i].track for i, _ in top]
+
+
+class LibrarySearch:
+    """Search over the tracks in a user's own playlists and likes.
+
+    On PostgreSQL this is one indexed query: a ``simple``-config tsvector
+    matched against a prefix tsquery, or'ed with ``pg_trgm`` word similarity
+    for typos (both GIN indexes from migrations 0004 and 0006). Other
+    databases use a per-user :class:`LibraryIndex` kept in memory, dropped by
+    :meth:`invalidate` when the library changes. Both fold accents: ``unaccent``
+    on the indexed text and the query here, :func:`tokenize` in the index.
+    """
+
+    def __init__(self, use_postgres: bool, max_cached_users: int):
+        self.use_postgres = use_postgres
+        self.max_cached_users = max_cached_users
+        self._indexes: "OrderedDict[str, LibraryIndex]" = OrderedDict()
+
+    @staticmethod
+    def _library_ids(user_id: str):
+        return union(
+            select(playlist_tracks.c.track_id)
+            .join(Playlist, Playlist.id == playlist_tracks.c.playlist_id)
+            .where(Playlist.owner_id == user_id),
+            select(LikedTrack.track_id).where(LikedTrack.user_id == user_id),
+        ).subquery()
+
+    async def search(self, db: AsyncSession, user_id: str, query: str, limit: int) -> List[TrackResponse]:
+        if self.use_postgres:
+            return await self._search_postgres(db, user_id, query, limit)
+        index = await self._get_index(db, user_id)
+        return index.search(query, limit)
+
+    async def _search_postgres(self, db: AsyncSession, user_id: str, query: str, limit: int) -> List[TrackResponse]:
+        words = tokenize(query)
+        if not words:
+            return []
+        # Words are \w-only, so they can't carry tsquery syntax. Folded by the
+        # same unaccent() as the indexed text, not just by tokenize()
+        terms = func.immutable_unaccent(" & ".join(f"{w}:*" for w in words), type_=String)
+        prefix_query = func.to_tsquery(literal_column("'simple'"), terms)
+        text_match = TRACK_SEARCH_VECTOR.op("@@")(prefix_query)
+        normalized = func.immutable_unaccent(literal(" ".join(words), String), type_=String)
+        similar = func.word_similarity(normalized, TRACK_SEARCH_TEXT)
+        library = self._library_ids(user_id)
+        result = await db.execute(
+            select(Track)
+            .join(library, library.c.track_id == Track.id)
+            .where(or_(text_match, normalized.op("<%")(TRACK_SEARCH_TEXT)))
+            .order_by(text_match.desc(), similar.desc(), Track.title)
+            .limit(limit)
+        )
+        return [TrackResponse.model_validate(track) for track in result.scalars()]
+
+    async def _get_index(self, db: AsyncSession, user_id: str) -> LibraryIndex:
+        index = self._indexes.get(user_id)
+        if index is not None and time.monotonic() - index.built_at < _INDEX_TTL:
+            self._indexes.move_to_end(user_id)
+            return index
+
+        library = self._library_ids(user_id)
+        result = await db.execute(
+            select(Track).join(library, library.c.track_id == Track.id)
+        )
+        tracks = [TrackResponse.model_validate(track) for track in result.scalars()]
+        # Large libraries take a noticeable while to index; keep it off the loop
+        index = await asyncio.to_thread(LibraryIndex, tracks)
+        self._indexes[user_id] = index
+        self._indexes.move_to_end(user_id)
+        while len(self._indexes) > self.max_cached_users:
+            self._indexes.popitem(last=False)
+        return index
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop ``user_id``'s in-memory index after their playlists or likes change."""
+        self._indexes.pop(user_id, None)
+
+
+# Singleton instance
+library_search = LibrarySearch(
+    use_postgres=make_url(settings.DATABASE_URL).get_backend_name() == "postgresql",
+    max_cached_users=settings.LIBRARY_INDEX_MAX_USERS,
+)
+
+
+def get_library_search() -> LibrarySearch:
+    """Get the library search instance."""
+    return library_search
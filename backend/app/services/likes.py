@@ -0,0 +1,41 @@
+import time
+from typing import Dict, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.user import LikedTrack
+
+settings = get_settings()
+
+# Per-user liked track IDs: { user_id: (set_of_track_ids, expiry_time) }.
+# Kept current by like/unlike on this worker; the TTL bounds staleness from
+# writes handled by other workers.
+_liked_cache: Dict[str, Tuple[Set[str], float]] = {}
+_MAX_CACHED_USERS = 10000
+
+
+async def get_liked_ids(db: AsyncSession, user_id: str) -> Set[str]:
+    """Return the set of track IDs ``user_id`` has liked (cached)."""
+    entry = _liked_cache.get(user_id)
+    if entry is not None and time.monotonic() < entry[1]:
+        return entry[0]
+
+    result = await db.execute(select(LikedTrack.track_id).where(LikedTrack.user_id == user_id))
+    liked = set(result.scalars().all())
+    if len(_liked_cache) >= _MAX_CACHED_USERS:
+        _liked_cache.pop(next(iter(_liked_cache)), None)
+    _liked_cache[user_id] = (liked, time.monotonic() + settings.LIKES_CACHE_TTL_SECONDS)
+    return liked
+
+
+def mark_liked(user_id: str, track_id: str, liked: bool) -> None:
+    """Apply a like/unlike to the cached set, if this user's set is cached."""
+    entry = _liked_cache.get(user_id)
+    if entry is None:
+        return
+    if liked:
+        entry[0].add(track_id)
+    else:
+        entry[0].discard(track_id)
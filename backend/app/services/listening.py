@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, List, Optional
+
+from sqlalchemy import insert
+
+from app.config import get_settings
+from app.core.metrics import LISTENING_EVENTS, LISTENING_EVENTS_PENDING
+from app.db.database import async_session
+from app.models.user import ListeningEvent
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Bound on rows per INSERT: 6 bind parameters each must stay under
+# PostgreSQL's 32767 (and SQLite's 32766) per statement
+_MAX_BATCH = 5000
+
+
+class ListeningEventBuffer:
+    """In-process write-behind buffer for listening events.
+
+    :meth:`record` only appends to a deque, so callers on the playback path
+    never wait on the database. A background task writes the buffer out as
+    multi-row INSERTs, as soon as ``batch_size`` events are waiting or every
+    ``flush_interval`` seconds otherwise. Past ``max_pending`` unwritten
+    events (e.g. the database is down) new events are refused rather than
+    growing memory; a failed batch is put back and retried on the next tick.
+    Whatever is left is written when the app shuts down.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, max_pending: int):
+        self.batch_size = min(batch_size, _MAX_BATCH)
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Deque[dict] = deque()
+        self._wake: Optional[asyncio.Event] = None  # created on the serving loop by start()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def record(self, user_id: str, track_id: str, event: str, position: Optional[int] = None) -> bool:
+        """Queue an event for writing. Returns False if the buffer is full and it was dropped."""
+        if len(self._pending) >= self.max_pending:
+            LISTENING_EVENTS.labels("dropped").inc()
+            return False
+        self._pending.append({
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "track_id": track_id,
+            "event": event,
+            "position": position,
+            "occurred_at": datetime.now(timezone.utc),
+        })
+        LISTENING_EVENTS.labels("buffered").inc()
+        LISTENING_EVENTS_PENDING.set(len(self._pending))
+        if len(self._pending) >= self.batch_size and self._wake is not None:
+            self._wake.set()
+        return True
+
+    def pending_for(self, user_id: str) -> List[dict]:
+        """The user's events not yet written, newest first."""
+        return [row for row in reversed(self._pending) if row["user_id"] == user_id]
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Write out everything still buffered and stop the flusher."""
+        if self._task is None:
+            return
+        # Not cancelled: a batch mid-INSERT would be lost
+        self._stopping = True
+        self._wake.set()
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self._drain()
+        await self._drain()
+        if self._pending:
+            logger.warning(f"Shutting down with {len(self._pending)} listening events unwritten")
+
+    async def _drain(self) -> None:
+        # Stop at the first failure and leave the rest for the next tick
+        while self._pending and await self._flush_batch():
+            pass
+
+    async def _flush_batch(self) -> bool:
+        batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+        try:
+            async with async_session() as db:
+                await db.execute(insert(ListeningEvent.__table__).values(batch))
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Writing {len(batch)} listening events failed: {e!r}")
+            LISTENING_EVENTS.labels("failed").inc(len(batch))
+            # Back at the front, in order; the oldest go if new events filled the room
+            room = max(self.max_pending - len(self._pending), 0)
+            if room < len(batch):
+                LISTENING_EVENTS.labels("dropped").inc(len(batch) - room)
+            self._pending.extendleft(reversed(batch[len(batch) - room:]))
+            LISTENING_EVENTS_PENDING.set(len(self._pending))
+            return False
+        LISTENING_EVENTS.labels("written").inc(len(batch))
+        LISTENING_EVENTS_PENDING.set(len(self._pending))
+        return True
+
+
+# Singleton instance
+listening_events = ListeningEventBuffer(
+    batch_size=settings.HISTORY_BATCH_SIZE,
+    flush_interval=settings.HISTORY_FLUSH_INTERVAL,
+    max_pending=settings.HISTORY_MAX_PENDING,
+)
+
+
+def get_listening_events() -> ListeningEventBuffer:
+    """Get the listening event buffer instance."""
+    return listening_events
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class TooManyStreams(Exception):
+    """Raised when a user already has the maximum number of open streams."""
+
+
+class UserStreamStats:
+    """Per-user proxy accounting and fair-share egress state."""
+
+    __slots__ = ("active", "bytes_out", "streams_total", "rejected", "weight", "tokens", "refilled_at")
+
+    def __init__(self):
+        self.active = 0
+        self.bytes_out = 0
+        self.streams_total = 0
+        self.rejected = 0
+        self.weight = 1.0
+        self.tokens = 0.0
+        self.refilled_at = time.monotonic()
+
+    def as_dict(self) -> dict:
+        return {
+            "active_streams": self.active,
+            "bytes_out": self.bytes_out,
+            "streams_total": self.streams_total,
+            "rejected": self.rejected,
+        }
+
+
+class StreamLease:
+    """One open proxied stream held by a user.
+
+    The proxy loop calls :meth:`record` per chunk, and brackets handing each
+    chunk to the client with :meth:`sending` and :meth:`sent`. The governor's
+    reaper calls ``on_idle`` once a send has been blocked (the client isn't
+    reading) for the idle timeout. Time spent waiting on upstream never counts,
+    so a slow googlevideo response isn't mistaken for an idle client.
+    """
+
+    __slots__ = ("governor", "user_id", "stats", "blocked_since", "on_idle", "idle", "_released")
+
+    def __init__(self, governor: "StreamGovernor", user_id: str, stats: UserStreamStats):
+        self.governor = governor
+        self.user_id = user_id
+        self.stats = stats
+        self.blocked_since: Optional[float] = None  # set while a chunk waits on the client
+        self.on_idle: Optional[Callable[[], Awaitable[None]]] = None
+        self.idle = False
+        self._released = False
+
+    def record(self, nbytes: int) -> None:
+        self.stats.bytes_out += nbytes
+
+    def sending(self) -> None:
+        self.blocked_since = time.monotonic()
+
+    def sent(self) -> None:
+        self.blocked_since = None
+        self.idle = False
+
+    async def throttle(self, nbytes: int) -> None:
+        await self.governor.throttle(self.stats, nbytes)
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self.governor._release(self)
+
+
+class StreamGovernor:
+    """Per-user concurrency limits, idle reaping and weighted fair-share egress.
+
+    When ``egress_bytes_per_sec`` is set, the budget is split between users
+    that currently have streams open in proportion to their weight, each
+    drawing from its own token bucket — a heavy user is throttled to its share
+    while everyone else keeps theirs.
+    """
+
+    def __init__(self, max_streams: int, idle_timeout: float, egress_bytes_per_sec: int):
+        self.max_streams = max_streams
+        self.idle_timeout = idle_timeout
+        self.egress_bytes_per_sec = egress_bytes_per_sec
+        self._users: Dict[str, UserStreamStats] = {}
+        self._active_weight = 0.0  # sum of weights of users with open streams
+        self._leases: set = set()
+        self._reaper: Optional[asyncio.Task] = None
+
+    @property
+    def egress_limited(self) -> bool:
+        return self.egress_bytes_per_sec > 0
+
+    def _stats(self, user_id: str) -> UserStreamStats:
+        stats = self._users.get(user_id)
+        if stats is None:
+            stats = self._users[user_id] = UserStreamStats()
+        return stats
+
+    def set_weight(self, user_id: str, weight: float) -> None:
+        """Give a user a larger (or smaller) share of the egress budget."""
+        stats = self._stats(user_id)
+        weight = max(weight, 0.01)
+        if stats.active:
+            self._active_weight += weight - stats.weight
+        stats.weight = weight
+
+    def acquire(self, user_id: str) -> StreamLease:
+        """Open a stream slot for ``user_id`` or raise :class:`TooManyStreams`."""
+        stats = self._stats(user_id)
+        if self.max_streams and stats.active >= self.max_streams:
+            stats.rejected += 1
+            raise TooManyStreams(user_id)
+        if stats.active == 0:
+            self._active_weight += stats.weight
+        stats.active += 1
+        stats.streams_total += 1
+        lease = StreamLease(self, user_id, stats)
+        self._leases.add(lease)
+        if self.idle_timeout and (self._reaper is None or self._reaper.done()):
+            self._reaper = asyncio.create_task(self._reap_idle())
+        return lease
+
+    def _release(self, lease: StreamLease) -> None:
+        self._leases.discard(lease)
+        lease.stats.active -= 1
+        if lease.stats.active == 0:
+            self._active_weight -= lease.stats.weight
+
+    async def throttle(self, stats: UserStreamStats, nbytes: int) -> None:
+        """Wait until the user's fair share of the egress budget covers ``nbytes``."""
+        rate = self.egress_bytes_per_sec * stats.weight / max(self._active_weight, stats.weight)
+        now = time.monotonic()
+        # Allow at most one second of burst
+        stats.tokens = min(stats.tokens + (now - stats.refilled_at) * rate, rate)
+        stats.refilled_at = now
+        stats.tokens -= nbytes
+        if stats.tokens < 0:
+            await asyncio.sleep(-stats.tokens / rate)
+
+    async def _reap_idle(self) -> None:
+        interval = max(self.idle_timeout / 4, 0.5)
+        while self._leases:
+            await asyncio.sleep(interval)
+            deadline = time.monotonic() - self.idle_timeout
+            for lease in list(self._leases):
+                blocked_since = lease.blocked_since
+                if lease.idle or blocked_since is None or blocked_since > deadline or lease.on_idle is None:
+                    continue
+                lease.idle = True
+                try:
+                    await lease.on_idle()
+                except Exception as e:
+                    logger.warning(f"Releasing idle stream for {lease.user_id} failed: {e}")
+
+    def usage(self, user_id: str) -> dict:
+        """Return the byte and stream counters for ``user_id``."""
+        stats = self._users.get(user_id)
+        return (stats or UserStreamStats()).as_dict()
+
+
+# Singleton instance
+stream_governor = StreamGovernor(
+    max_streams=settings.STREAM_MAX_PER_USER,
+    idle_timeout=settings.STREAM_IDLE_TIMEOUT_SECONDS,
+    egress_bytes_per_sec=settings.STREAM_EGRESS_BYTES_PER_SEC,
+)
+
+
+def get_stream_governor() -> StreamGovernor:
+    """Get the stream governor instance."""
+    return stream_governor
@@ -0,0 +1,317 @@
+import asyncio
+import logging
+import re
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, Optional
+
+import httpx
+
+from app.config import get_settings
+from app.core.metrics import (
+    STREAM_MUX_DETACHES,
+    STREAM_MUX_JOINS,
+    STREAM_MUX_SHARED,
+    STREAM_MUX_UPSTREAMS,
+)
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+_CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+|\*)$")
+
+# Opens an upstream response for the given Range header value (or None)
+UpstreamOpener = Callable[[Optional[str]], Awaitable[httpx.Response]]
+
+
+class _OpenerCancelled(Exception):
+    """The request opening a shared upstream was cancelled before it opened."""
+
+
+class SharedUpstream:
+    """One upstream response body fanned out to any number of subscribers.
+
+    A single pump task reads the upstream body into a bounded ring buffer of
+    chunks. Subscribers read from the buffer at their own pace: the pump only
+    stays a bounded distance ahead of the *fastest* subscriber, so a slow
+    subscriber never stalls a fast one — once it falls off the back of the
+    ring it detaches and resumes on a private upstream connection from its
+    current byte offset.
+    """
+
+    def __init__(self, key: Optional[str], start: int, range_header: Optional[str], max_bytes: int):
+        self.key = key
+        self.start = start
+        self.end: Optional[int] = None  # last byte upstream is sending, if bounded
+        self.range_header = range_header
+        self.max_bytes = max_bytes
+        self.response: Optional[httpx.Response] = None
+        self.opened: asyncio.Future = asyncio.get_running_loop().create_future()
+
+        self._chunks: Deque[bytes] = deque()
+        self._first_seq = 0  # sequence number of _chunks[0]
+        self._buffered = 0  # bytes currently held in _chunks
+        self._received = 0  # bytes read from upstream so far
+        self._fastest_seq = 0  # furthest chunk any subscriber has consumed
+        self._fastest_offset = 0
+        self._new_data = asyncio.Event()
+        self._pump_wake = asyncio.Event()
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._task: Optional[asyncio.Task] = None
+        self.subscribers = 0
+
+    @property
+    def status_code(self) -> int:
+        return self.response.status_code
+
+    @property
+    def headers(self) -> httpx.Headers:
+        return self.response.headers
+
+    def joinable(self) -> bool:
+        """Late joiners can be served only while the buffered prefix is intact."""
+        if self._first_seq != 0 or self._error is not None:
+            return False
+        if self.opened.done():
+            if self.opened.cancelled() or self.opened.exception() is not None:
+                return False
+            return self.status_code in (200, 206)
+        return True
+
+    async def open(self, open_upstream: UpstreamOpener) -> None:
+        try:
+            self.response = await open_upstream(self.range_header)
+        except asyncio.CancelledError:
+            # Only the opener was cancelled: joiners get an error they can
+            # retry on rather than a CancelledError of their own
+            self.opened.set_exception(_OpenerCancelled())
+            self.opened.exception()
+            raise
+        except Exception as e:
+            self.opened.set_exception(e)
+            # Mark retrieved so an unjoined failure doesn't log a warning
+            self.opened.exception()
+            raise
+        self._served_range()
+        self.opened.set_result(None)
+        self._task = asyncio.create_task(self._pump())
+
+    def _served_range(self) -> None:
+        # The bytes actually being sent: a suffix range ("bytes=-N") only
+        # says where it starts in the response, and upstream may ignore
+        # Range altogether
+        if self.response.status_code != 206:
+            self.start, self.end = 0, None
+            return
+        match = _CONTENT_RANGE_RE.match(self.response.headers.get("content-range", ""))
+        if match:
+            self.start, self.end = int(match.group(1)), int(match.group(2))
+
+    async def _pump(self) -> None:
+        read_ahead = max(self.max_bytes // 2, CHUNK_SIZE)
+        try:
+            async for chunk in self.response.aiter_bytes(chunk_size=CHUNK_SIZE):
+                self._chunks.append(chunk)
+                self._buffered += len(chunk)
+                self._received += len(chunk)
+                while self._buffered > self.max_bytes and len(self._chunks) > 1:
+                    self._buffered -= len(self._chunks.popleft())
+                    self._first_seq += 1
+                self._notify()
+                # Don't run further ahead of the fastest reader than read_ahead
+                while self._received - self._fastest_offset > read_ahead:
+                    self._pump_wake.clear()
+                    await self._pump_wake.wait()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._error = e
+        finally:
+            self._done = True
+            self._notify()
+            await self.response.aclose()
+
+    def _notify(self) -> None:
+        event, self._new_data = self._new_data, asyncio.Event()
+        event.set()
+
+    def _advance(self, seq: int, offset: int) -> None:
+        if seq > self._fastest_seq:
+            self._fastest_seq = seq
+            self._fastest_offset = offset
+            self._pump_wake.set()
+
+    async def close(self) -> None:
+        """Stop the pump; it closes the upstream response on the way out."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+class Subscription:
+    """A single client's view of a :class:`SharedUpstream`.
+
+    Starts out reading from the shared ring buffer and switches to a private,
+    resumable upstream connection when it falls behind, when the shared
+    upstream fails, or after :meth:`release_upstream` is called on a stalled
+    client.
+    """
+
+    def __init__(self, mux: "StreamMultiplexer", shared: SharedUpstream, open_upstream: UpstreamOpener):
+        self._mux = mux
+        self._shared = shared
+        self._open_upstream = open_upstream
+        self._attached = True  # still subscribed to the shared upstream
+        self._private: Optional[httpx.Response] = None
+        self._offset = 0  # bytes yielded so far
+        self._closed = False
+
+    @property
+    def status_code(self) -> int:
+        return self._shared.status_code
+
+    @property
+    def headers(self) -> httpx.Headers:
+        return self._shared.headers
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        shared = self._shared
+        seq = 0
+        while self._attached:
+            if seq < shared._first_seq or (shared._error is not None and seq >= shared._first_seq + len(shared._chunks)):
+                # Fell off the ring buffer, or the shared upstream failed —
+                # continue on a private connection from where we are
+                STREAM_MUX_DETACHES.inc()
+                await self._detach()
+                break
+            index = seq - shared._first_seq
+            if index < len(shared._chunks):
+                chunk = shared._chunks[index]
+                seq += 1
+                self._offset += len(chunk)
+                shared._advance(seq, self._offset)
+                yield chunk
+                continue
+            if shared._done:
+                return
+            await shared._new_data.wait()
+
+        chunks = None
+        while not self._closed:
+            if self._private is None:
+                position = shared.start + self._offset
+                if shared.end is not None and position > shared.end:
+                    return
+                end = shared.end if shared.end is not None else ""
+                self._private = await self._open_upstream(f"bytes={position}-{end}")
+                STREAM_MUX_UPSTREAMS.labels("resume").inc()
+                if self._private.status_code not in (200, 206):
+                    logger.warning(f"Stream resume at byte {position} got HTTP {self._private.status_code}")
+                    return
+                chunks = self._private.aiter_bytes(chunk_size=CHUNK_SIZE)
+            try:
+                chunk = await chunks.__anext__()
+            except StopAsyncIteration:
+                return
+            self._offset += len(chunk)
+            yield chunk
+
+    async def _detach(self) -> None:
+        if self._attached:
+            self._attached = False
+            await self._mux._release(self._shared)
+
+    async def release_upstream(self) -> None:
+        """Give up any upstream connection; iteration reopens one from the
+        current offset if the client resumes reading."""
+        await self._detach()
+        if self._private is not None:
+            private, self._private = self._private, None
+            await private.aclose()
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        await self.release_upstream()
+
+
+class StreamMultiplexer:
+    """Shares in-flight upstream stream bodies between overlapping requests.
+
+    Streams are keyed by the caller (e.g. video, format and range start);
+    requests with the same key subscribe to one upstream connection instead
+    of each opening their own.
+    """
+
+    def __init__(self, buffer_bytes: int):
+        self.buffer_bytes = buffer_bytes
+        self._streams: Dict[str, SharedUpstream] = {}
+
+    async def subscribe(
+        self,
+        key: Optional[str],
+        start: int,
+        range_header: Optional[str],
+        open_upstream: UpstreamOpener,
+    ) -> Subscription:
+        """Subscribe to the stream for ``key``, opening it upstream if needed.
+
+        A ``None`` key gets a private, unshared upstream (e.g. bounded ranges).
+        Raises whatever ``open_upstream`` raises if the upstream can't be opened.
+        """
+        while True:
+            shared = self._streams.get(key) if key is not None else None
+            if shared is None or not shared.joinable():
+                break
+            shared.subscribers += 1
+            STREAM_MUX_JOINS.inc()
+            try:
+                await asyncio.shield(shared.opened)
+            except _OpenerCancelled:
+                # The opening request went away; open afresh, or join
+                # whichever surviving subscriber got there first
+                await self._release(shared)
+                continue
+            except BaseException:
+                await self._release(shared)
+                raise
+            return Subscription(self, shared, open_upstream)
+
+        shared = SharedUpstream(key, start, range_header, self.buffer_bytes)
+        shared.subscribers += 1
+        if key is not None:
+            self._streams[key] = shared
+        try:
+            await shared.open(open_upstream)
+        except BaseException:
+            await self._release(shared)
+            raise
+        STREAM_MUX_UPSTREAMS.labels("new").inc()
+        return Subscription(self, shared, open_upstream)
+
+    async def _release(self, shared: SharedUpstream) -> None:
+        shared.subscribers -= 1
+        if shared.subscribers > 0:
+            return
+        if shared.key is not None and self._streams.get(shared.key) is shared:
+            del self._streams[shared.key]
+        await shared.close()
+
+    @property
+    def active_streams(self) -> int:
+        return len(self._streams)
+
+
+# Singleton instance
+stream_mux = StreamMultiplexer(settings.STREAM_MUX_BUFFER_MB * 1024 * 1024)
+STREAM_MUX_SHARED.set_function(lambda: stream_mux.active_streams)
+
+
+def get_stream_mux() -> StreamMultiplexer:
+    """Get the stream multiplexer instance."""
+    return stream_mux
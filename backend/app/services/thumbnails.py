@@ -0,0 +1,309 @@
+import asyncio
+import io
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from app.config import get_settings
+from app.core.metrics import THUMBNAIL_REQUESTS
+from app.core.rate_limit import admit_extraction
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Widths of the WebP variants, in pixels. Requests are served the smallest
+# variant at least as wide as asked for.
+THUMBNAIL_SIZES = (64, 128, 320)
+THUMBNAIL_MAX_AGE = 7 * 24 * 3600
+
+# mqdefault is 320x180 with no letterboxing, enough for every variant;
+# hqdefault (480x360, black bars on 16:9 videos) exists for a few more videos
+_SOURCES = ("mqdefault.jpg", "hqdefault.jpg")
+_WEBP_QUALITY = 80
+
+
+class ThumbnailNotFound(Exception):
+    """YouTube has no thumbnail for this video."""
+
+
+class ThumbnailUpstreamError(Exception):
+    """Fetching the source image failed."""
+
+
+def pick_size(requested: int) -> int:
+    """Smallest variant at least ``requested`` pixels wide (else the largest)."""
+    for size in THUMBNAIL_SIZES:
+        if size >= requested:
+            return size
+    return THUMBNAIL_SIZES[-1]
+
+
+def render_variants(source: bytes) -> Dict[int, bytes]:
+    """Decode a JPEG and encode every size variant as WebP (CPU-bound)."""
+    # Imported on first use, off the startup path
+    from PIL import Image
+
+    with Image.open(io.BytesIO(source)) as image:
+        image = image.convert("RGB")
+        variants = {}
+        for size in THUMBNAIL_SIZES:
+            height = max(round(image.height * size / image.width), 1)
+            resized = image if size >= image.width else image.resize((size, height), Image.LANCZOS)
+            out = io.BytesIO()
+            resized.save(out, "WEBP", quality=_WEBP_QUALITY, method=4)
+            variants[size] = out.getvalue()
+    return variants
+
+
+class MemoryLRU:
+    """Byte-bounded in-memory LRU of encoded images."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._size = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry[0] > THUMBNAIL_MAX_AGE:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: str, body: bytes, created: Optional[float] = None) -> None:
+        if len(body) > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = (created or time.time(), body)
+        self._size += len(body)
+        while self._size > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def _remove(self, key: str) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old[1])
+
+
+class DiskLRU:
+    """Byte-bounded LRU of files in one directory.
+
+    The index (name -> size, in recency order) is rebuilt on first use from
+    file mtimes, i.e. write order. File I/O runs in worker threads; the index
+    is only touched on the event loop.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._index: "Optional[OrderedDict[str, int]]" = None
+        self._size = 0
+
+    def _scan(self) -> "OrderedDict[str, int]":
+        os.makedirs(self.directory, exist_ok=True)
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, entry.name, stat.st_size))
+        files.sort()
+        return OrderedDict((name, size) for _, name, size in files)
+
+    async def _ensure_index(self) -> "OrderedDict[str, int]":
+        if self._index is None:
+            index = await asyncio.to_thread(self._scan)
+            if self._index is None:
+                self._index = index
+                self._size = sum(index.values())
+        return self._index
+
+    def _read(self, path: str) -> Optional[Tuple[float, bytes]]:
+        try:
+            created = os.stat(path).st_mtime
+            with open(path, "rb") as f:
+                body = f.read()
+            return created, body
+        except FileNotFoundError:
+            return None
+
+    def _write(self, path: str, body: bytes) -> None:
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(body)
+        os.replace(tmp, path)
+
+    def _unlink(self, path: str) -> None:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    async def get(self, name: str) -> Optional[Tuple[float, bytes]]:
+        """Return (written_at, body), or None if absent or older than the max age."""
+        index = await self._ensure_index()
+        if name not in index:
+            return None
+        entry = await asyncio.to_thread(self._read, os.path.join(self.directory, name))
+        if entry is None:
+            self._size -= index.pop(name, 0)
+            return None
+        if time.time() - entry[0] > THUMBNAIL_MAX_AGE:
+            return None  # left in place; the refetch overwrites it
+        index.move_to_end(name)
+        return entry
+
+    async def put(self, name: str, body: bytes) -> None:
+        index = await self._ensure_index()
+        if len(body) > self.max_bytes:
+            return
+        await asyncio.to_thread(self._write, os.path.join(self.directory, name), body)
+        self._size += len(body) - index.pop(name, 0)
+        index[name] = len(body)
+        evicted = []
+        while self._size > self.max_bytes:
+            old, size = index.popitem(last=False)
+            self._size -= size
+            evicted.append(os.path.join(self.directory, old))
+        for path in evicted:
+            await asyncio.to_thread(self._unlink, path)
+
+
+class ThumbnailService:
+    """Resized WebP thumbnails, served from memory, then disk, then YouTube.
+
+    A miss fetches the source image once and encodes every size variant, so
+    the other sizes of the same thumbnail are already cached; concurrent
+    misses for the same video share that work. Videos YouTube has no
+    thumbnail for are remembered for ``not_found_ttl`` seconds, and only
+    requests that go upstream are charged to the caller's rate limit.
+    """
+
+    MAX_NOT_FOUND = 10000
+
+    def __init__(self, base_url: str, memory_bytes: int, disk_dir: str, disk_bytes: int, not_found_ttl: float = 0):
+        self.base_url = base_url.rstrip("/")
+        self.memory = MemoryLRU(memory_bytes)
+        self.disk = DiskLRU(disk_dir, disk_bytes) if disk_dir and disk_bytes > 0 else None
+        self.not_found_ttl = not_found_ttl
+        self._not_found: "OrderedDict[str, float]" = OrderedDict()  # video_id -> expiry
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(10.0, connect=5.0),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+        return self._client
+
+    async def get(self, video_id: str, size: int) -> bytes:
+        """WebP bytes of ``video_id``'s thumbnail at variant width ``size``."""
+        key = f"{video_id}_{size}.webp"
+        body = self.memory.get(key)
+        if body is not None:
+            THUMBNAIL_REQUESTS.labels("memory").inc()
+            return body
+
+        if self.disk is not None:
+            try:
+                entry = await self.disk.get(key)
+            except OSError as e:
+                logger.warning(f"Thumbnail disk cache read failed: {e}")
+                entry = None
+            if entry is not None:
+                created, body = entry
+                THUMBNAIL_REQUESTS.labels("disk").inc()
+                self.memory.put(key, body, created)
+                return body
+
+        expiry = self._not_found.get(video_id)
+        if expiry is not None:
+            if time.monotonic() < expiry:
+                THUMBNAIL_REQUESTS.labels("not_found").inc()
+                raise ThumbnailNotFound(video_id)
+            del self._not_found[video_id]
+
+        if video_id not in self._inflight:
+            await admit_extraction()
+        task = self._inflight.get(video_id)
+        if task is not None:
+            THUMBNAIL_REQUESTS.labels("coalesced").inc()
+        else:
+            THUMBNAIL_REQUESTS.labels("upstream").inc()
+            # Its own task, so cancelling whichever request started it
+            # doesn't cancel the work for everyone else waiting on it
+            task = asyncio.create_task(self._produce(video_id))
+            self._inflight[video_id] = task
+            task.add_done_callback(lambda t: self._produced(video_id, t))
+        variants = await asyncio.shield(task)
+        return variants[size]
+
+    def _produced(self, video_id: str, task: asyncio.Task) -> None:
+        del self._inflight[video_id]
+        if task.cancelled():
+            return
+        # Mark retrieved so a fetch nobody awaited any more doesn't log a warning
+        if isinstance(task.exception(), ThumbnailNotFound) and self.not_found_ttl > 0:
+            self._not_found[video_id] = time.monotonic() + self.not_found_ttl
+            while len(self._not_found) > self.MAX_NOT_FOUND:
+                self._not_found.popitem(last=False)
+
+    async def _fetch_source(self, video_id: str) -> bytes:
+        client = self._get_client()
+        for name in _SOURCES:
+            try:
+                resp = await client.get(f"{self.base_url}/vi/{video_id}/{name}")
+            except httpx.HTTPError as e:
+                raise ThumbnailUpstreamError(f"Thumbnail fetch failed: {e!r}") from e
+            if resp.status_code == 200:
+                return resp.content
+            if resp.status_code != 404:
+                raise ThumbnailUpstreamError(f"Thumbnail upstream returned {resp.status_code}")
+        raise ThumbnailNotFound(video_id)
+
+    async def _produce(self, video_id: str) -> Dict[int, bytes]:
+        source = await self._fetch_source(video_id)
+        try:
+            variants = await asyncio.to_thread(render_variants, source)
+        except Exception as e:
+            raise ThumbnailUpstreamError(f"Undecodable thumbnail for {video_id}: {e!r}") from e
+        for size, body in variants.items():
+            self.memory.put(f"{video_id}_{size}.webp", body)
+        if self.disk is not None:
+            try:
+                for size, body in variants.items():
+                    await self.disk.put(f"{video_id}_{size}.webp", body)
+            except OSError as e:
+                # The memory copy still serves; a full or read-only disk shouldn't fail requests
+                logger.warning(f"Thumbnail disk cache write failed: {e}")
+        return variants
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Singleton instance
+thumbnail_service = ThumbnailService(
+    settings.THUMBNAIL_UPSTREAM_URL,
+    settings.THUMBNAIL_MEMORY_CACHE_MB * 1024 * 1024,
+    settings.THUMBNAIL_CACHE_DIR,
+    settings.THUMBNAIL_DISK_CACHE_MB * 1024 * 1024,
+    settings.THUMBNAIL_NOT_FOUND_TTL_SECONDS,
+)
+
+
+def get_thumbnail_service() -> ThumbnailService:
+    """Get the thumbnail service instance."""
+    return thumbnail_service
@@ -1,47 +1,326 @@
 import os
-import yt_dlp
+import threading
 from typing import Optional, List, Dict, Any
 from urllib.parse import quote_plus
 import asyncio
+import functools
 import time
 import logging
 from concurrent.futures import ThreadPoolExecutor
 
+import httpx
+
 from app.config import get_settings
+from app.core.metrics import (
+    EXECUTOR_ABANDONED,
+    EXECUTOR_ACTIVE,
+    EXECUTOR_QUEUED,
+    EXTRACTIONS_ABANDONED,
+    EXTRACTIONS_ABORTED,
+    EXTRACTION_ERRORS,
+    EXTRACTION_FAILURES,
+    EXTRACTION_SECONDS,
+    EXTRACTION_TIMEOUTS,
+    NEGATIVE_CACHE_HITS,
+    SEARCH_REQUESTS,
+    STREAM_CACHE_EVICTIONS,
+    STREAM_CACHE_HITS,
+    STREAM_CACHE_MISSES,
+    STREAM_CACHE_MISSES_AVOIDED,
+    STREAM_CACHE_REFRESHES,
+)
+from app.core.rate_limit import admit_extraction
+from app.core.startup import startup_profile
+from app.core.timing import phase, record as record_timing
 from app.schemas.user import TrackSearchResult, StreamInfo, YouTubePlaylistResult
+from app.services.innertube import SearchParseError, get_innertube_search
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
-# Thread pool for yt-dlp operations (blocking I/O)
-executor = ThreadPoolExecutor(max_workers=8)
+# yt-dlp (and its hundreds of extractor modules) and the thread pool that
+# runs it are loaded on first use, or ahead of time by warm_up() once the
+# server is listening — never at import.
+_yt_dlp = None
+_yt_dlp_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+_abortable_ydl = None
+_warm = threading.Event()
+
+
+def _load_yt_dlp():
+    """Import yt-dlp on first use (thread-safe)."""
+    global _yt_dlp
+    if _yt_dlp is None:
+        with _yt_dlp_lock:
+            if _yt_dlp is None:
+                started = time.perf_counter()
+                import yt_dlp
+                startup_profile.mark("ytdlp_import", time.perf_counter() - started)
+                _yt_dlp = yt_dlp
+    return _yt_dlp
+
+
+class ExtractionAborted(BaseException):
+    """Raised inside a worker to unwind an extraction nobody is waiting for.
+
+    A BaseException so yt-dlp's broad ``except Exception`` fallbacks in the
+    extractors can't swallow it and carry on with the next request.
+    """
+
+
+def _abortable_ydl_class():
+    """YoutubeDL subclass that stops at its next network request once aborted."""
+    global _abortable_ydl
+    if _abortable_ydl is None:
+        yt_dlp = _load_yt_dlp()
+
+        class AbortableYoutubeDL(yt_dlp.YoutubeDL):
+            abort: Optional[threading.Event] = None
+
+            def urlopen(self, req):
+                # Every page, API and player request goes through here
+                if self.abort is not None and self.abort.is_set():
+                    raise ExtractionAborted()
+                return super().urlopen(req)
+
+        _abortable_ydl = AbortableYoutubeDL
+    return _abortable_ydl
+
+
+_EXECUTOR_WORKERS = 8
+_executor_busy = 0  # jobs submitted and not yet finished (queued + running)
+_executor_busy_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Thread pool for yt-dlp operations (blocking I/O)."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=_EXECUTOR_WORKERS, thread_name_prefix="ytdlp")
+    return _executor
+
+
+def _track_executor_load(delta: int) -> None:
+    global _executor_busy
+    with _executor_busy_lock:
+        _executor_busy += delta
+
+
+class _ExtractionJob:
+    """Shared state between the awaiting request and the worker thread."""
+
+    __slots__ = ("abort", "picked_up", "abandoned", "lock")
+
+    def __init__(self):
+        self.abort = threading.Event()
+        self.picked_up: Optional[float] = None  # set by the worker when it starts
+        self.abandoned = False
+        self.lock = threading.Lock()
+
+
+def _extraction_done(state: _ExtractionJob, job) -> None:
+    _track_executor_load(-1)
+    # A job cancelled (timed out) before a worker picked it up never runs
+    if job.cancelled():
+        EXECUTOR_QUEUED.dec()
+    with state.lock:
+        if state.abandoned:
+            EXECUTOR_ABANDONED.dec()
+
+
+def _abandon(state: _ExtractionJob, job, operation: str) -> None:
+    """Tell a job nobody is waiting for to stop, and count it until it does."""
+    state.abort.set()
+    with state.lock:
+        # Queued jobs were already cancelled outright; only a running one
+        # keeps holding its worker
+        if not job.done():
+            state.abandoned = True
+            EXTRACTIONS_ABANDONED.labels(operation).inc()
+            EXECUTOR_ABANDONED.inc()
+
+
+class ExtractionFailed(Exception):
+    """A classified yt-dlp failure for one video.
+
+    ``kind`` is one of ``unavailable``, ``private``, ``age_restricted``,
+    ``members_only``, ``geo_blocked`` (permanent) or ``upcoming``,
+    ``blocked``, ``timeout``, ``error`` (transient).
+    """
+
+    PERMANENT = frozenset({"unavailable", "private", "age_restricted", "members_only", "geo_blocked"})
+    # Failures of one request (a missing format, a saturated executor), not
+    # of the video — never negative-cached
+    PER_REQUEST = frozenset({"timeout", "error"})
+
+    def __init__(self, kind: str, message: str):
+        super().__init__(message)
+        self.kind = kind
+        self.message = message
+        self.retry_after: Optional[float] = None  # seconds until the cached failure lapses
+
+    @property
+    def permanent(self) -> bool:
+        return self.kind in self.PERMANENT
+
+    @property
+    def video_level(self) -> bool:
+        """Whether every operation on this video would fail the same way."""
+        return self.kind not in self.PER_REQUEST
+
+
+# Checked in order — YouTube's messages overlap ("Video unavailable. This
+# video is private"), so the specific reasons come before the generic one
+_FAILURE_PATTERNS = (
+    ("private", ("private video", "video is private")),
+    ("age_restricted", ("confirm your age", "age-restricted", "inappropriate for some users")),
+    ("members_only", ("members-only", "join this channel")),
+    ("geo_blocked", ("available in your country", "blocked it in your country", "geo restrict")),
+    ("blocked", ("not a bot", "http error 429", "too many requests")),
+    ("upcoming", ("premieres in", "live event will begin", "this live event")),
+    ("unavailable", (
+        "video unavailable", "has been removed", "no longer available", "has been terminated",
+        "does not exist", "incomplete youtube id", "is not a valid url",
+    )),
+)
+
+
+def classify_extraction_error(error: Exception) -> ExtractionFailed:
+    """Map a yt-dlp exception to an :class:`ExtractionFailed` kind."""
+    message = str(error)
+    cause = getattr(error, "exc_info", None)
+    if cause and type(cause[1]).__name__ == "GeoRestrictedError":
+        return ExtractionFailed("geo_blocked", message)
+    lowered = message.lower()
+    for kind, needles in _FAILURE_PATTERNS:
+        if any(needle in lowered for needle in needles):
+            return ExtractionFailed(kind, message)
+    return ExtractionFailed("error", message)
+
+
+# Negative cache: { video_id: (kind, message, expiry_time) }. Permanent
+# failures are kept for hours, transient ones just long enough to absorb
+# client retry loops. Only failures of the video itself are cached: an
+# unclassified error or a timeout in one operation (e.g. "Requested format
+# is not available" for HLS) says nothing about the others. Only the
+# details are kept: a raised exception carries its traceback, which would
+# grow (and pin frames) if re-raised per hit.
+_failure_cache: Dict[str, tuple] = {}
+
+
+def _get_cached_failure(video_id: str) -> Optional[ExtractionFailed]:
+    entry = _failure_cache.get(video_id)
+    if entry is None:
+        return None
+    kind, message, expiry = entry
+    remaining = expiry - time.monotonic()
+    if remaining <= 0:
+        del _failure_cache[video_id]
+        return None
+    failure = ExtractionFailed(kind, message)
+    failure.retry_after = remaining
+    NEGATIVE_CACHE_HITS.labels(kind).inc()
+    return failure
+
+
+def _cache_failure(video_id: str, failure: ExtractionFailed) -> None:
+    EXTRACTION_FAILURES.labels(failure.kind).inc()
+    ttl = (
+        settings.NEGATIVE_CACHE_PERMANENT_TTL_SECONDS if failure.permanent
+        else settings.NEGATIVE_CACHE_TRANSIENT_TTL_SECONDS
+    )
+    if ttl <= 0 or not failure.video_level:
+        return
+    failure.retry_after = ttl
+    _failure_cache[video_id] = (failure.kind, failure.message, time.monotonic() + ttl)
+    if len(_failure_cache) > 5000:
+        now = time.monotonic()
+        for k in [k for k, (_, _, exp) in _failure_cache.items() if now > exp]:
+            del _failure_cache[k]
+
 
-# In-memory stream URL cache: { "audio:{video_id}": (StreamInfo, expiry_time), ... }
-_stream_cache: Dict[str, tuple] = {}
+class _CacheEntry:
+    """A cached StreamInfo with its expiry and how often it has been served."""
+
+    __slots__ = ("info", "expires_at", "hits", "refreshing", "replaced_expiry")
+
+    def __init__(self, info: StreamInfo, replaced_expiry: Optional[float] = None):
+        self.info = info
+        self.expires_at = time.monotonic() + _CACHE_TTL
+        self.hits = 0
+        self.refreshing = False
+        # Expiry of the entry this one refreshed — the first hit after it
+        # would have been a cold miss
+        self.replaced_expiry = replaced_expiry
+
+
+# In-memory stream URL cache: { "audio:{quality}:{video_id}": _CacheEntry, ... }
+_stream_cache: Dict[str, _CacheEntry] = {}
 _CACHE_TTL = 3600  # 1 hour — YouTube URLs expire in ~6h
 
+# Audio quality tiers → yt-dlp format selectors. "auto" is resolved to one of
+# these from the client's bandwidth hint before the cache lookup, so every
+# tier is cached (and shared) under its own key.
+AUDIO_QUALITY_TIERS = ("low", "medium", "high")
+AUDIO_QUALITY_FORMATS = {
+    "low": settings.YOUTUBE_AUDIO_FORMAT_LOW,
+    "medium": settings.YOUTUBE_AUDIO_FORMAT_MEDIUM,
+    "high": settings.YOUTUBE_AUDIO_FORMAT,
+}
+
+
+def resolve_audio_quality(quality: str, bandwidth_kbps: Optional[float] = None) -> str:
+    """Map a requested audio tier (low/medium/high/auto) to a concrete tier."""
+    if quality != "auto":
+        return quality if quality in AUDIO_QUALITY_TIERS else "high"
+    if bandwidth_kbps is None:
+        # No hint — medium is indistinguishable for most listeners and
+        # roughly halves egress compared to "high"
+        return "medium"
+    if bandwidth_kbps < settings.AUDIO_AUTO_LOW_KBPS:
+        return "low"
+    if bandwidth_kbps < settings.AUDIO_AUTO_HIGH_KBPS:
+        return "medium"
+    return "high"
+
 
 def _get_cached_stream(key: str) -> Optional[StreamInfo]:
     """Return cached StreamInfo if still valid, else None."""
+    with phase("cache"):
+        return _lookup_cached_stream(key)
+
+
+def _lookup_cached_stream(key: str) -> Optional[StreamInfo]:
+    kind = key.split(":", 1)[0]
     entry = _stream_cache.get(key)
     if entry is None:
+        STREAM_CACHE_MISSES.labels(kind).inc()
         return None
-    info, expiry = entry
-    if time.monotonic() > expiry:
+    now = time.monotonic()
+    if now > entry.expires_at:
         del _stream_cache[key]
+        STREAM_CACHE_EVICTIONS.inc()
+        STREAM_CACHE_MISSES.labels(kind).inc()
         return None
-    return info
+    entry.hits += 1
+    if entry.replaced_expiry is not None and now > entry.replaced_expiry:
+        STREAM_CACHE_MISSES_AVOIDED.inc()
+        entry.replaced_expiry = None
+    STREAM_CACHE_HITS.labels(kind).inc()
+    return entry.info
 
 
 def _set_cached_stream(key: str, info: StreamInfo) -> None:
     """Store a StreamInfo in the cache with TTL."""
-    _stream_cache[key] = (info, time.monotonic() + _CACHE_TTL)
+    _stream_cache[key] = _CacheEntry(info)
     # Evict old entries when cache grows too large
     if len(_stream_cache) > 200:
         now = time.monotonic()
-        expired = [k for k, (_, exp) in _stream_cache.items() if now > exp]
+        expired = [k for k, entry in _stream_cache.items() if now > entry.expires_at]
         for k in expired:
             del _stream_cache[k]
+        STREAM_CACHE_EVICTIONS.inc(len(expired))
 
 
 class YouTubeService:
@@ -73,28 +352,116 @@ class YouTubeService:
                 "Export cookies.txt from a logged-in browser and place it there."
             )
 
-    def _extract_info(self, url: str, opts: dict) -> dict:
-        """Extract video info (blocking operation)."""
-        with yt_dlp.YoutubeDL({**self.base_opts, **opts}) as ydl:
+    def _extract_info(self, url: str, opts: dict, abort: Optional[threading.Event] = None) -> dict:
+        """Extract video info (blocking operation).
+
+        Once ``abort`` is set the extraction raises :class:`ExtractionAborted`
+        at its next network request, so a worker is held for at most one more
+        ``socket_timeout`` after its caller gave up.
+        """
+        with _abortable_ydl_class()({**self.base_opts, **opts}) as ydl:
+            ydl.abort = abort
             return ydl.extract_info(url, download=False)
 
-    async def _run_extraction(self, url: str, opts: dict, timeout: float = 15.0) -> dict:
+    def _extract_in_worker(self, url: str, opts: dict, state: _ExtractionJob) -> dict:
+        """Executor entry point — moves the job from queued to active."""
+        state.picked_up = time.perf_counter()
+        EXECUTOR_QUEUED.dec()
+        EXECUTOR_ACTIVE.inc()
+        try:
+            if state.abort.is_set():
+                raise ExtractionAborted()
+            return self._extract_info(url, opts, state.abort)
+        except ExtractionAborted:
+            EXTRACTIONS_ABORTED.inc()
+            raise
+        finally:
+            EXECUTOR_ACTIVE.dec()
+
+    async def _run_extraction(
+        self, url: str, opts: dict, timeout: float = 15.0, operation: str = "other"
+    ) -> dict:
         """Run yt-dlp extraction in executor with timeout."""
-        loop = asyncio.get_event_loop()
-        return await asyncio.wait_for(
-            loop.run_in_executor(executor, self._extract_info, url, opts),
-            timeout=timeout,
-        )
+        # Only work that actually reaches YouTube spends the caller's tokens
+        await admit_extraction()
+        started = time.perf_counter()
+        state = _ExtractionJob()
+        EXECUTOR_QUEUED.inc()
+        _track_executor_load(1)
+        job = get_executor().submit(self._extract_in_worker, url, opts, state)
+        job.add_done_callback(functools.partial(_extraction_done, state))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job), timeout=timeout)
+        except asyncio.TimeoutError:
+            EXTRACTION_TIMEOUTS.labels(operation).inc()
+            raise
+        except Exception:
+            EXTRACTION_ERRORS.labels(operation).inc()
+            raise
+        finally:
+            # Timed out, or the request itself was cancelled (client gone)
+            if not job.done():
+                _abandon(state, job, operation)
+            ended = time.perf_counter()
+            EXTRACTION_SECONDS.labels(operation).observe(ended - started)
+            picked_up = state.picked_up
+            queued_until = picked_up if picked_up is not None else ended
+            record_timing("queue", queued_until - started)
+            if picked_up is not None:
+                record_timing("ytdlp", ended - queued_until)
+
+    async def _extract_video(self, video_id: str, opts: dict, timeout: float, operation: str) -> dict:
+        """Extract one video, failing fast on (and recording) known failures.
+
+        Raises :class:`ExtractionFailed` for yt-dlp errors and for videos
+        that failed recently; other errors (timeouts included) propagate.
+        """
+        failure = _get_cached_failure(video_id)
+        if failure is not None:
+            raise failure
+        url = f"https://www.youtube.com/watch?v={video_id}"
+        try:
+            return await self._run_extraction(url, opts, timeout=timeout, operation=operation)
+        except asyncio.TimeoutError:
+            # Counted, not cached: a saturated executor times out healthy videos too
+            _cache_failure(video_id, ExtractionFailed("timeout", "YouTube extraction timed out"))
+            raise
+        except Exception as e:
+            if not isinstance(e, _load_yt_dlp().utils.YoutubeDLError):
+                raise
+            failure = classify_extraction_error(e)
+            _cache_failure(video_id, failure)
+            raise failure from e
 
     async def search(self, query: str, limit: int = 20) -> List[TrackSearchResult]:
         """Search YouTube for videos matching the query."""
+        if settings.SEARCH_BACKEND == "innertube":
+            # Native search first; yt-dlp only if its response can't be used
+            await admit_extraction()
+            try:
+                with phase("upstream"):
+                    tracks = await get_innertube_search().search(query, limit)
+            except SearchParseError as e:
+                logger.warning(f"Native search unparsable, falling back to yt-dlp: {e}")
+                SEARCH_REQUESTS.labels("fallback_parse").inc()
+            except httpx.HTTPError as e:
+                logger.warning(f"Native search failed, falling back to yt-dlp: {e!r}")
+                SEARCH_REQUESTS.labels("fallback_http").inc()
+            else:
+                SEARCH_REQUESTS.labels("innertube").inc()
+                return tracks
+        else:
+            SEARCH_REQUESTS.labels("ytdlp").inc()
+        return await self._search_ytdlp(query, limit)
+
+    async def _search_ytdlp(self, query: str, limit: int) -> List[TrackSearchResult]:
         search_opts = {
             'extract_flat': True,
             'default_search': 'ytsearch',
         }
 
         search_url = f"ytsearch{limit}:{query}"
-        result = await self._run_extraction(search_url, search_opts, timeout=15.0)
+        result = await self._run_extraction(search_url, search_opts, timeout=15.0, operation="search")
 
         tracks = []
         for entry in result.get('entries', []):
@@ -119,7 +486,7 @@ class YouTubeService:
 
         # sp=EgIQAw%3D%3D filters YouTube results to playlists only
         search_url = f"https://www.youtube.com/results?search_query={quote_plus(query)}&sp=EgIQAw%3D%3D"
-        result = await self._run_extraction(search_url, search_opts, timeout=30.0)
+        result = await self._run_extraction(search_url, search_opts, timeout=30.0, operation="search")
 
         playlists = []
         for entry in result.get('entries', [])[:limit]:
@@ -146,7 +513,7 @@ class YouTubeService:
             'no_warnings': True,
         }
 
-        info = await self._run_extraction(url, playlist_opts, timeout=20.0)
+        info = await self._run_extraction(url, playlist_opts, timeout=20.0, operation="playlist")
 
         tracks = []
         for entry in info.get('entries', []):
@@ -172,9 +539,7 @@ class YouTubeService:
 
     async def get_video_info(self, video_id: str) -> Dict[str, Any]:
         """Get detailed video information."""
-        url = f"https://www.youtube.com/watch?v={video_id}"
-
-        info = await self._run_extraction(url, {}, timeout=12.0)
+        info = await self._extract_video(video_id, {}, timeout=12.0, operation="info")
 
         return {
             'id': info.get('id'),
@@ -190,14 +555,12 @@ class YouTubeService:
         """Get related videos with smart variety - focuses on genre/artist, not song title repeats."""
         import random
 
-        url = f"https://www.youtube.com/watch?v={video_id}"
-
         # Extract video info using flat extraction (faster)
         opts = {
             'extract_flat': 'in_playlist',
         }
 
-        info = await self._run_extraction(url, opts, timeout=12.0)
+        info = await self._extract_video(video_id, opts, timeout=12.0, operation="related")
 
         title = info.get('title', '')
         artist = info.get('uploader', '') or info.get('channel', '')
@@ -284,30 +647,37 @@ class YouTubeService:
 
         return result
 
-    async def get_audio_stream_url(self, video_id: str) -> StreamInfo:
-        """Get the best audio stream URL for a video (cached)."""
-        cache_key = f"audio:{video_id}"
+    async def get_audio_stream_url(self, video_id: str, quality: str = "high") -> StreamInfo:
+        """Get the audio stream URL for a video at the given tier (cached per tier).
+
+        ``quality`` must already be a concrete tier — resolve "auto" with
+        :func:`resolve_audio_quality` first.
+        """
+        cache_key = f"audio:{quality}:{video_id}"
         cached = _get_cached_stream(cache_key)
         if cached is not None:
             return cached
 
-        url = f"https://www.youtube.com/watch?v={video_id}"
+        stream_info = await self._resolve_audio_stream(video_id, quality)
+        _set_cached_stream(cache_key, stream_info)
+        return stream_info
 
+    async def _resolve_audio_stream(self, video_id: str, quality: str) -> StreamInfo:
         audio_opts = {
-            'format': settings.YOUTUBE_AUDIO_FORMAT,
+            'format': AUDIO_QUALITY_FORMATS.get(quality, settings.YOUTUBE_AUDIO_FORMAT),
         }
 
-        info = await self._run_extraction(url, audio_opts, timeout=15.0)
+        info = await self._extract_video(video_id, audio_opts, timeout=15.0, operation="audio")
 
-        stream_info = StreamInfo(
+        return StreamInfo(
             url=info.get('url', ''),
             title=info.get('title', 'Unknown'),
             duration=info.get('duration', 0),
             thumbnail=info.get('thumbnail'),
             headers=info.get('http_headers'),
+            quality=quality,
+            bitrate=info.get('abr') or info.get('tbr'),
         )
-        _set_cached_stream(cache_key, stream_info)
-        return stream_info
 
     async def get_video_stream_url(self, video_id: str, quality: str = "best") -> StreamInfo:
         """Get video stream URL (for video playback) (cached)."""
@@ -316,8 +686,11 @@ class YouTubeService:
         if cached is not None:
             return cached
 
-        url = f"https://www.youtube.com/watch?v={video_id}"
+        stream_info = await self._resolve_video_stream(video_id, quality)
+        _set_cached_stream(cache_key, stream_info)
+        return stream_info
 
+    async def _resolve_video_stream(self, video_id: str, quality: str) -> StreamInfo:
         # Use a progressive (combined audio+video) format to ensure sound.
         # YouTube is deprecating progressive formats; fallback chains ensure we
         # always get audio: mp4 progressive → any progressive → best single URL.
@@ -330,27 +703,166 @@ class YouTubeService:
             'format': fmt,
         }
 
-        info = await self._run_extraction(url, video_opts, timeout=15.0)
+        info = await self._extract_video(video_id, video_opts, timeout=15.0, operation="video")
 
-        stream_info = StreamInfo(
+        return StreamInfo(
             url=info.get('url', ''),
             title=info.get('title', 'Unknown'),
             duration=info.get('duration', 0),
             thumbnail=info.get('thumbnail'),
             headers=info.get('http_headers'),
         )
+
+    async def get_video_hls_url(self, video_id: str, quality: str = "best") -> StreamInfo:
+        """Get an HLS playlist URL for a video (cached).
+
+        For "best" this is the master playlist so clients can adapt between
+        renditions; a fixed height returns that rendition's media playlist.
+        """
+        cache_key = f"hls:{quality}:{video_id}"
+        cached = _get_cached_stream(cache_key)
+        if cached is not None:
+            return cached
+
+        stream_info = await self._resolve_hls_stream(video_id, quality)
         _set_cached_stream(cache_key, stream_info)
         return stream_info
 
+    async def _resolve_hls_stream(self, video_id: str, quality: str) -> StreamInfo:
+        if quality == "best":
+            fmt = 'best[protocol^=m3u8]'
+        else:
+            fmt = f'best[protocol^=m3u8][height<={quality}]/best[protocol^=m3u8]'
+
+        info = await self._extract_video(video_id, {'format': fmt}, timeout=15.0, operation="hls")
+
+        playlist_url = info.get('url', '')
+        if quality == "best":
+            playlist_url = info.get('manifest_url') or playlist_url
+
+        return StreamInfo(
+            url=playlist_url,
+            title=info.get('title', 'Unknown'),
+            duration=info.get('duration', 0),
+            thumbnail=info.get('thumbnail'),
+            headers=info.get('http_headers'),
+        )
+
     def _get_thumbnail(self, video_id: str) -> str:
         """Get thumbnail URL from video ID."""
         return f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg"
 
 
-# Singleton instance
-youtube_service = YouTubeService()
+    def _warm_up(self) -> None:
+        """Import yt-dlp and initialise the YouTube extractor (blocking)."""
+        yt_dlp = _load_yt_dlp()
+        with startup_profile.phase("extractor_init"):
+            with yt_dlp.YoutubeDL(self.base_opts) as ydl:
+                ydl.get_info_extractor("Youtube")
+        _warm.set()
+
+    async def warm_up(self) -> None:
+        """Load extraction machinery in the background so the first request doesn't pay for it."""
+        await asyncio.get_running_loop().run_in_executor(get_executor(), self._warm_up)
+
+
+class StreamRefresher:
+    """Re-resolves hot stream-cache entries shortly before they expire.
+
+    An entry is hot once it has been served ``min_hits`` times during its
+    lifetime. Refreshes only run while the extraction executor has a free
+    worker to spare, hottest first, so they never queue ahead of requests.
+    """
+
+    def __init__(self, service: YouTubeService, ahead: float, min_hits: int, interval: float):
+        self.service = service
+        self.ahead = ahead
+        self.min_hits = min_hits
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._resolvers = {
+            "audio": service._resolve_audio_stream,
+            "video": service._resolve_video_stream,
+            "hls": service._resolve_hls_stream,
+        }
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh_due()
+            except Exception as e:
+                logger.warning(f"Stream cache refresh pass failed: {e}")
+
+    async def refresh_due(self) -> int:
+        """Refresh hot entries expiring within ``ahead`` seconds; return how many were started."""
+        now = time.monotonic()
+        due = [
+            (key, entry) for key, entry in _stream_cache.items()
+            if not entry.refreshing
+            and entry.hits >= self.min_hits
+            and now < entry.expires_at <= now + self.ahead
+        ]
+        due.sort(key=lambda item: item[1].hits, reverse=True)
+
+        # Leave one worker free for requests that arrive meanwhile
+        spare = _EXECUTOR_WORKERS - 1 - _executor_busy
+        batch = due[:max(spare, 0)]
+        for _, entry in batch:
+            entry.refreshing = True
+        await asyncio.gather(*(self._refresh(key, entry) for key, entry in batch))
+        return len(batch)
+
+    async def _refresh(self, key: str, entry: _CacheEntry) -> None:
+        kind, quality, video_id = key.split(":", 2)
+        try:
+            info = await self._resolvers[kind](video_id, quality)
+        except Exception as e:
+            entry.refreshing = False
+            STREAM_CACHE_REFRESHES.labels("failed").inc()
+            logger.warning(f"Refresh of {key} failed: {e}")
+            return
+        _stream_cache[key] = _CacheEntry(info, replaced_expiry=entry.expires_at)
+        STREAM_CACHE_REFRESHES.labels("ok").inc()
+
+
+def is_extraction_warm() -> bool:
+    """True once yt-dlp is imported and its YouTube extractor initialised."""
+    return _warm.is_set()
+
+
+# Singleton instance, created on first use
+youtube_service: Optional[YouTubeService] = None
 
 
 def get_youtube_service() -> YouTubeService:
     """Get the YouTube service instance."""
+    global youtube_service
+    if youtube_service is None:
+        youtube_service = YouTubeService()
     return youtube_service
+
+
+stream_refresher: Optional[StreamRefresher] = None
+
+
+def get_stream_refresher() -> StreamRefresher:
+    """Get the stream cache refresher instance."""
+    global stream_refresher
+    if stream_refresher is None:
+        stream_refresher = StreamRefresher(
+            get_youtube_service(),
+            ahead=settings.STREAM_REFRESH_AHEAD_SECONDS,
+            min_hits=settings.STREAM_REFRESH_MIN_HITS,
+            interval=settings.STREAM_REFRESH_INTERVAL_SECONDS,
+        )
+    return stream_refresher
@@ -0,0 +1,2 @@
+# Benchmarks package — run modules from the backend directory, e.g.
+#   python -m benchmarks.bench_auth
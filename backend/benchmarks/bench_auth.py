@@ -0,0 +1,47 @@
+"""Microbenchmark of the auth dependency overhead per request.
+
+Compares a full ``jose.jwt.decode`` (HMAC verification + claims parsing) with
+the verified-token cache hit path used by repeat Range requests.
+
+    python -m benchmarks.bench_auth [iterations]
+"""
+import sys
+import time
+
+from app.core import security
+from app.core.security import create_access_token, get_current_user_id
+
+
+def _per_call_us(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(iterations: int = 20000) -> None:
+    token = create_access_token({"sub": "bench-user"})
+    def dependency():
+        # Drive the coroutine directly — it never suspends
+        coro = get_current_user_id(token)
+        try:
+            coro.send(None)
+        except StopIteration:
+            pass
+
+    def uncached():
+        security._token_cache.clear()
+        dependency()
+
+    cold = _per_call_us(uncached, iterations)
+    dependency()  # warm the cache
+    warm = _per_call_us(dependency, iterations)
+
+    print(f"get_current_user_id, {iterations} iterations")
+    print(f"  full decode : {cold:8.2f} us/request")
+    print(f"  cached      : {warm:8.2f} us/request")
+    print(f"  speedup     : {cold / warm:8.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
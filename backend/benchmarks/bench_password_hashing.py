@@ -0,0 +1,64 @@
+"""Event-loop latency under concurrent logins.
+
+Runs a burst of concurrent password verifications, first inline on the event
+loop (the old behaviour) and then through the bounded hashing pool, while a
+ticker task measures how late the loop wakes it up.
+
+    python -m benchmarks.bench_password_hashing [concurrent_logins]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from app.core.security import (
+    get_password_hash,
+    password_hash_pool,
+    verify_password,
+    verify_password_async,
+)
+
+TICK = 0.005  # seconds between ticker wake-ups
+
+
+async def _ticker(lags: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append((time.perf_counter() - start - TICK) * 1000)
+
+
+async def _measure(label: str, logins, concurrency: int) -> None:
+    lags: list = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(lags, stop))
+    await asyncio.sleep(TICK * 2)
+    start = time.perf_counter()
+    await asyncio.gather(*(logins() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+
+    lags.sort()
+    p99 = lags[int(len(lags) * 0.99) - 1] if len(lags) > 1 else lags[-1]
+    print(f"{label:<8} {concurrency} logins in {elapsed * 1000:7.1f} ms | "
+          f"loop lag p50 {statistics.median(lags):7.2f} ms  p99 {p99:7.2f} ms  max {lags[-1]:7.2f} ms")
+
+
+async def main(concurrency: int = 32) -> None:
+    hashed = get_password_hash("correct horse battery staple")
+
+    async def inline_login():
+        verify_password("correct horse battery staple", hashed)
+        await asyncio.sleep(0)
+
+    async def pooled_login():
+        await verify_password_async("correct horse battery staple", hashed)
+
+    await _measure("inline", inline_login, concurrency)
+    await _measure("pooled", pooled_login, concurrency)
+    print(f"pool stats: {password_hash_pool.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 32))
@@ -0,0 +1,83 @@
+"""Serialization cost of a large playlist detail response.
+
+Compares the previous path — ORM rows validated into ``TrackResponse`` per
+row, re-validated against ``response_model`` and JSON-encoded with the stdlib
+— with the fast path that encodes column-row dicts directly with orjson (and
+MessagePack, for clients that ask for it).
+
+    python -m benchmarks.bench_serialization [tracks] [iterations]
+"""
+import json
+import sys
+import time
+from datetime import datetime, timezone
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from app.core.responses import msgpack
+from app.models.user import Track
+from app.schemas.user import PlaylistDetailResponse, TrackResponse
+
+
+def _playlist_fields(track_count: int) -> dict:
+    return {
+        "id": "playlist-id",
+        "name": "Commute",
+        "description": None,
+        "cover_image": None,
+        "is_public": False,
+        "owner_id": "user-id",
+        "created_at": datetime.now(timezone.utc),
+        "track_count": track_count,
+    }
+
+
+def _timed(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main(track_count: int = 5000, iterations: int = 20) -> None:
+    rows = [
+        {
+            "id": f"{i:011d}",
+            "title": f"Track number {i}",
+            "artist": f"Artist {i % 300}",
+            "duration": 180 + i % 120,
+            "thumbnail": f"https://img.youtube.com/vi/{i:011d}/hqdefault.jpg",
+        }
+        for i in range(track_count)
+    ]
+    orm_tracks = [Track(**row) for row in rows]
+
+    def validated_path():
+        response = PlaylistDetailResponse(
+            **_playlist_fields(track_count),
+            tracks=[TrackResponse.model_validate(t) for t in orm_tracks],
+        )
+        # What response_model handling adds on top: re-validation + encoding
+        checked = PlaylistDetailResponse.model_validate(response)
+        return json.dumps(jsonable_encoder(checked)).encode("utf-8")
+
+    def orjson_path():
+        return orjson.dumps({**_playlist_fields(track_count), "tracks": rows}, option=orjson.OPT_UTC_Z)
+
+    results = [("validated + json", validated_path), ("orjson", orjson_path)]
+    if msgpack is not None:
+        def msgpack_path():
+            return msgpack.packb({**_playlist_fields(track_count), "tracks": rows}, default=str)
+        results.append(("msgpack", msgpack_path))
+
+    print(f"playlist with {track_count} tracks, {iterations} iterations")
+    baseline = None
+    for label, fn in results:
+        ms = _timed(fn, iterations)
+        baseline = baseline or ms
+        print(f"  {label:<18} {ms:8.2f} ms/response  {len(fn()):>9} bytes  {baseline / ms:5.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
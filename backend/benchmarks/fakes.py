@@ -0,0 +1,203 @@
+"""Offline stand-ins for YouTube used by the load benchmark.
+
+``FixtureExtractor`` replaces the blocking yt-dlp call with recorded responses
+(``fixtures/youtube.json``) after a configurable delay, so requests still go
+through the real executor, caches, rate limiting and timing hooks.
+``GoogleVideoServer`` is a local HTTP server that serves deterministic media
+bytes with ``Range`` support, standing in for googlevideo.com.
+``InnertubeServer`` answers the native search client's JSON API calls with
+recorded pages (``fixtures/innertube_search.json``), continuations included.
+"""
+import copy
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from app.services.youtube import ExtractionAborted, YouTubeService
+
+FIXTURES = Path(__file__).parent / "fixtures" / "youtube.json"
+SEARCH_PAGES = Path(__file__).parent / "fixtures" / "innertube_search.json"
+
+_SEARCH_RE = re.compile(r"^ytsearch(\d+):")
+_VIDEO_RE = re.compile(r"[?&]v=([A-Za-z0-9_-]{11})")
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class FixtureExtractor:
+    """Answers ``YouTubeService._extract_info`` from recorded fixtures."""
+
+    def __init__(self, media_base_url: str, latency_ms: float = 150.0):
+        self.media_base_url = media_base_url.rstrip("/")
+        self.latency = latency_ms / 1000
+        self.fixtures = json.loads(FIXTURES.read_text())
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._original = None
+
+    @property
+    def video_ids(self):
+        return [entry["id"] for entry in self.fixtures["search"]["entries"]]
+
+    def extract(self, url: str, opts: dict, abort=None) -> dict:
+        with self._lock:
+            self.calls += 1
+        # Honour the abort signal like the real extractor's network hook does
+        if abort is not None:
+            if abort.wait(self.latency):
+                raise ExtractionAborted()
+        else:
+            time.sleep(self.latency)
+        if match := _SEARCH_RE.match(url):
+            result = copy.deepcopy(self.fixtures["search"])
+            result["entries"] = result["entries"][: int(match.group(1))]
+            return result
+        match = _VIDEO_RE.search(url)
+        if not match:
+            raise ValueError(f"No fixture for {url}")
+        raw = json.dumps(self.fixtures["video"])
+        raw = raw.replace("{video_id}", match.group(1)).replace("{media_base}", self.media_base_url)
+        return json.loads(raw)
+
+    def install(self) -> None:
+        extractor = self
+        self._original = YouTubeService._extract_info
+
+        def _extract_info(service, url, opts, abort=None):
+            return extractor.extract(url, opts, abort)
+
+        YouTubeService._extract_info = _extract_info
+
+    def uninstall(self) -> None:
+        if self._original is not None:
+            YouTubeService._extract_info = self._original
+            self._original = None
+
+
+class _MediaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "GoogleVideoServer"
+
+    def do_GET(self):
+        size = self.server.media_bytes
+        start, end = 0, size - 1
+        status = 200
+        range_header = self.headers.get("Range")
+        if range_header and (match := _RANGE_RE.match(range_header)):
+            first, last = match.groups()
+            if first:
+                start = int(first)
+                end = min(int(last), size - 1) if last else size - 1
+            elif last:  # suffix range
+                start = max(size - int(last), 0)
+            if start >= size or start > end:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            status = 206
+
+        if self.server.ttfb:
+            time.sleep(self.server.ttfb)
+        self.send_response(status)
+        self.send_header("Content-Type", "audio/webm")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start + 1))
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+
+        pattern = self.server.pattern
+        offset = start
+        try:
+            while offset <= end:
+                n = min(len(pattern) - offset % len(pattern), end - offset + 1)
+                self.wfile.write(pattern[offset % len(pattern): offset % len(pattern) + n])
+                offset += n
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _BackgroundServer(ThreadingHTTPServer):
+    """Local HTTP server run in a background thread."""
+
+    daemon_threads = True
+
+    def __init__(self, handler, port: int = 0):
+        super().__init__(("127.0.0.1", port), handler)
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class GoogleVideoServer(_BackgroundServer):
+    """Range-capable media server on localhost."""
+
+    def __init__(self, media_bytes: int = 1024 * 1024, ttfb_ms: float = 0.0):
+        super().__init__(_MediaHandler)
+        self.media_bytes = media_bytes
+        self.ttfb = ttfb_ms / 1000
+        self.pattern = bytes(range(256)) * 256  # 64 KiB
+
+
+class _SearchHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "InnertubeServer"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length))
+        except ValueError:
+            request = None
+        page = None
+        if self.path.split("?")[0] == "/youtubei/v1/search" and isinstance(request, dict):
+            # A first page for any query; continuations by their token
+            page = self.server.pages.get(request.get("continuation", ""))
+        if page is None:
+            self.send_response(400)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        with self.server.lock:
+            self.server.requests += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        body = json.dumps(page).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class InnertubeServer(_BackgroundServer):
+    """Stand-in for www.youtube.com's search JSON API, on localhost."""
+
+    def __init__(self, latency_ms: float = 0.0, port: int = 0):
+        super().__init__(_SearchHandler, port)
+        self.latency = latency_ms / 1000
+        self.pages = json.loads(SEARCH_PAGES.read_text())["pages"]
+        self.requests = 0
+        self.lock = threading.Lock()
@@ -0,0 +1,299 @@
+"""Offline load test of the API against fake YouTube/googlevideo stand-ins.
+
+Starts the app under uvicorn on a local port with a throwaway SQLite
+database, replaces yt-dlp with the recorded-fixture extractor, googlevideo
+with a local Range-capable server and the search JSON API with a recorded
+stand-in (see ``benchmarks.fakes``), then drives each scenario at the given
+concurrency and reports throughput and p50/p95/p99.
+
+    python -m benchmarks.load [--concurrency 16] [--requests 200]
+        [--latency-ms 150] [--search-backend innertube|ytdlp]
+        [--scenarios search,stream_audio,...]
+        [--baseline FILE [--threshold 0.2]] [--save-baseline FILE]
+
+With ``--baseline`` the run exits non-zero if any tracked metric (p50, p95,
+throughput) regressed by more than ``--threshold`` or a scenario had errors,
+so it can gate CI. Record the baseline on the same class of machine that
+runs the check.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List
+
+import httpx
+
+SCENARIOS = ("search", "stream_audio", "related", "playlist_detail", "playlists")
+# metric -> True if higher is better
+TRACKED = {"throughput_rps": True, "p50_ms": False, "p95_ms": False}
+
+
+def _configure_environment(db_path: str, search_backend: str, innertube_port: int) -> None:
+    # Must run before the app (and its settings) are imported. Always a
+    # throwaway database — never whatever DATABASE_URL the shell exports —
+    # and never the real search API.
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    os.environ["DATABASE_REPLICA_URL"] = ""
+    os.environ["SEARCH_BACKEND"] = search_backend
+    os.environ["INNERTUBE_BASE_URL"] = f"http://127.0.0.1:{innertube_port}"
+    os.environ["DB_AUTO_CREATE"] = "true"
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.environ.setdefault("SLOW_REQUEST_LOG_MS", "0")
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-" + "x" * 32)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class ApiServer:
+    """The FastAPI app under uvicorn, in a background thread."""
+
+    def __init__(self, port: int):
+        import uvicorn
+        from app.main import app
+
+        self.port = port
+        self.server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+        )
+        self._thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self) -> "ApiServer":
+        self._thread.start()
+        deadline = time.monotonic() + 30
+        while not self.server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("API server failed to start")
+            time.sleep(0.05)
+        return self
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self._thread.join(timeout=10)
+
+
+async def _setup_users(client: httpx.AsyncClient, count: int, video_ids: List[str], tracks: int):
+    """Register ``count`` users; user 0 owns a public playlist of ``tracks`` tracks."""
+    tokens = []
+    for i in range(count):
+        email = f"bench{i}@example.com"
+        await client.post("/api/v1/auth/register", json={
+            "email": email, "username": f"bench{i}", "password": "benchmark-password",
+        })
+        response = await client.post(
+            "/api/v1/auth/login", data={"username": email, "password": "benchmark-password"}
+        )
+        response.raise_for_status()
+        tokens.append({"Authorization": f"Bearer {response.json()['access_token']}"})
+
+    playlist_ids = []
+    for i, headers in enumerate(tokens):
+        response = await client.post(
+            "/api/v1/playlists", json={"name": f"Bench {i}", "is_public": True}, headers=headers
+        )
+        response.raise_for_status()
+        playlist_ids.append(response.json()["id"])
+
+    # Track rows are fetched through the (fake) extractor the first time
+    await asyncio.gather(*(
+        client.post(
+            f"/api/v1/playlists/{playlist_ids[0]}/tracks",
+            json={"track_id": video_id, "position": position},
+            headers=tokens[0],
+        )
+        for position, video_id in enumerate(video_ids[:tracks])
+    ))
+    return tokens, playlist_ids[0]
+
+
+def _scenario_requests(video_ids: List[str], shared_playlist: str) -> Dict[str, Callable]:
+    def search(i):
+        return "GET", f"/api/v1/search?query=bench+query+{i % 25}&limit=20"
+
+    def stream_audio(i):
+        return "GET", f"/api/v1/playback/stream/audio/{video_ids[i % len(video_ids)]}"
+
+    def related(i):
+        return "GET", f"/api/v1/playback/related/{video_ids[i % len(video_ids)]}?limit=10"
+
+    def playlist_detail(i):
+        return "GET", f"/api/v1/playlists/{shared_playlist}"
+
+    def playlists(i):
+        return "GET", "/api/v1/playlists"
+
+    return {
+        "search": search,
+        "stream_audio": stream_audio,
+        "related": related,
+        "playlist_detail": playlist_detail,
+        "playlists": playlists,
+    }
+
+
+async def _run_scenario(client, tokens, make_request, total: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker(headers):
+        nonlocal next_index, errors
+        while next_index < total:
+            i = next_index
+            next_index += 1
+            method, url = make_request(i)
+            started = time.perf_counter()
+            try:
+                # Read the whole body — for streams this is the full media file
+                response = await client.request(method, url, headers=headers)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(tokens[w % len(tokens)]) for w in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """Return a description of every tracked metric that regressed past ``threshold``."""
+    regressions = []
+    for name, result in results.items():
+        if result["errors"]:
+            regressions.append(f"{name}: {result['errors']} failed requests")
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric, higher_is_better in TRACKED.items():
+            old, new = base.get(metric), result[metric]
+            if not old:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append(f"{name}.{metric}: {old} -> {new} ({change:+.0%})")
+    return regressions
+
+
+async def _drive(args, base_url: str, video_ids: List[str]) -> Dict[str, dict]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        tokens, shared_playlist = await _setup_users(
+            client, args.concurrency, video_ids, args.playlist_tracks
+        )
+        requests = _scenario_requests(video_ids, shared_playlist)
+        results = {}
+        for name in args.scenarios:
+            results[name] = await _run_scenario(
+                client, tokens, requests[name], args.requests, args.concurrency
+            )
+            r = results[name]
+            print(
+                f"{name:<16} {r['requests']:>6} req  {r['errors']:>4} err  "
+                f"{r['throughput_rps']:>8.1f} req/s  p50 {r['p50_ms']:>8.1f} ms  "
+                f"p95 {r['p95_ms']:>8.1f} ms  p99 {r['p99_ms']:>8.1f} ms"
+            )
+        return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="fake extraction latency")
+    parser.add_argument("--search-backend", choices=("innertube", "ytdlp"), default="innertube")
+    parser.add_argument(
+        "--search-latency-ms", type=float, default=60.0, help="fake search API latency per page"
+    )
+    parser.add_argument("--media-kb", type=int, default=1024, help="size of each fake media file")
+    parser.add_argument("--upstream-ttfb-ms", type=float, default=20.0)
+    parser.add_argument("--playlist-tracks", type=int, default=50)
+    parser.add_argument(
+        "--scenarios",
+        type=lambda v: [s.strip() for s in v.split(",") if s.strip()],
+        default=list(SCENARIOS),
+    )
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument("--save-baseline", help="write this run's results to a JSON file")
+    args = parser.parse_args(argv)
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        innertube_port = _free_port()
+        _configure_environment(os.path.join(tmp, "bench.db"), args.search_backend, innertube_port)
+        from benchmarks.fakes import FixtureExtractor, GoogleVideoServer, InnertubeServer
+
+        media = GoogleVideoServer(args.media_kb * 1024, args.upstream_ttfb_ms).start()
+        search_api = InnertubeServer(args.search_latency_ms, innertube_port).start()
+        extractor = FixtureExtractor(media.base_url, args.latency_ms)
+        extractor.install()
+        api = ApiServer(_free_port()).start()
+        try:
+            print(
+                f"concurrency={args.concurrency} requests={args.requests} "
+                f"extraction latency={args.latency_ms:.0f}ms media={args.media_kb}KiB "
+                f"search backend={args.search_backend}"
+            )
+            results = asyncio.run(_drive(args, api.base_url, extractor.video_ids))
+            print(f"fixture extractions: {extractor.calls}  search API pages: {search_api.requests}")
+        finally:
+            api.stop()
+            extractor.uninstall()
+            search_api.stop()
+            media.stop()
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"baseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"no regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,15 @@
+import os
+
+# Settings are read at import time; point them at throwaway local resources
+# before anything under app/ is imported
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["DATABASE_REPLICA_URL"] = ""
+os.environ["SECRET_KEY"] = "test-secret-key-that-is-long-enough-for-hs256"
+os.environ["SEARCH_BACKEND"] = "innertube"
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
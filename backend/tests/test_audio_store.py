@@ -0,0 +1,104 @@
+import asyncio
+import os
+
+import httpx
+import pytest
+
+from app.schemas.user import StreamInfo
+from app.services.audio_store import AudioStore
+
+DATA = bytes(i % 251 for i in range(3 * 1024 * 1024))
+STREAM = StreamInfo(url="http://upstream/audio", title="t", duration=1)
+
+
+class Upstream:
+    """Serves DATA in 1 MB chunks, pausing after the first until ``release`` is set."""
+
+    def __init__(self):
+        self.requested = []
+        self.release = asyncio.Event()
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        range_header = request.headers.get("range")
+        self.requested.append(range_header)
+        start = int(range_header[len("bytes="):-1]) if range_header else 0
+
+        async def body():
+            for i in range(start, len(DATA), 1024 * 1024):
+                yield DATA[i:i + 1024 * 1024]
+                await self.release.wait()
+
+        if start:
+            return httpx.Response(
+                206, content=body(), headers={"Content-Range": f"bytes {start}-{len(DATA) - 1}/{len(DATA)}"}
+            )
+        return httpx.Response(200, content=body(), headers={"Content-Length": str(len(DATA))})
+
+
+@pytest.fixture
+def upstream():
+    return Upstream()
+
+
+@pytest.fixture
+def client(upstream):
+    return httpx.AsyncClient(transport=httpx.MockTransport(upstream.handler))
+
+
+@pytest.mark.anyio
+async def test_concurrent_downloads_share_one_transfer(tmp_path, upstream, client):
+    store = AudioStore(str(tmp_path), 100 * 1024 * 1024)
+    seen = []
+
+    first = asyncio.create_task(store.download(client, "vid", "high", STREAM))
+    second = asyncio.create_task(store.download(client, "vid", "high", STREAM, lambda done, total: seen.append(done)))
+    await asyncio.sleep(0.05)
+    upstream.release.set()
+    results = await asyncio.gather(first, second)
+
+    assert upstream.requested == [None]
+    assert results[0] is results[1]
+    assert seen[-1] == len(DATA)
+    with open(results[0].path, "rb") as f:
+        assert f.read() == DATA
+    assert sorted(os.listdir(tmp_path)) == ["vid.high.audio", "vid.high.json"]
+
+
+@pytest.mark.anyio
+async def test_cancelling_one_caller_leaves_the_shared_transfer_running(tmp_path, upstream, client):
+    store = AudioStore(str(tmp_path), 100 * 1024 * 1024)
+
+    first = asyncio.create_task(store.download(client, "vid", "high", STREAM))
+    second = asyncio.create_task(store.download(client, "vid", "high", STREAM))
+    await asyncio.sleep(0.05)
+    first.cancel()
+    upstream.release.set()
+
+    stored = await second
+    assert first.cancelled()
+    assert stored.size == len(DATA)
+
+
+@pytest.mark.anyio
+async def test_cancelled_download_is_kept_for_resume(tmp_path, upstream, client):
+    store = AudioStore(str(tmp_path), 100 * 1024 * 1024)
+
+    task = asyncio.create_task(store.download(client, "vid", "high", STREAM))
+    while _written(tmp_path) < 1024 * 1024:
+        await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert os.listdir(tmp_path) == ["vid.high.part"]
+    assert await store.partial_bytes("vid", "high") == 1024 * 1024
+
+    upstream.release.set()
+    stored = await store.download(client, "vid", "high", STREAM)
+    assert upstream.requested == [None, f"bytes={1024 * 1024}-"]
+    with open(stored.path, "rb") as f:
+        assert f.read() == DATA
+
+
+def _written(directory) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(directory) if entry.name.endswith(".part"))
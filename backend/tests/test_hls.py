@@ -0,0 +1,60 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.hls import HLSProxy, SegmentCache
+
+
+@pytest.mark.anyio
+async def test_cancelling_the_first_caller_does_not_cancel_waiters():
+    release = asyncio.Event()
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url)
+        await release.wait()
+        return httpx.Response(200, content=b"segment", headers={"Content-Type": "video/mp2t"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    cache = SegmentCache(1024 * 1024)
+
+    first = asyncio.create_task(cache.fetch(client, "http://upstream/seg1.ts"))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(cache.fetch(client, "http://upstream/seg1.ts"))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == ("video/mp2t", b"segment")
+    assert first.cancelled()
+    assert len(requests) == 1
+    assert cache.get("http://upstream/seg1.ts") == ("video/mp2t", b"segment")
+    assert not cache._inflight
+
+
+LIVE = b"#EXTM3U\n#EXT-X-MEDIA-SEQUENCE:%d\n#EXTINF:5.0,\nseg%d.ts\n"
+VOD = b"#EXTM3U\n#EXTINF:5.0,\nseg0.ts\n#EXT-X-ENDLIST\n"
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("ended, fetches", [(False, 2), (True, 1)], ids=["live", "vod"])
+async def test_only_ended_playlists_are_cached(ended, fetches):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url)
+        n = len(requests)
+        body = VOD if ended else LIVE % (n, n)
+        return httpx.Response(200, content=body, headers={"Content-Type": "application/vnd.apple.mpegurl"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    proxy = HLSProxy()
+
+    first = await proxy.get_playlist(client, "abc", "http://upstream/index.m3u8")
+    second = await proxy.get_playlist(client, "abc", "http://upstream/index.m3u8")
+
+    assert len(requests) == fetches
+    assert ("MEDIA-SEQUENCE:2" in second) == (not ended)
+    assert "segment?t=" in first
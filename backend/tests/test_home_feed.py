@@ -0,0 +1,209 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+import pytest
+from sqlalchemy import event, insert, select
+
+from app.db.database import Base, async_session, engine
+from app.models.user import ListeningEvent, Track, User
+from app.schemas.user import TrackSearchResult
+from app.services import home_feed
+from app.services.home_feed import HomeFeedService, MemoryFeedStore
+
+
+class FakeYouTube:
+    def __init__(self):
+        self.held = 0
+        self.connections_held = []
+        event.listen(engine.sync_engine.pool, "checkout", self._checkout)
+        event.listen(engine.sync_engine.pool, "checkin", self._checkin)
+
+    def _checkout(self, *args):
+        self.held += 1
+
+    def _checkin(self, *args):
+        self.held -= 1
+
+    def close(self):
+        event.remove(engine.sync_engine.pool, "checkout", self._checkout)
+        event.remove(engine.sync_engine.pool, "checkin", self._checkin)
+
+    async def get_video_info(self, video_id):
+        self.connections_held.append(self.held)
+        return {"id": video_id, "title": f"Title {video_id}", "artist": "Artist", "duration": 100, "thumbnail": None}
+
+
+class TrendingYouTube:
+    """Answers the trending search; ``hold`` blocks it until set, ``fail`` makes it raise."""
+
+    def __init__(self):
+        self.searches = 0
+        self.hold: Optional[asyncio.Event] = None
+        self.fail = False
+
+    async def search(self, query, limit):
+        self.searches += 1
+        if self.hold is not None:
+            await self.hold.wait()
+        if self.fail:
+            raise RuntimeError("search failed")
+        return [TrackSearchResult(id=f"trend{self.searches}", title=f"Trending {self.searches}")]
+
+
+@pytest.fixture
+async def db_tables():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+
+@pytest.fixture
+def youtube(monkeypatch):
+    youtube = FakeYouTube()
+    monkeypatch.setattr(home_feed, "get_youtube_service", lambda: youtube)
+    yield youtube
+    youtube.close()
+
+
+@pytest.fixture
+def trending(monkeypatch):
+    youtube = TrendingYouTube()
+    monkeypatch.setattr(home_feed, "get_youtube_service", lambda: youtube)
+    return youtube
+
+
+def _service(cold_wait: float = 0) -> HomeFeedService:
+    return HomeFeedService(MemoryFeedStore(100), ttl=60, concurrency=1, cold_wait=cold_wait, trending_query="x")
+
+
+def _feed(name: str, age: float) -> dict:
+    section = {"id": "trending", "title": "Trending", "tracks": [{"id": name, "title": name}]}
+    return {"sections": [section], "built_at": time.time() - age}
+
+
+def _trending_ids(feed: dict) -> list:
+    return [track["id"] for section in feed["sections"] for track in section["tracks"]]
+
+
+async def _until(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.anyio
+async def test_metadata_lookups_run_without_a_connection(db_tables, youtube):
+    now = datetime.now(timezone.utc)
+    async with async_session() as db:
+        await db.execute(insert(User).values(id="u1", email="u1@example.com", username="u1", hashed_password="x"))
+        await db.execute(insert(ListeningEvent).values([
+            {"id": f"e{i}", "user_id": "u1", "track_id": f"video0000{i:02d}", "event": "play", "occurred_at": now}
+            for i in range(3)
+        ]))
+        await db.commit()
+
+    section_id, section = await _service()._recently_played("u1")
+
+    assert section_id == "recently_played"
+    assert len(section["tracks"]) == 3
+    assert youtube.connections_held == [0, 0, 0]
+
+
+@pytest.mark.anyio
+async def test_storing_metadata_skips_rows_stored_meanwhile(db_tables, youtube):
+    async with async_session() as db:
+        db.add(Track(id="video000001", title="Stored by a like"))
+        await db.commit()
+
+    stored = await _service()._store_metadata(["video000001", "video000002"])
+
+    assert [track.id for track in stored] == ["video000001", "video000002"]
+    async with async_session() as db:
+        titles = dict((await db.execute(select(Track.id, Track.title))).all())
+    assert titles == {"video000001": "Stored by a like", "video000002": "Title video000002"}
+
+
+@pytest.mark.anyio
+async def test_scheduler_rebuilds_only_feeds_older_than_the_ttl(db_tables, trending):
+    service = _service()
+    store = service.store
+    for user_id in ("fresh", "stale", "new"):
+        await store.mark_active(user_id)
+    await store.put("fresh", _feed("kept", age=10))
+    await store.put("stale", _feed("old", age=120))
+
+    service.start()
+    try:
+        await _until(lambda: not service._queue and not service._builds and "new" in store._feeds)
+    finally:
+        await service.stop()
+
+    assert _trending_ids(await store.get("fresh")) == ["kept"]
+    assert _trending_ids(await store.get("stale")) == ["trend1"]
+    assert _trending_ids(await store.get("new")) == ["trend1"]
+    # One trending search per TTL, shared by every build
+    assert trending.searches == 1
+
+
+@pytest.mark.anyio
+async def test_stale_feed_is_served_while_a_rebuild_is_queued(db_tables, trending):
+    trending.hold = asyncio.Event()
+    service = _service()
+    await service.store.put("u1", _feed("old", age=120))
+    service.start()
+    try:
+        served = await service.get_feed("u1")
+        assert served["stale"] is True
+        assert _trending_ids(served) == ["old"]
+        assert "u1" in service._builds
+
+        trending.hold.set()
+        await _until(lambda: "u1" not in service._builds)
+        served = await service.get_feed("u1")
+    finally:
+        await service.stop()
+
+    assert served["stale"] is False
+    assert _trending_ids(served) == ["trend1"]
+
+
+@pytest.mark.anyio
+async def test_cold_miss_waits_no_longer_than_cold_wait(db_tables, trending):
+    trending.hold = asyncio.Event()
+    service = _service(cold_wait=0.05)
+    service.start()
+    try:
+        started = time.monotonic()
+        served = await service.get_feed("u1")
+        waited = time.monotonic() - started
+
+        trending.hold.set()
+        await _until(lambda: "u1" not in service._builds)
+        built = await service.get_feed("u1")
+    finally:
+        await service.stop()
+
+    assert served == {"sections": [], "built_at": None, "stale": True}
+    assert 0.05 <= waited < 0.5
+    assert built["stale"] is False
+    assert _trending_ids(built) == ["trend1"]
+
+
+@pytest.mark.anyio
+async def test_failed_section_keeps_its_previous_contents(db_tables, trending):
+    trending.fail = True
+    previous = _feed("old", age=120)
+    previous["sections"].append(
+        {"id": "recently_played", "title": "Recently played", "tracks": [{"id": "gone", "title": "gone"}]}
+    )
+
+    feed = await _service().build("u1", previous)
+
+    # Trending failed and keeps its tracks; recently played built (empty) and replaces its own
+    assert feed["sections"] == previous["sections"][:1]
+    assert feed["built_at"] > previous["built_at"]
@@ -0,0 +1,148 @@
+import httpx
+import pytest
+
+from app.schemas.user import TrackSearchResult
+from app.services import youtube
+from app.services.innertube import (
+    InnertubeSearchClient,
+    SearchParseError,
+    _parse_duration,
+    _parse_view_count,
+    parse_search_page,
+)
+from app.services.youtube import YouTubeService
+from benchmarks.fakes import InnertubeServer
+
+YTDLP_RESULT = [TrackSearchResult(id="ytdlp000001", title="From yt-dlp")]
+
+
+@pytest.fixture
+def server():
+    server = InnertubeServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def ytdlp(monkeypatch):
+    """A YouTubeService whose yt-dlp search is recorded instead of run."""
+    service = YouTubeService()
+    calls = []
+
+    async def search_ytdlp(query, limit):
+        calls.append((query, limit))
+        return YTDLP_RESULT
+
+    monkeypatch.setattr(service, "_search_ytdlp", search_ytdlp)
+    service.ytdlp_calls = calls
+    return service
+
+
+def _use(monkeypatch, client: InnertubeSearchClient) -> None:
+    monkeypatch.setattr(youtube, "get_innertube_search", lambda: client)
+
+
+def test_parses_videos_and_continuation(server):
+    results, continuation = parse_search_page(server.pages[""])
+
+    assert len(results) == 20
+    assert continuation == "bench-page-2"
+    first = results[0]
+    assert first.id == "GJMuHbEL31I"
+    assert first.title == "Zack Tabudlo - Ballad Summer (Official Audio)"
+    assert first.artist == "Zack Tabudlo"
+    assert first.duration == 211
+    assert first.view_count == 75758230
+    assert first.thumbnail == "https://img.youtube.com/vi/GJMuHbEL31I/hqdefault.jpg"
+    assert parse_search_page(server.pages["bench-page-3"])[1] is None
+
+
+def test_parses_display_text():
+    assert _parse_duration("1:02:03") == 3723
+    assert _parse_duration("LIVE") is None
+    assert _parse_view_count("1,234,567 views") == 1234567
+    assert _parse_view_count("No views") == 0
+
+
+def test_unexpected_layout_is_a_parse_error():
+    with pytest.raises(SearchParseError):
+        parse_search_page({"contents": {"somethingElse": {}}})
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("limit, pages", [(10, 1), (20, 1), (45, 3), (100, 3)])
+async def test_follows_continuations_until_limit(server, limit, pages):
+    client = InnertubeSearchClient(server.base_url, "2.20250101.00.00")
+    try:
+        results = await client.search("opm", limit)
+    finally:
+        await client.close()
+
+    assert len(results) == min(limit, 50)
+    assert len({track.id for track in results}) == len(results)
+    assert server.requests == pages
+
+
+@pytest.mark.anyio
+async def test_innertube_backend_does_not_touch_ytdlp(monkeypatch, server, ytdlp):
+    client = InnertubeSearchClient(server.base_url, "2.20250101.00.00")
+    _use(monkeypatch, client)
+    try:
+        results = await ytdlp.search("opm", 5)
+    finally:
+        await client.close()
+
+    assert [track.id for track in results] == [track.id for track in parse_search_page(server.pages[""])[0][:5]]
+    assert ytdlp.ytdlp_calls == []
+
+
+@pytest.mark.anyio
+async def test_ytdlp_backend_skips_innertube(monkeypatch, server, ytdlp):
+    monkeypatch.setattr(youtube.settings, "SEARCH_BACKEND", "ytdlp")
+    _use(monkeypatch, InnertubeSearchClient(server.base_url, "2.20250101.00.00"))
+
+    assert await ytdlp.search("opm", 5) == YTDLP_RESULT
+    assert ytdlp.ytdlp_calls == [("opm", 5)]
+    assert server.requests == 0
+
+
+@pytest.mark.anyio
+async def test_falls_back_to_ytdlp_on_http_error(monkeypatch, server, ytdlp):
+    # The fake answers 400 off the search path
+    client = InnertubeSearchClient(f"{server.base_url}/not-youtubei", "2.20250101.00.00")
+    _use(monkeypatch, client)
+    try:
+        assert await ytdlp.search("opm", 5) == YTDLP_RESULT
+    finally:
+        await client.close()
+    assert ytdlp.ytdlp_calls == [("opm", 5)]
+
+
+@pytest.mark.anyio
+async def test_falls_back_to_ytdlp_on_timeout(monkeypatch, ytdlp):
+    server = InnertubeServer(latency_ms=500).start()
+    client = InnertubeSearchClient(server.base_url, "2.20250101.00.00")
+    client._client = httpx.AsyncClient(base_url=server.base_url, timeout=0.05)
+    _use(monkeypatch, client)
+    try:
+        assert await ytdlp.search("opm", 5) == YTDLP_RESULT
+    finally:
+        await client.close()
+        server.stop()
+    assert ytdlp.ytdlp_calls == [("opm", 5)]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("body", [b"<html>consent</html>", b'{"contents": {}}', b'{"responseContext": {}}'])
+async def test_falls_back_to_ytdlp_on_malformed_response(monkeypatch, ytdlp, body):
+    client = InnertubeSearchClient("https://www.youtube.com", "2.20250101.00.00")
+    client._client = httpx.AsyncClient(
+        base_url=client.base_url,
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body)),
+    )
+    _use(monkeypatch, client)
+    try:
+        assert await ytdlp.search("opm", 5) == YTDLP_RESULT
+    finally:
+        await client.close()
+    assert ytdlp.ytdlp_calls == [("opm", 5)]
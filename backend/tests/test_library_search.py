@@ -0,0 +1,39 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.schemas.user import TrackResponse
+from app.services.library_search import LibraryIndex, LibrarySearch
+
+
+class _Result:
+    def scalars(self):
+        return []
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return _Result()
+
+
+def test_memory_index_folds_accents():
+    index = LibraryIndex([TrackResponse(id="a" * 11, title="Halo", artist="Beyoncé")])
+
+    assert [track.artist for track in index.search("beyonce", 10)] == ["Beyoncé"]
+    assert [track.artist for track in index.search("BEYONCÉ", 10)] == ["Beyoncé"]
+
+
+@pytest.mark.anyio
+async def test_postgres_query_folds_accents_like_the_index():
+    db = RecordingSession()
+
+    await LibrarySearch(use_postgres=True, max_cached_users=1).search(db, "u1", "Beyoncé halo", 10)
+
+    sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+    # Query terms and indexed text both go through the same wrapper
+    assert "to_tsquery('simple', immutable_unaccent(" in sql
+    assert "to_tsvector('simple', immutable_unaccent(coalesce(tracks.title, '')" in sql
+    assert "immutable_unaccent(%(param_1)s::VARCHAR) <%% immutable_unaccent(coalesce(tracks.title, '')" in sql
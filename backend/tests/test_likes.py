@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.v1.likes import _get_or_create_track
+from app.db.database import Base
+from app.models.user import Track
+from app.schemas.user import LikeTrack
+
+
+class FakeYouTube:
+    def __init__(self):
+        self.lookups = []
+
+    async def get_video_info(self, video_id):
+        self.lookups.append(video_id)
+        return {"id": video_id, "title": "Real Title", "artist": "Real Artist", "duration": 200, "thumbnail": None}
+
+
+@pytest.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_shared_track_row_ignores_client_metadata(db):
+    youtube = FakeYouTube()
+    data = LikeTrack.model_validate({"track_id": "dQw4w9WgXcQ", "title": "Spam", "artist": "Someone else"})
+
+    track = await _get_or_create_track(db, youtube, data)
+
+    assert (track.title, track.artist, track.duration) == ("Real Title", "Real Artist", 200)
+    assert youtube.lookups == ["dQw4w9WgXcQ"]
+    assert await _get_or_create_track(db, youtube, data) is track
+    assert youtube.lookups == ["dQw4w9WgXcQ"]
+
+
+@pytest.mark.anyio
+async def test_track_stored_meanwhile_by_another_user_is_reused(tmp_path):
+    # A file database, so the "other user" has a connection of its own
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'likes.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    class RacingYouTube(FakeYouTube):
+        async def get_video_info(self, video_id):
+            async with sessions() as other:
+                other.add(Track(id=video_id, title="Stored First"))
+                await other.commit()
+            return await super().get_video_info(video_id)
+
+    try:
+        async with sessions() as db:
+            data = LikeTrack.model_validate({"track_id": "dQw4w9WgXcQ"})
+            track = await _get_or_create_track(db, RacingYouTube(), data)
+            await db.commit()
+        assert track.title == "Stored First"
+    finally:
+        await engine.dispose()
@@ -0,0 +1,139 @@
+# The hot-path queries must use the indexes from migrations 0002, 0003 and
+# 0005. Plans are checked on SQLite over seeded tables of realistic size, and
+# on PostgreSQL too when TEST_POSTGRES_URL points at a scratch database (the
+# test creates and drops its tables).
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.database import Base
+from app.models.user import LikedTrack, ListeningEvent, Playlist, Track, User, playlist_tracks
+
+USERS = 200
+PLAYLISTS_PER_USER = 5
+TRACKS_PER_PLAYLIST = 30
+LIKES_PER_USER = 50
+EVENTS_PER_USER = 100
+TRACKS = 10_000
+
+USER_ID = "user-7"
+
+# (name, statement, index it must use)
+HOT_PATHS = [
+    (
+        "playlists by owner",
+        select(Playlist).where(Playlist.owner_id == USER_ID),
+        "ix_playlists_owner_id",
+    ),
+    (
+        "playlist tracks in order",
+        select(Track.id, Track.title)
+        .join(playlist_tracks)
+        .where(playlist_tracks.c.playlist_id == "playlist-7-0")
+        .order_by(playlist_tracks.c.position),
+        "ix_playlist_tracks_playlist_id_position",
+    ),
+    (
+        "liked tracks page",
+        select(LikedTrack.id, LikedTrack.liked_at, Track)
+        .join(Track, Track.id == LikedTrack.track_id)
+        .where(LikedTrack.user_id == USER_ID)
+        .order_by(LikedTrack.liked_at.desc(), LikedTrack.id.desc())
+        .limit(51),
+        "ix_liked_tracks_user_id_liked_at_id",
+    ),
+    (
+        "is liked",
+        select(LikedTrack.id).where(LikedTrack.user_id == USER_ID, LikedTrack.track_id == "track-42"),
+        "uq_liked_tracks_user_id_track_id",
+    ),
+    (
+        "listening history page",
+        select(ListeningEvent)
+        .where(ListeningEvent.user_id == USER_ID)
+        .order_by(ListeningEvent.occurred_at.desc())
+        .limit(50),
+        "ix_listening_events_user_id_occurred_at",
+    ),
+]
+
+# Ordered by the index itself, so no sort step may appear in the plan
+ORDERED_BY_INDEX = {"playlist tracks in order", "liked tracks page", "listening history page"}
+
+
+def _rows():
+    rng = random.Random(7)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    users = [
+        {"id": f"user-{u}", "email": f"u{u}@example.com", "username": f"u{u}", "hashed_password": "x"}
+        for u in range(USERS)
+    ]
+    tracks = [{"id": f"track-{t}", "title": f"Track {t}", "artist": f"Artist {t % 500}"} for t in range(TRACKS)]
+    playlists, entries, likes, events = [], [], [], []
+    for u in range(USERS):
+        for p in range(PLAYLISTS_PER_USER):
+            playlists.append({"id": f"playlist-{u}-{p}", "name": f"Mix {p}", "owner_id": f"user-{u}"})
+            for position, t in enumerate(rng.sample(range(TRACKS), TRACKS_PER_PLAYLIST)):
+                entries.append({"playlist_id": f"playlist-{u}-{p}", "track_id": f"track-{t}", "position": position})
+        for i, t in enumerate(rng.sample(range(TRACKS), LIKES_PER_USER)):
+            likes.append({
+                "id": f"like-{u}-{i}", "user_id": f"user-{u}", "track_id": f"track-{t}",
+                "liked_at": now - timedelta(minutes=rng.randrange(100_000)),
+            })
+        for i in range(EVENTS_PER_USER):
+            events.append({
+                "id": f"event-{u}-{i}", "user_id": f"user-{u}", "track_id": f"track-{rng.randrange(TRACKS)}",
+                "event": "play", "occurred_at": now - timedelta(minutes=rng.randrange(100_000)),
+            })
+    return [
+        (User.__table__, users),
+        (Track.__table__, tracks),
+        (Playlist.__table__, playlists),
+        (playlist_tracks, entries),
+        (LikedTrack.__table__, likes),
+        (ListeningEvent.__table__, events),
+    ]
+
+
+_DATABASES = [pytest.param("sqlite+aiosqlite:///:memory:", id="sqlite")]
+if os.environ.get("TEST_POSTGRES_URL"):
+    _DATABASES.append(pytest.param(os.environ["TEST_POSTGRES_URL"], id="postgresql"))
+
+
+@pytest.fixture(params=_DATABASES)
+async def seeded(request):
+    engine = create_async_engine(request.param)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        for table, rows in _rows():
+            await conn.execute(insert(table), rows)
+        # Fresh statistics, as after autovacuum/ANALYZE in production
+        await conn.execute(text("ANALYZE"))
+    try:
+        yield engine
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+
+async def _plan(engine, statement) -> str:
+    dialect = engine.dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    explain = "EXPLAIN QUERY PLAN " if dialect.name == "sqlite" else "EXPLAIN "
+    async with engine.connect() as conn:
+        rows = (await conn.execute(text(explain + sql))).all()
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+@pytest.mark.anyio
+async def test_hot_path_queries_use_their_indexes(seeded):
+    for name, statement, index in HOT_PATHS:
+        plan = await _plan(seeded, statement)
+        assert index in plan, f"{name} does not use {index}:\n{plan}"
+        if name in ORDERED_BY_INDEX:
+            assert "TEMP B-TREE" not in plan and "Sort Key" not in plan, f"{name} sorts:\n{plan}"
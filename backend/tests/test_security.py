@@ -0,0 +1,58 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.metrics import PASSWORD_HASH_ACTIVE, PASSWORD_HASH_QUEUED, PASSWORD_HASH_REJECTED
+from app.core.security import PasswordHashPool
+
+
+async def _until(condition):
+    while not condition():
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.anyio
+async def test_pending_counts_work_until_the_thread_is_done():
+    pool = PasswordHashPool(workers=1, max_pending=2)
+    release = threading.Event()
+    rejected = PASSWORD_HASH_REJECTED._value.get()
+
+    running = asyncio.create_task(pool.run(release.wait))
+    await _until(lambda: pool.active == 1)
+    queued = asyncio.create_task(pool.run(lambda: "hashed"))
+    await asyncio.sleep(0.01)
+    assert (PASSWORD_HASH_ACTIVE._value.get(), PASSWORD_HASH_QUEUED._value.get()) == (1, 1)
+
+    # The request holding the running hash goes away; its thread doesn't
+    running.cancel()
+    with pytest.raises(HTTPException):
+        await pool.run(lambda: "rejected")
+    assert pool.pending == 2
+    assert PASSWORD_HASH_REJECTED._value.get() == rejected + 1
+
+    release.set()
+    assert await queued == "hashed"
+    await _until(lambda: pool.pending == 0)
+    assert (PASSWORD_HASH_ACTIVE._value.get(), PASSWORD_HASH_QUEUED._value.get()) == (0, 0)
+    assert pool.completed == 2
+
+
+@pytest.mark.anyio
+async def test_cancelled_queued_work_leaves_the_queue():
+    pool = PasswordHashPool(workers=1, max_pending=4)
+    release = threading.Event()
+
+    running = asyncio.create_task(pool.run(release.wait))
+    await _until(lambda: pool.active == 1)
+    queued = asyncio.create_task(pool.run(lambda: "never"))
+    await asyncio.sleep(0.01)
+    queued.cancel()
+    await asyncio.sleep(0.01)
+
+    assert pool.pending == 1
+    assert PASSWORD_HASH_QUEUED._value.get() == 0
+    release.set()
+    await running
+    await _until(lambda: pool.pending == 0)
@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+
+from app.services.stream_limits import StreamGovernor
+
+
+@pytest.mark.anyio
+async def test_only_leases_blocked_on_the_client_are_reaped():
+    governor = StreamGovernor(max_streams=0, idle_timeout=0.4, egress_bytes_per_sec=0)
+    reaped = []
+
+    def lease(name):
+        lease = governor.acquire(name)
+
+        async def on_idle():
+            reaped.append(name)
+
+        lease.on_idle = on_idle
+        return lease
+
+    slow_upstream = lease("slow-upstream")  # waiting in aiter_bytes, nothing sent yet
+    slow_upstream.record(1000)
+    stalled_client = lease("stalled-client")
+    stalled_client.record(1000)
+    stalled_client.sending()
+    reading_client = lease("reading-client")
+
+    for _ in range(12):
+        reading_client.record(1000)
+        reading_client.sending()
+        await asyncio.sleep(0.1)
+        reading_client.sent()
+
+    assert reaped == ["stalled-client"]
+    for held in (slow_upstream, stalled_client, reading_client):
+        held.release()
+    await asyncio.sleep(0.6)
+    assert governor._reaper.done()
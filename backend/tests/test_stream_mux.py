@@ -0,0 +1,126 @@
+import asyncio
+import re
+
+import httpx
+import pytest
+
+from app.services.stream_mux import StreamMultiplexer
+
+DATA = bytes(i % 251 for i in range(256_000))
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _serve(request: httpx.Request) -> httpx.Response:
+    """googlevideo-like: honours single byte ranges with 206 + Content-Range."""
+    requested.append(request.headers.get("range"))
+    match = _RANGE_RE.match(request.headers.get("range", ""))
+    if not match:
+        return httpx.Response(200, content=DATA)
+    first, last = match.groups()
+    if first:
+        start, end = int(first), min(int(last), len(DATA) - 1) if last else len(DATA) - 1
+    else:
+        start, end = len(DATA) - int(last), len(DATA) - 1
+    return httpx.Response(
+        206,
+        content=DATA[start:end + 1],
+        headers={"Content-Range": f"bytes {start}-{end}/{len(DATA)}"},
+    )
+
+
+requested = []
+
+
+@pytest.fixture
+def opener():
+    requested.clear()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(_serve))
+
+    def open_upstream(range_value):
+        headers = {"Range": range_value} if range_value else {}
+        return client.send(client.build_request("GET", "http://upstream/audio", headers=headers), stream=True)
+
+    return open_upstream
+
+
+async def _read_with_resume(subscription) -> bytes:
+    """Read the first chunk, drop the upstream (as the idle reaper does), then read the rest."""
+    body = bytearray()
+    async for chunk in subscription:
+        body += chunk
+        if len(body) == len(chunk):
+            await subscription.release_upstream()
+    await subscription.close()
+    return bytes(body)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("key, range_header, start, end", [
+    (None, "bytes=100000-199999", 100000, 199999),
+    (None, "bytes=-150000", len(DATA) - 150000, len(DATA) - 1),
+    ("audio:x:10000", "bytes=10000-", 10000, len(DATA) - 1),
+    ("audio:x:full", None, 0, len(DATA) - 1),
+], ids=["bounded", "suffix", "open", "full"])
+async def test_resume_continues_the_requested_range(opener, key, range_header, start, end):
+    mux = StreamMultiplexer(1024 * 1024)
+    subscription = await mux.subscribe(key, 0 if key is None else start, range_header, opener)
+
+    body = await _read_with_resume(subscription)
+
+    assert body == DATA[start:end + 1]
+    assert len(requested) == 2
+    assert requested[1].startswith(f"bytes={start + 65536}-")
+
+
+@pytest.mark.anyio
+async def test_bounded_resume_keeps_the_range_end(opener):
+    mux = StreamMultiplexer(1024 * 1024)
+    subscription = await mux.subscribe(None, 0, "bytes=100000-199999", opener)
+
+    await _read_with_resume(subscription)
+
+    assert requested == ["bytes=100000-199999", "bytes=165536-199999"]
+
+
+@pytest.mark.anyio
+async def test_fan_out_is_exported_as_metrics(opener):
+    from app.core.metrics import STREAM_MUX_JOINS, STREAM_MUX_UPSTREAMS
+
+    opened = STREAM_MUX_UPSTREAMS.labels("new")._value.get()
+    joins = STREAM_MUX_JOINS._value.get()
+    mux = StreamMultiplexer(1024 * 1024)
+    first = await mux.subscribe("audio:y:0", 0, None, opener)
+    second = await mux.subscribe("audio:y:0", 0, None, opener)
+
+    assert mux.active_streams == 1
+    assert STREAM_MUX_UPSTREAMS.labels("new")._value.get() == opened + 1
+    assert STREAM_MUX_JOINS._value.get() == joins + 1
+    await first.close()
+    await second.close()
+
+
+@pytest.mark.anyio
+async def test_opener_cancelled_joiner_still_gets_the_stream(opener):
+    mux = StreamMultiplexer(1024 * 1024)
+    gate = asyncio.Event()
+
+    async def slow_open(range_value):
+        await gate.wait()
+        return await opener(range_value)
+
+    first = asyncio.create_task(mux.subscribe("audio:z:0", 0, None, slow_open))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(mux.subscribe("audio:z:0", 0, None, slow_open))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    await asyncio.sleep(0.01)
+    gate.set()
+
+    subscription = await second
+    body = b"".join([chunk async for chunk in subscription])
+    await subscription.close()
+
+    assert first.cancelled()
+    assert body == DATA
+    assert requested == [None]
+    assert mux.active_streams == 0
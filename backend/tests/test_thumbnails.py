@@ -0,0 +1,93 @@
+import asyncio
+import io
+
+import httpx
+import pytest
+from PIL import Image
+
+from app.services.thumbnails import ThumbnailNotFound, ThumbnailService
+
+
+def _jpeg() -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (320, 180), (200, 30, 30)).save(out, "JPEG")
+    return out.getvalue()
+
+
+@pytest.mark.anyio
+async def test_cancelling_the_first_caller_does_not_cancel_waiters():
+    release = asyncio.Event()
+    requests = []
+    source = _jpeg()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        await release.wait()
+        return httpx.Response(200, content=source)
+
+    service = ThumbnailService("http://img", 1024 * 1024, "", 0)
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    first = asyncio.create_task(service.get("dQw4w9WgXcQ", 128))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(service.get("dQw4w9WgXcQ", 64))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    body = await second
+    assert body[:4] == b"RIFF"
+    assert first.cancelled()
+    assert requests == ["/vi/dQw4w9WgXcQ/mqdefault.jpg"]
+    assert not service._inflight
+
+
+@pytest.mark.anyio
+async def test_missing_thumbnails_are_remembered():
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        return httpx.Response(404)
+
+    service = ThumbnailService("http://img", 1024 * 1024, "", 0, not_found_ttl=60)
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    for _ in range(3):
+        with pytest.raises(ThumbnailNotFound):
+            await service.get("dQw4w9WgXcQ", 128)
+
+    assert requests == ["/vi/dQw4w9WgXcQ/mqdefault.jpg", "/vi/dQw4w9WgXcQ/hqdefault.jpg"]
+
+
+def test_endpoint_validates_ids_and_limits_upstream_fetches_per_client(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.core import rate_limit
+    from app.main import app
+    from app.services import thumbnails
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=_jpeg())
+
+    service = ThumbnailService("http://img", 1024 * 1024, "", 0)
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    app.dependency_overrides[thumbnails.get_thumbnail_service] = lambda: service
+    monkeypatch.setattr(rate_limit.rate_limiter, "overrides", {"thumbnails": (60, 2)})
+    monkeypatch.setattr(rate_limit.rate_limiter, "backend", rate_limit.MemoryBuckets())
+    try:
+        client = TestClient(app)
+        invalid = client.get("/api/v1/thumbnails/not*an*id").status_code
+        codes = [
+            client.get(f"/api/v1/thumbnails/{video_id}").status_code
+            for video_id in ("aaaaaaaaaaa", "bbbbbbbbbbb", "ccccccccccc")
+        ]
+        # Cache hits are free
+        cached = client.get("/api/v1/thumbnails/aaaaaaaaaaa").status_code
+    finally:
+        app.dependency_overrides.clear()
+
+    assert invalid == 400
+    assert codes == [200, 200, 429]
+    assert cached == 200
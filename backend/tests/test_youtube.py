@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from app.services import youtube
+from app.services.youtube import ExtractionFailed, YouTubeService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    youtube._failure_cache.clear()
+    service = YouTubeService()
+    calls = []
+
+    async def failing_extraction(url, opts, timeout, operation):
+        calls.append(url)
+        raise youtube._load_yt_dlp().utils.DownloadError("ERROR: [youtube] abc: Video unavailable")
+
+    monkeypatch.setattr(service, "_run_extraction", failing_extraction)
+    service.calls = calls
+    yield service
+    youtube._failure_cache.clear()
+
+
+@pytest.mark.anyio
+async def test_cached_failure_is_raised_as_a_fresh_exception(service):
+    raised = []
+    for _ in range(3):
+        with pytest.raises(ExtractionFailed) as info:
+            await service._extract_video("abc", {}, timeout=1, operation="info")
+        raised.append(info.value)
+
+    assert len(service.calls) == 1
+    assert [e.kind for e in raised] == ["unavailable"] * 3
+    assert raised[1] is not raised[2]
+    # A re-raised shared instance would keep collecting frames on every hit
+    assert len(_frames(raised[2])) == len(_frames(raised[1]))
+    assert 0 < raised[2].retry_after <= raised[1].retry_after
+    assert all(isinstance(entry[0], str) for entry in youtube._failure_cache.values())
+
+
+def _frames(error):
+    tb, frames = error.__traceback__, []
+    while tb is not None:
+        frames.append(tb)
+        tb = tb.tb_next
+    return frames
+
+
+@pytest.mark.anyio
+async def test_format_failure_does_not_block_other_operations(monkeypatch):
+    youtube._failure_cache.clear()
+    service = YouTubeService()
+    calls = []
+
+    async def extraction(url, opts, timeout, operation):
+        calls.append(operation)
+        if operation == "hls":
+            raise youtube._load_yt_dlp().utils.DownloadError(
+                "ERROR: [youtube] abc: Requested format is not available"
+            )
+        if operation == "audio":
+            raise asyncio.TimeoutError
+        return {"id": "abc"}
+
+    monkeypatch.setattr(service, "_run_extraction", extraction)
+
+    with pytest.raises(ExtractionFailed) as info:
+        await service._extract_video("abc", {"format": "best[protocol^=m3u8]"}, timeout=1, operation="hls")
+    assert info.value.kind == "error"
+    with pytest.raises(asyncio.TimeoutError):
+        await service._extract_video("abc", {}, timeout=1, operation="audio")
+
+    assert await service._extract_video("abc", {}, timeout=1, operation="info") == {"id": "abc"}
+    assert calls == ["hls", "audio", "info"]
+    assert youtube._failure_cache == {}
@@ -1,3 +1,5 @@
+import '../../config/constants.dart';
+
 /// Track model representing a YouTube video/audio track
 class Track {
   final String id;
@@ -51,6 +53,11 @@ class Track {
     return thumbnail ?? 'https://img.youtube.com/vi/$id/hqdefault.jpg';
   }
 
+  /// Resized WebP thumbnail from the backend, for list tiles (size in px)
+  String thumbnailUrlSized(int size) {
+    return '${AppConstants.apiBaseUrl}${AppConstants.apiPrefix}/thumbnails/$id?size=$size';
+  }
+
   Track copyWith({
     String? id,
     String? title,
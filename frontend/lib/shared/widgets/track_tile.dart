@@ -37,7 +37,8 @@ class TrackTile extends StatelessWidget {
                 ClipRRect(
                   borderRadius: BorderRadius.circular(4),
                   child: CachedNetworkImage(
-                    imageUrl: track.thumbnailUrl,
+                    // 56dp tile at up to 2x density
+                    imageUrl: track.thumbnailUrlSized(128),
                     width: 56,
                     height: 56,
                     fit: BoxFit.cover,